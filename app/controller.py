@@ -12,6 +12,10 @@ Key Components:
 
 - show_data_list(page: ft.Page, **params):
   Displays a list view for a given model.
+  Accepts `after` and `limit` (1 to settings.MAX_PAGE_SIZE) query parameters for keyset pagination,
+  `order_by` for sorting and `f_<field>` / `f_<field>__<lookup>` parameters for filtering
+  on indexed fields, e.g. /data/task?f_is_done=false&f_title__contains=report&order_by=-title,
+  and `q` for full-text search.
 
 - show_data_add(page: ft.Page, **params):
   Displays a form view for adding new data to a given model.
@@ -67,9 +71,15 @@ def show_model_list(page: ft.Page, **params):
 
 def show_data_list(page: ft.Page, **params):
     model_name = params["model_name"]
+    where, order_by, limit = get_query_spec(model_name, params)
     controls = data_list_view(
         page=page,
         model_name=model_name,
+        after=to_int(params.get("after")),
+        limit=limit,
+        where=where,
+        order_by=order_by,
+        search=params.get("q"),
     )
     show_page(
         page=page,
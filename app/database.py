@@ -0,0 +1,181 @@
+"""
+Database Module
+
+This module builds the database connection used by the models. The connection
+is a pooled SQLite database : every thread (Flet runs each session's handlers
+on worker threads) gets its own connection from the pool, and every connection
+is opened with the pragmas below. A connection goes back to the pool when its
+thread closes it : routes and event handlers run inside app.utils.db_connection,
+and the writer thread returns its connection after each batch. When every
+connection is in use, connecting waits up to `timeout` seconds for one.
+
+Key Components:
+
+- DEFAULT_PRAGMAS:
+  WAL journal (readers don't block the writer), synchronous=NORMAL (safe with WAL),
+  a larger page cache, memory-mapped reads and a busy timeout so that concurrent
+  writers wait for the lock instead of failing with "database is locked".
+
+- create_database(path, pragmas, max_connections, stale_timeout, timeout):
+  Creates the database. Defaults come from `settings.py`.
+
+- RETURNING_SUPPORTED:
+  Whether the SQLite library supports INSERT ... RETURNING (3.35+). The bulk
+  helpers in app.utils read the inserted rows back with a SELECT otherwise.
+
+- query_counter:
+  Number of statements executed on the current thread (see app.utils.count_queries).
+
+- DatabaseWriter(db, max_batch, linger):
+  A single writer thread for database mutations. Jobs are queued with `submit()`,
+  which returns a Future, and are executed in batches : each batch is one
+  transaction, each job runs in its own savepoint so a failing job only rolls
+  back itself. Many small writes share one commit instead of contending for
+  SQLite's write lock (see app.utils.write).
+
+Custom Configuration:
+Override the defaults in `settings.py` (or with the DATABASE_* environment variables,
+DATABASE_PRAGMAS given as a JSON object):
+
+DATABASE_PATH = "database/your.db"
+DATABASE_PRAGMAS = {"cache_size": -128000}
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from playhouse.pool import PooledSqliteDatabase
+import settings
+
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size": -64 * 1024,           # KiB
+    "mmap_size": 256 * 1024 * 1024,     # bytes
+    "busy_timeout": 5000,               # ms
+    "temp_store": "memory",
+}
+
+
+RETURNING_SUPPORTED = PooledSqliteDatabase.server_version >= (3, 35, 0)
+
+
+class _QueryCounter(threading.local):
+    count = 0
+
+query_counter = _QueryCounter()
+
+class CountingPooledSqliteDatabase(PooledSqliteDatabase):
+    # counts executed statements per thread (see app.utils.count_queries)
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        query_counter.count += 1
+        return super().execute_sql(sql, params, *args, **kwargs)
+
+
+def create_database(
+        path: str=None,
+        pragmas: dict=None,
+        max_connections: int=None,
+        stale_timeout: int=None,
+        timeout: int=None,
+    ):
+    return CountingPooledSqliteDatabase(
+        path or settings.DATABASE_PATH,
+        pragmas={**DEFAULT_PRAGMAS, **settings.DATABASE_PRAGMAS, **(pragmas or {})},
+        max_connections=max_connections or settings.DATABASE_MAX_CONNECTIONS,
+        stale_timeout=stale_timeout or settings.DATABASE_STALE_TIMEOUT,
+        timeout=settings.DATABASE_POOL_TIMEOUT if timeout is None else timeout,
+        check_same_thread=False,
+    )
+
+
+class DatabaseWriter:
+    def __init__(self, db, max_batch: int=None, linger: float=None):
+        self.db = db
+        self.max_batch = max_batch or settings.DATABASE_WRITER_MAX_BATCH
+        self.linger = settings.DATABASE_WRITER_LINGER if linger is None else linger
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # nested write from inside a job : already in the writer's transaction
+            self._call(future, fn, args, kwargs)
+            return future
+        self._ensure_started()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+                    self._thread.start()
+
+    def _next_batch(self):
+        job = self._queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.max_batch:
+            try:
+                job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            # the connection goes back to the pool between batches
+            with self.db.connection_context():
+                self._execute(batch)
+
+    def _call(self, future, fn, args, kwargs):
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _execute(self, batch):
+        results = []
+        try:
+            with self.db.atomic():
+                for future, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with self.db.atomic():
+                            results.append((future, fn(*args, **kwargs), None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            # the batch could not be committed
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # results are published once the transaction is committed
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
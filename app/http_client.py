@@ -0,0 +1,418 @@
+"""
+HTTP Client Module
+
+This module provides the HTTP client used for scraping external sites.
+Responses are kept in a persistent on-disk cache keyed by URL, so pages
+fetched recently are served locally.
+
+Key Components:
+
+- ResponseCache(path, max_bytes):
+  A SQLite-backed response store (bodies are zlib-compressed). When the stored
+  size exceeds `max_bytes`, the least recently used responses are evicted.
+  Writes (`store`, `touch`, eviction) are queued to a writer thread of their own
+  and committed in batches, so fetching threads never wait for them ; `flush()`
+  waits until the queued writes are committed.
+
+- RateLimiter(rate, burst):
+  A token bucket per host : `acquire(url)` blocks until a request to that host
+  is allowed, so at most `rate` requests per second (after a `burst`) reach it.
+
+- CircuitBreaker(failure_threshold, reset_timeout):
+  Per host : after `failure_threshold` consecutive failures, requests to the host
+  fail at once with CircuitOpenError for `reset_timeout` seconds, then one trial
+  request decides whether it closes again.
+
+- LatencyHistogram():
+  Request latencies in fixed buckets, with percentiles (`summary()`).
+
+- HTTPClient(session, cache, ttl, rate_limiter, timeout, retries, backoff, circuit_breaker, hedge_after):
+  `get(url, ttl=None)` returns the cached response while it is younger than `ttl`
+  seconds. Older responses are revalidated with If-None-Match / If-Modified-Since,
+  and a 304 answer refreshes the cached copy instead of downloading it again.
+  Only 200 responses are cached. Requests that reach the network wait for the
+  rate limiter; cache hits do not.
+  Every request has a (connect, read) `timeout`. Connection errors, timeouts and
+  429 / 5xx answers are retried `retries` times with exponential backoff
+  (`backoff`, doubled on each attempt, with jitter). When `hedge_after` is set,
+  a second identical request is sent if the first has not answered after
+  `hedge_after` seconds, and the first answer wins.
+  `stats()` returns the cache and retry counters, and a latency summary per host.
+
+Custom Configuration:
+The cache location, size and TTL, and the timeouts, retries, circuit breaker
+and hedging defaults are set in `settings.py` (HTTP_*).
+Pass ttl=0 to `get` to always revalidate.
+"""
+
+import atexit
+import bisect
+import json
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from urllib.parse import urlsplit
+import requests
+from peewee import Model, CharField, IntegerField, FloatField, BlobField, TextField, fn
+from app.database import create_database, DatabaseWriter
+import settings
+
+
+class CachedResponse:
+    """
+    A response served from the cache (same attributes as requests.Response that scrapers use).
+    """
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(requests.utils.get_encoding_from_headers(self.headers) or "utf-8", errors="replace")
+
+
+class ResponseCache:
+    # level 1 compresses a page about twice as fast as the default, for bodies ~15% larger
+    compression_level = 1
+
+    def __init__(self, path: str=None, max_bytes: int=None):
+        self.db = create_database(path or settings.HTTP_CACHE_PATH)
+        self.max_bytes = max_bytes or settings.HTTP_CACHE_MAX_BYTES
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self.writer = DatabaseWriter(self.db)
+        self._evict_pending = False
+        self._lock = threading.Lock()
+        atexit.register(self.writer.stop)
+
+        class Entry(Model):
+            url = CharField(primary_key=True)
+            status_code = IntegerField()
+            headers = TextField()
+            body = BlobField()
+            size = IntegerField()
+            etag = CharField(null=True)
+            last_modified = CharField(null=True)
+            fetched_at = FloatField()
+            accessed_at = FloatField(index=True)
+
+            class Meta:
+                database = self.db
+                table_name = "http_response"
+
+        self.Entry = Entry
+        with self.db.connection_context():
+            self.db.create_tables([Entry])
+
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    # fetches run on short-lived worker threads : hand each connection back to the pool right away
+
+    def get(self, url: str):
+        with self.db.connection_context():
+            return self.Entry.get_or_none(self.Entry.url == url)
+
+    def to_response(self, entry):
+        return CachedResponse(entry.url, entry.status_code, json.loads(entry.headers), zlib.decompress(entry.body))
+
+    # writes run on the writer thread (in its transaction) : they return a Future and nobody waits for them
+
+    def touch(self, entry, revalidated: bool=False):
+        now = time.time()
+        values = {self.Entry.accessed_at: now}
+        if revalidated:
+            values[self.Entry.fetched_at] = now
+        return self.writer.submit(self.Entry.update(values).where(self.Entry.url == entry.url).execute)
+
+    def store(self, url: str, response):
+        future = self.writer.submit(self._store, url, response.status_code, response.headers, response.content, time.time())
+        with self._lock:
+            schedule_evict = not self._evict_pending
+            self._evict_pending = True
+        if schedule_evict:
+            # one eviction pass after the stores queued so far
+            self.writer.submit(self._evict)
+        return future
+
+    def flush(self):
+        self.writer.submit(lambda: None).result()
+
+    def _store(self, url: str, status_code: int, headers, content: bytes, now: float):
+        body = zlib.compress(content, self.compression_level)
+        self.Entry.replace(
+            url=url,
+            status_code=status_code,
+            headers=json.dumps(dict(headers)),
+            body=body,
+            size=len(body),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            fetched_at=now,
+            accessed_at=now,
+        ).execute()
+
+    def _evict(self):
+        # least recently used first, until the cache fits in max_bytes
+        with self._lock:
+            self._evict_pending = False
+        total = self.Entry.select(fn.SUM(self.Entry.size)).scalar() or 0
+        if total <= self.max_bytes:
+            return
+        urls = []
+        for url, size in self.Entry.select(self.Entry.url, self.Entry.size).order_by(self.Entry.accessed_at).tuples():
+            urls.append(url)
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self.Entry.delete().where(self.Entry.url.in_(urls)).execute()
+        with self._lock:
+            self.counters["evictions"] += len(urls)
+
+    def clear(self):
+        # after the writes already queued
+        self.writer.submit(self.Entry.delete().execute).result()
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str):
+        if not self.rate:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (self.burst, now))
+            # tokens go negative for requests waiting their turn
+            tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+            self._buckets[host] = (tokens, now)
+        if tokens < 0:
+            time.sleep(-tokens / self.rate)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int=None, reset_timeout: float=None):
+        self.failure_threshold = failure_threshold or settings.HTTP_CIRCUIT_FAILURES
+        self.reset_timeout = settings.HTTP_CIRCUIT_RESET if reset_timeout is None else reset_timeout
+        # host -> (consecutive failures, opened at or None)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str):
+        with self._lock:
+            failures, opened_at = self._hosts.get(host, (0, None))
+            if opened_at is None:
+                return
+            if time.monotonic() - opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"circuit open for {host}")
+            # half open : let this request through, the others keep failing until it answers
+            self._hosts[host] = (failures, time.monotonic())
+
+    def record_success(self, host: str):
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        with self._lock:
+            failures, opened_at = self._hosts.get(host, (0, None))
+            failures += 1
+            if failures >= self.failure_threshold:
+                opened_at = time.monotonic()
+            self._hosts[host] = (failures, opened_at)
+
+    def is_open(self, host: str):
+        with self._lock:
+            return self._hosts.get(host, (0, None))[1] is not None
+
+
+class LatencyHistogram:
+    # bucket upper bounds in milliseconds
+    bounds = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+            self.count += 1
+            self.total += ms
+            self.max = max(self.max, ms)
+
+    def percentile(self, p: float):
+        # upper bound of the bucket holding the p-th percentile (in ms)
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + [self.max], self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": {label: count for label, count in zip(self._labels(), self.counts) if count},
+        }
+
+    def _labels(self):
+        return [f"<={bound}ms" for bound in self.bounds] + [f">{self.bounds[-1]}ms"]
+
+
+class HTTPClient:
+    retry_statuses = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            session: requests.Session=None,
+            cache: ResponseCache=None,
+            ttl: float=None,
+            rate_limiter: RateLimiter=None,
+            timeout: tuple=None,
+            retries: int=None,
+            backoff: float=None,
+            circuit_breaker: CircuitBreaker=None,
+            hedge_after: float=None,
+        ):
+        self.session = session or requests.Session()
+        self.cache = cache
+        self.ttl = settings.HTTP_CACHE_TTL if ttl is None else ttl
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout or (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+        self.retries = settings.HTTP_RETRIES if retries is None else retries
+        self.backoff = settings.HTTP_RETRY_BACKOFF if backoff is None else backoff
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.hedge_after = settings.HTTP_HEDGE_AFTER if hedge_after is None else hedge_after
+        self.counters = {"requests": 0, "retries": 0, "failures": 0, "hedges": 0, "hedge_wins": 0}
+        self.latency = {}
+        self._hedge_pool = None
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _histogram(self, host: str):
+        with self._lock:
+            if host not in self.latency:
+                self.latency[host] = LatencyHistogram()
+            return self.latency[host]
+
+    def _request(self, url: str, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        return self.session.get(url, **kwargs)
+
+    def _hedged_request(self, url: str, **kwargs):
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="http-hedge")
+        first = self._hedge_pool.submit(self._request, url, **kwargs)
+        try:
+            return first.result(timeout=self.hedge_after)
+        except FutureTimeoutError:
+            pass
+        # the first request is slow : race a second one against it, the loser is left to finish unused
+        self._count("hedges")
+        second = self._hedge_pool.submit(self._request, url, **kwargs)
+        for future in as_completed([first, second]):
+            if future.exception() is None:
+                if future is second:
+                    self._count("hedge_wins")
+                return future.result()
+        return first.result()
+
+    def _send(self, url: str, **kwargs):
+        host = urlsplit(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+        self._count("requests")
+        start = time.monotonic()
+        try:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self._count("retries")
+                    time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                self.circuit_breaker.before_request(host)
+                try:
+                    if self.hedge_after:
+                        response = self._hedged_request(url, **kwargs)
+                    else:
+                        response = self._request(url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    self.circuit_breaker.record_failure(host)
+                    if attempt == self.retries:
+                        raise
+                    continue
+                if response.status_code not in self.retry_statuses:
+                    self.circuit_breaker.record_success(host)
+                    return response
+                self.circuit_breaker.record_failure(host)
+                if attempt == self.retries:
+                    return response
+        except requests.RequestException:
+            self._count("failures")
+            raise
+        finally:
+            self._histogram(host).record(time.monotonic() - start)
+
+    def get(self, url: str, ttl: float=None, **kwargs):
+        if self.cache is None:
+            return self._send(url, **kwargs)
+        ttl = self.ttl if ttl is None else ttl
+
+        entry = self.cache.get(url)
+        if entry is not None and time.time() - entry.fetched_at < ttl:
+            self.cache.count("hits")
+            self.cache.touch(entry)
+            return self.cache.to_response(entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        response = self._send(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.count("revalidated")
+            self.cache.touch(entry, revalidated=True)
+            return self.cache.to_response(entry)
+        self.cache.count("misses")
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def stats(self):
+        stats = dict(self.counters)
+        if self.cache is not None:
+            stats.update(self.cache.counters)
+        stats["latency"] = {host: histogram.summary() for host, histogram in list(self.latency.items())}
+        return stats
@@ -1,6 +1,13 @@
-from peewee import SqliteDatabase, Model, CharField, BooleanField, ForeignKeyField
+from peewee import Model, CharField, BooleanField, DateTimeField, ForeignKeyField, chunked, fn
+from playhouse.migrate import SqliteMigrator, migrate
+from playhouse.sqlite_ext import FTS5Model, SearchField, RowIDField
+import atexit
+import sys
+from app.database import create_database, query_counter, DatabaseWriter
 
-db = SqliteDatabase('database/fletmvc.db')
+db = create_database()
+writer = DatabaseWriter(db)
+atexit.register(writer.stop)
 
 # Models Module
 #
@@ -9,6 +16,13 @@ db = SqliteDatabase('database/fletmvc.db')
 #
 # Key Components:
 #
+# - db / query_counter:
+#   The pooled database connection (see app/database.py), which counts the
+#   statements executed on each thread.
+#
+# - writer:
+#   The single writer thread all mutations go through (see app.utils.write).
+#
 # - BaseModel:
 #   A base class for all models, providing common functionality and database connection.
 #
@@ -27,8 +41,42 @@ db = SqliteDatabase('database/fletmvc.db')
 #     # Add more fields as needed
 #
 # Remember to add your new model to the create_tables() call at the end of this file.
+# New fields on an existing model must be nullable or have a default : they are
+# added to the existing table by add_missing_columns() at startup.
+#
+# Unique constraints over several fields are declared in the model's Meta
+# (see Summoner) ; upsert_many needs one over its conflict fields. When such an
+# index is added to an existing table that has duplicate rows, startup stops with
+# the rows found by find_duplicates() ; remove them explicitly, keeping the most
+# recent row of each group, with:
+#
+#     python -m app.models --remove-duplicates
+#
+# which prints every deleted row, then creates the index.
+#
+# Filtering and Sorting:
+# Generic data lists (see app.utils.get_query_spec) only filter and sort on
+# indexed fields : the primary key, foreign keys and fields declared with
+# index=True or unique=True. Their indexes are created with the tables at
+# startup (existing tables included).
+#
+# Full-Text Search:
+# To make a model searchable (see app.utils.search_condition), register the
+# fields to index after the model definition:
+#
+# full_text_index(YourModel, "field1", "field3")
+#
+# A trigram FTS5 table "<table>_fts" is created and filled from the existing
+# rows; add_data / update_data / delete_data keep it in sync.
 
 class BaseModel(Model):
+    # bumped whenever a model class is defined (see app.utils.get_registered_models)
+    registry_version = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        BaseModel.registry_version += 1
+
     class Meta:
         database = db
 
@@ -38,22 +86,116 @@ class User(BaseModel):
     salt = CharField()
     
 class Task(BaseModel):
-    title = CharField(100)
+    title = CharField(100, index=True)
     description = CharField(255)
-    is_done = BooleanField(default=False)
+    is_done = BooleanField(default=False, index=True)
     created_by = ForeignKeyField(User, backref='tasks')
 
 class Summoner(BaseModel):
     region = CharField()
-    summoner_name = CharField()
+    summoner_name = CharField(index=True)
     tag = CharField()
     player_icon = CharField()
     rank = CharField()
     lp = CharField()
     score = CharField()
-    is_active = BooleanField(default=True)
+    is_active = BooleanField(default=True, index=True)
     champs_name = CharField()
     champs_point = CharField()
-    
-db.connect()
-db.create_tables([User, Task, Summoner])
\ No newline at end of file
+    last_refreshed_at = DateTimeField(null=True, index=True)
+    # set when rank / LP are edited by hand : the roster refresh leaves them alone
+    rank_edited_at = DateTimeField(null=True)
+
+    class Meta:
+        # one row per account : Quick Add upserts on it
+        indexes = ((("region", "summoner_name", "tag"), True),)
+
+# full-text search
+search_indexes = {}
+
+def full_text_index(model, *field_names):
+    class Meta:
+        database = db
+        table_name = f"{model._meta.table_name}_fts"
+        options = {"tokenize": "trigram"}
+
+    attrs = {"rowid": RowIDField(), "Meta": Meta}
+    attrs.update({field_name: SearchField() for field_name in field_names})
+    search_indexes[model] = type(f"{model.__name__}SearchIndex", (FTS5Model,), attrs)
+    return search_indexes[model]
+
+def rebuild_search_index(model):
+    index = search_indexes[model]
+    field_names = [name for name in index._meta.sorted_field_names if name != "rowid"]
+    with db.atomic():
+        index.delete().execute()
+        index.insert_from(
+            model.select(model._meta.primary_key, *[getattr(model, name) for name in field_names]),
+            [index.rowid, *[getattr(index, name) for name in field_names]],
+        ).execute()
+
+full_text_index(Task, "title", "description")
+full_text_index(Summoner, "summoner_name", "tag")
+
+# schema migration : fields added to a model after its table was created
+def add_missing_columns(models):
+    migrator = SqliteMigrator(db)
+    for model in models:
+        if not model.table_exists():
+            continue
+        columns = {column.name for column in db.get_columns(model._meta.table_name)}
+        missing = [field for field in model._meta.sorted_fields if field.column_name not in columns]
+        if missing:
+            migrate(*[migrator.add_column(model._meta.table_name, field.column_name, field) for field in missing])
+            model._schema.create_indexes(safe=True)
+
+# schema migration : unique indexes declared after the table was created
+def find_duplicates(models):
+    # {(model, index name): ids} : the rows that keep a declared unique index from being created,
+    # every row of a duplicate group but the most recent one
+    duplicates = {}
+    for model in models:
+        if not model.table_exists():
+            continue
+        existing = {index.name for index in db.get_indexes(model._meta.table_name)}
+        for index in model._meta.fields_to_index():
+            if not index._unique or index._name in existing:
+                continue
+            primary_key = model._meta.primary_key
+            latest = model.select(fn.MAX(primary_key)).group_by(*index._expressions)
+            ids = [id for id, in model.select(primary_key).where(primary_key.not_in(latest)).order_by(primary_key).tuples()]
+            if ids:
+                duplicates[(model, index._name)] = ids
+    return duplicates
+
+def remove_duplicates(models):
+    # deletes the rows found by find_duplicates, returns them ; never run implicitly (see __main__ below)
+    duplicates = find_duplicates(models)
+    with db.atomic():
+        for (model, index_name), ids in duplicates.items():
+            search_index = search_indexes.get(model)
+            for batch in chunked(ids, 500):
+                model.delete().where(model._meta.primary_key.in_(batch)).execute()
+                if search_index is not None and search_index.table_exists():
+                    search_index.delete().where(search_index.rowid.in_(batch)).execute()
+    return duplicates
+
+
+db.connect(reuse_if_open=True)
+if __name__ == "__main__" and "--remove-duplicates" in sys.argv[1:]:
+    for (model, index_name), ids in remove_duplicates([User, Task, Summoner]).items():
+        print(f"{model.__name__} {index_name} : {len(ids)} rows deleted {' '.join(map(str, ids))}")
+_duplicates = find_duplicates([User, Task, Summoner])
+if _duplicates:
+    db.close()
+    raise RuntimeError(
+        "Duplicate rows keep unique indexes from being created ("
+        + ", ".join(f"{model.__name__} {index_name} : {len(ids)} rows" for (model, index_name), ids in _duplicates.items())
+        + "). Run `python -m app.models --remove-duplicates` to keep the most recent row of each group."
+    )
+new_search_indexes = [model for model, index in search_indexes.items() if not index.table_exists()]
+add_missing_columns([User, Task, Summoner])
+db.create_tables([User, Task, Summoner, *search_indexes.values()])
+for model in new_search_indexes:
+    rebuild_search_index(model)
+db.close()
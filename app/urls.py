@@ -1,6 +1,8 @@
 from app.controller import *
 import flet as ft
 import re
+from urllib.parse import parse_qsl
+import settings
 
 # URLs Module
 #
@@ -11,7 +13,13 @@ import re
 #
 # - routes: A dictionary mapping URL patterns to controller functions.
 # - _convert_route_to_regex(route: str): Converts a route pattern to a regex pattern.
+# - resolve_route(route: str): Returns the (controller, params) pair matching a route.
 # - handle_route(page: ft.Page, route: str): Handles routing for the application.
+#   Query parameters (e.g. "/data/task?after=100&limit=50") are passed to the
+#   controller as keyword arguments alongside the route parameters.
+#   The controller runs with a pooled database connection, returned to the pool afterwards.
+#   With settings.DEBUG_QUERIES enabled, the number of SQL queries executed
+#   while rendering each route is printed.
 #
 # Custom Routes:
 # To add a new route, add an entry to the `routes` dictionary:
@@ -19,12 +27,66 @@ import re
 # routes = {
 #     # ... existing routes ...
 #     "/your/new/route/<param>": your_controller_function,
+#     "/your/new/route/<int:id>": your_other_controller_function,
 # }
 #
+# Parameters can be typed with a converter prefix (`str`, `int`, `path`).
+# Untyped parameters (`<param>`) behave like `<str:param>`.
+#
+# All routes are compiled into a single regular expression the first time
+# a route is dispatched, and recompiled whenever `routes` is modified.
+#
 # Make sure to create the corresponding controller function in `controller.py`.
 
 
-routes = {
+# parameter converters : name -> (regex, python type)
+converters = {
+    "str": (r"[^/]+", str),
+    "int": (r"\d+", int),
+    "path": (r".+", str),
+}
+
+
+class _Routes(dict):
+    # dict that drops the compiled dispatcher whenever it is modified
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        _invalidate_routes()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _invalidate_routes()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        _invalidate_routes()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        _invalidate_routes()
+
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        _invalidate_routes()
+        return result
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        _invalidate_routes()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        _invalidate_routes()
+        return result
+
+    def clear(self):
+        super().clear()
+        _invalidate_routes()
+
+
+routes = _Routes({
     "/": show_home,
     "/data": show_model_list,
     "/data/<model_name>": show_data_list,
@@ -34,17 +96,70 @@ routes = {
     "/user_page": show_user_page,
     "/sample-apps": show_sample_apps,
     "/sample-apps/<app_name>": show_app,
-}
+})
+
+_compiled_routes = None
+
+
+def _invalidate_routes():
+    global _compiled_routes
+    _compiled_routes = None
+
+def _convert_route_to_regex(route: str, prefix: str=""):
+    params = []
+
+    def _replace(match):
+        converter_name, _, param_name = match.group(1).rpartition(":")
+        converter_name = converter_name or "str"
+        if converter_name not in converters:
+            raise ValueError(f"Unknown converter \"{converter_name}\" in route \"{route}\"")
+        regex, convert = converters[converter_name]
+        group_name = f"{prefix}{param_name}"
+        params.append((param_name, group_name, convert))
+        return f"(?P<{group_name}>{regex})"
+
+    parts = re.split(r"(<[^>]+>)", route)
+    regex = "".join(
+        _replace(re.match(r"<([^>]+)>", part)) if i % 2 else re.escape(part)
+        for i, part in enumerate(parts)
+    )
+    return regex, params
+
+def _compile_routes():
+    alternatives = []
+    targets = []
+    for i, (pattern, controller) in enumerate(routes.items()):
+        regex, params = _convert_route_to_regex(pattern, prefix=f"_r{i}_")
+        alternatives.append(f"(?P<_r{i}>{regex})")
+        targets.append((controller, params))
+    return re.compile(f"^(?:{'|'.join(alternatives)})$"), targets
+
+def resolve_route(route: str):
+    global _compiled_routes
+    if _compiled_routes is None:
+        _compiled_routes = _compile_routes()
+    regex, targets = _compiled_routes
 
-def _convert_route_to_regex(route: str):
-    return re.sub(r"<([^>]+)>", r"(?P<\1>[^/]+)", route)
+    match = regex.match(route)
+    if match is None:
+        return None, {}
+    # the outer group of each alternative closes last, so lastgroup is "_r<i>"
+    controller, params = targets[int(match.lastgroup[2:])]
+    return controller, {
+        param_name: convert(match.group(group_name))
+        for param_name, group_name, convert in params
+    }
 
 def handle_route(page: ft.Page, route: str):
-    for pattern, controller in routes.items():
-        regex_pattern = _convert_route_to_regex(pattern)
-        match = re.match(f"^{regex_pattern}$", route)
-        if match:
-            params = match.groupdict()
-            controller(page=page, **params)
-            return
-    show_404(page=page, route=route)
\ No newline at end of file
+    path, _, query = route.partition("?")
+    controller, params = resolve_route(path)
+    if exists(controller):
+        # query parameters (?key=value) are passed along, route parameters take precedence
+        query_params = {key: value for key, value in parse_qsl(query) if key != "page"}
+        with db_connection(), count_queries() as queries:
+            controller(page=page, **{**query_params, **params})
+        if settings.DEBUG_QUERIES:
+            print(f"[{route}] {queries['count']} queries")
+        return
+    with db_connection():
+        show_404(page=page, route=route)
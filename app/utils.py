@@ -7,14 +7,55 @@ for various purposes such as data manipulation, model operations, and view helpe
 Key Components:
 
 - exists(x): Checks if a value is not None.
+- to_int(x, default=None): Converts a value (e.g. a query parameter) to int, or returns the default.
 - get_items(model_or_data): Yields (field_name, field_value) pairs for a model or data instance.
+- get_registered_models(): Returns the registered models by lowercase name (rebuilt only when a model is defined).
 - get_model_by_name(model_name): Returns the model class corresponding to a given name.
-- get_data_list(model_name): Retrieves all data entries for a given model.
+- get_model_info(model_name): Returns the cached ModelInfo (field lists, editable fields, input converters) of a model.
+- select_related(model): Selects a model joined with its foreign-key targets, so reading them costs no extra query.
+- count_queries(): Context manager counting the SQL statements executed on the current thread.
+- db_connection() / with_connection(handler): Context manager / decorator giving the current thread a pooled
+  connection and handing it back afterwards. Routes run inside one (see app.urls.handle_route) ;
+  decorate event handlers that query the database, so Flet's worker threads don't keep connections.
+- get_data_list(model_name, where=None, order_by=None, limit=None, search=None, indexed_only=False): Retrieves data entries for a given model.
+- get_data_page(model_name, after=None, before=None, limit=None, where=None, order_by=None, search=None, indexed_only=False): Retrieves one page of data entries by keyset.
+- page_size(limit): A page size within 1..settings.MAX_PAGE_SIZE (settings.DEFAULT_PAGE_SIZE when missing or invalid).
+- get_query_spec(model_name, params): Extracts where / order_by / limit specs from route or query parameters.
+
+  Query specs are evaluated in SQL:
+  - where: {"field": value, "field__lookup": value} with lookups eq, ne, lt, le, gt, ge, in, contains, startswith
+    (given as f_<field> / f_<field>__<lookup> query parameters).
+  - order_by: "-field1,field2" or a list of field names (prefix "-" for descending) and peewee expressions.
+    NULL sorts first in ascending order and last in descending order.
+  - limit: maximum number of rows.
+  - search: free text matched through the model's full-text index (see app.models.full_text_index).
+  With indexed_only=True, as for specs read from the URL (see templates.components.basic.data_lv), only indexed
+  fields (primary key, index=True, unique=True, foreign keys) can be filtered or sorted on ; declare the index on
+  the model (see app/models.py), other fields raise ValueError. Code calling the helpers can use any field.
 - get_data_by_id(model_name, id): Retrieves a specific data entry by its ID.
-- add_data(model_name, data_dict): Adds a new data entry for a given model.
-- update_data(model_name, id, data_dict): Updates an existing data entry.
-- delete_data(model_name, id): Deletes a specific data entry.
-- show_page(page, route, controls): Updates the page with new controls and route.
+- write(fn, *args, wait=True, **kwargs): Runs a mutation on the single database writer thread.
+- add_data(model_name, data_dict, wait=True): Adds a new data entry for a given model.
+- update_data(model_name, id, data_dict, wait=True): Updates an existing data entry.
+- delete_data(model_name, id, wait=True): Deletes a specific data entry.
+- add_data_many(model_name, data_dicts, chunk_size=100, wait=True): Inserts many entries with multi-row INSERTs.
+- upsert_many(model_name, data_dicts, conflict_fields, chunk_size=100, wait=True):
+  Inserts many entries, updating the existing ones that share `conflict_fields`. The model must declare a unique
+  index over them (see app/models.py), otherwise ValueError is raised.
+- update_many(model_name, ids, data_dict, chunk_size=100, wait=True): Applies the same changes to many entries.
+- update_each(model_name, data_by_id, chunk_size=100, wait=True): Applies different changes to many entries ({id: data_dict}).
+  Mutations go through `write`; pass wait=False to get a Future instead of blocking.
+  Event handlers should not wait : they pass wait=False and follow up with `when_written`.
+- when_written(page, future, on_done=None, on_error=None): Calls `on_done(result)` or `on_error(exception)`
+  on the page's handler threads once a write submitted with wait=False is committed (or failed).
+- on_write(model_name, callback): Calls `callback(model, field_names)` once a write through the functions above
+  is committed. `field_names` are the fields written, or None when unknown (deletes).
+  Bulk helpers run in one transaction, `chunk_size` rows per statement.
+- index_data(data) / unindex_data(model, id): Keep a model's full-text index in sync (called by the functions above).
+- search_condition(model, text): Full-text condition for a model, used by the `search` argument of the query functions.
+- reconcile_control(index, old, new): Lets a rebuilt control take over a mounted one, so only differences are sent.
+- show_page(page, route, controls, reconcile=True): Updates the page with new controls and route.
+  When the route is already shown, the mounted view is reconciled instead of rebuilt.
+  Give controls a `key` to keep their identity when siblings are inserted or removed.
 
 Custom Utilities:
 To add a new utility function, simply define it in this file:
@@ -26,9 +67,15 @@ def your_custom_utility(arg1, arg2):
 You can then import and use your custom utility in other parts of the application.
 """
 
+import functools
+import operator
 import os
 import re
+from contextlib import contextmanager
 import flet as ft
+import settings
+from peewee import JOIN, EXCLUDED, SQL, Model, IntegerField, FloatField, Tuple, chunked
+from app.database import RETURNING_SUPPORTED
 from app.models import *
 
 
@@ -36,81 +83,537 @@ from app.models import *
 def exists(x):
     return x is not None
 
+def to_int(x, default=None):
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return default
+
 # models
-def get_items(model_or_data):
-    for field_name in model_or_data._meta.fields.keys():
-        if isinstance(model_or_data, type):
-            field_value = None
-        else:
-            field_value = getattr(model_or_data, field_name)
-        yield (field_name, field_value)
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.lower() in ["1", "true", "yes", "on"]
+    return bool(value)
+
+def _get_converter(field):
+    # converts user input (e.g. a form or query parameter string) to the field's python type
+    if isinstance(field, ForeignKeyField):
+        return _get_converter(field.rel_field)
+    if isinstance(field, BooleanField):
+        return _parse_bool
+    if isinstance(field, IntegerField):
+        return int
+    if isinstance(field, FloatField):
+        return float
+    return lambda value: value
+
+
+class ModelInfo:
+    """
+    Field metadata of a registered model, computed once per model definition.
+    """
+
+    non_editable_field_names = ["id", "salt"]
+
+    def __init__(self, model):
+        self.model = model
+        self.name = model.__name__.lower()
+        self.fields = list(model._meta.fields.values())
+        self.field_names = [field.name for field in self.fields]
+        self.editable_field_names = [
+            field_name for field_name in self.field_names
+            if field_name not in self.non_editable_field_names
+        ]
+        self.foreign_keys = [field for field in self.fields if isinstance(field, ForeignKeyField)]
+        self.converters = {field.name: _get_converter(field) for field in self.fields}
+
+    def convert(self, data_dict):
+        return {
+            field_name: self.converters[field_name](field_value) if field_name in self.converters else field_value
+            for field_name, field_value in data_dict.items()
+        }
+
+
+_model_registry = {"version": None, "models": {}, "infos": {}}
+
+def _refresh_model_registry():
+    # rebuilt only when a model class has been defined since the last build
+    if _model_registry["version"] != BaseModel.registry_version:
+        models = {cls.__name__.lower(): cls for cls in BaseModel.__subclasses__()}
+        _model_registry["infos"] = {model: ModelInfo(model) for model in models.values()}
+        _model_registry["models"] = models
+        _model_registry["version"] = BaseModel.registry_version
+    return _model_registry
 
 def get_registered_models():
-    return {cls.__name__.lower(): cls for cls in BaseModel.__subclasses__()}
+    return _refresh_model_registry()["models"]
 
 def get_model_by_name(model_name):
     if isinstance(model_name, str):
         return get_registered_models().get(model_name.lower(), None)
     return model_name
 
+def get_model_info(model_name):
+    model = get_model_by_name(model_name)
+    if isinstance(model, Model):
+        model = type(model)
+    infos = _refresh_model_registry()["infos"]
+    if model not in infos and isinstance(model, type) and issubclass(model, BaseModel):
+        infos[model] = ModelInfo(model)
+    return infos.get(model, None)
+
+def get_items(model_or_data):
+    field_names = get_model_info(model_or_data).field_names
+    if isinstance(model_or_data, type):
+        for field_name in field_names:
+            yield (field_name, None)
+    else:
+        for field_name in field_names:
+            yield (field_name, getattr(model_or_data, field_name))
+
+def select_related(model):
+    # select a model together with the rows its foreign keys point to (one query, no N+1)
+    selected = [model]
+    query = model.select()
+    for field in get_model_info(model).foreign_keys:
+        rel_model = field.rel_model.alias()
+        selected.append(rel_model)
+        query = query.join_from(
+            model,
+            rel_model,
+            JOIN.LEFT_OUTER,
+            on=(field == getattr(rel_model, field.rel_field.name)),
+            attr=field.name,
+        )
+    return query.select(*selected)
+
+@contextmanager
+def count_queries():
+    result = {"count": 0}
+    start = query_counter.count
+    try:
+        yield result
+    finally:
+        result["count"] = query_counter.count - start
+
+@contextmanager
+def db_connection():
+    # a pooled connection for the current thread, handed back to the pool on exit
+    # unless it was already open (nested calls share the outer connection)
+    opened = db.connect(reuse_if_open=True)
+    try:
+        yield db
+    finally:
+        if opened and not db.is_closed():
+            db.close()
+
+def with_connection(handler):
+    # decorator for event handlers that query the database
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with db_connection():
+            return handler(*args, **kwargs)
+    return wrapper
+
+# query specs
+lookups = {
+    "eq": lambda field, value: field == value,
+    "ne": lambda field, value: field != value,
+    "lt": lambda field, value: field < value,
+    "le": lambda field, value: field <= value,
+    "gt": lambda field, value: field > value,
+    "ge": lambda field, value: field >= value,
+    "in": lambda field, value: field.in_(value.split(",") if isinstance(value, str) else value),
+    "contains": lambda field, value: field.contains(value),
+    "startswith": lambda field, value: field.startswith(value),
+}
+
+def _check_unique_index(model, fields):
+    # ON CONFLICT needs a unique index over the conflict target : declared on the model, created at startup
+    if len(fields) == 1 and fields[0].primary_key:
+        return
+    if not any(index._unique and set(index._expressions) == set(fields) for index in model._meta.fields_to_index()):
+        raise ValueError(f"Model \"{model.__name__}\" has no unique index on {', '.join(field.name for field in fields)}")
+
+def _get_field(model, field_name):
+    field = model._meta.fields.get(field_name)
+    if not exists(field):
+        raise ValueError(f"Unknown field \"{field_name}\" for model \"{model.__name__}\"")
+    return field
+
+def _get_queryable_field(model, field_name):
+    # only indexed columns can be filtered or sorted on : their indexes are declared on the
+    # models (index=True / unique=True) and created with the tables, never on the request path
+    field = _get_field(model, field_name)
+    if not (field.primary_key or field.index or field.unique):
+        raise ValueError(f"Field \"{field_name}\" of model \"{model.__name__}\" cannot be filtered or sorted on")
+    return field
+
+def _to_db_value(field, value):
+    # query parameters arrive as strings
+    if isinstance(field, BooleanField):
+        return _parse_bool(value)
+    return value
+
+def parse_where(model, where, indexed_only=False):
+    # {"is_done": "true", "title__contains": "foo"} -> [expression, ...]
+    get_field = _get_queryable_field if indexed_only else _get_field
+    expressions = []
+    for key, value in (where or {}).items():
+        field_name, _, lookup = key.partition("__")
+        field = get_field(model, field_name)
+        if (lookup or "eq") not in lookups:
+            raise ValueError(f"Unknown lookup \"{lookup}\"")
+        expressions.append(lookups[lookup or "eq"](field, _to_db_value(field, value)))
+    return expressions
+
+def parse_order_by(model, order_by, indexed_only=False):
+    # "-is_active,summoner_name" or ["-is_active", Summoner.score.desc()] -> [(field or expression, descending)]
+    get_field = _get_queryable_field if indexed_only else _get_field
+    if isinstance(order_by, str):
+        order_by = [name for name in order_by.split(",") if name.strip()]
+    ordering = []
+    for item in order_by or []:
+        if not isinstance(item, str):
+            ordering.append((item, None))
+            continue
+        item = item.strip()
+        field = get_field(model, item.lstrip("+-"))
+        ordering.append((field, item.startswith("-")))
+    return ordering
+
+def _order_expression(field, descending):
+    # NULL sorts as the smallest value, explicitly for nullable columns (see _keyset_condition)
+    nulls = ("last" if descending else "first") if getattr(field, "null", False) else None
+    return field.desc(nulls=nulls) if descending else field.asc(nulls=nulls)
+
+def _order_expressions(ordering, reverse=False):
+    return [
+        field if descending is None else _order_expression(field, descending != reverse)
+        for field, descending in ordering
+    ]
+
+def page_size(limit):
+    # query strings are untrusted : SQLite reads LIMIT -1 as "no limit"
+    limit = to_int(limit, default=settings.DEFAULT_PAGE_SIZE)
+    return min(max(limit, 1), settings.MAX_PAGE_SIZE)
+
+# prefix of filter parameters, so fields don't clash with limit / after / before / q / order_by
+FILTER_PREFIX = "f_"
+
+def get_query_spec(model_name, params):
+    # split route/query parameters into a where spec (f_<field> parameters), an order_by spec and a page size
+    model = get_model_by_name(model_name)
+    where = {}
+    if exists(model):
+        where = {
+            key[len(FILTER_PREFIX):]: value for key, value in params.items()
+            if key.startswith(FILTER_PREFIX) and key[len(FILTER_PREFIX):].partition("__")[0] in model._meta.fields
+        }
+    return where, params.get("order_by"), page_size(params.get("limit"))
+
+def search_condition(model, text):
+    # full-text match through the model's FTS5 index ; trigram matching needs 3+ characters,
+    # shorter texts (and models without an index) fall back to a LIKE scan
+    index = search_indexes.get(model)
+    if exists(index) and len(text) >= 3:
+        phrase = '"' + text.replace('"', '""') + '"'
+        return model._meta.primary_key.in_(index.select(index.rowid).where(index.match(phrase)))
+    fields = [
+        field for field in model._meta.fields.values()
+        if (field.name in index._meta.fields if exists(index) else isinstance(field, CharField))
+    ]
+    if not fields:
+        return None
+    return functools.reduce(operator.or_, [field.contains(text) for field in fields])
+
+def apply_query_spec(model, query, where=None, order_by=None, limit=None, search=None, indexed_only=False):
+    for expression in parse_where(model, where, indexed_only):
+        query = query.where(expression)
+    if search:
+        condition = search_condition(model, search)
+        if exists(condition):
+            query = query.where(condition)
+    ordering = parse_order_by(model, order_by, indexed_only)
+    if ordering:
+        query = query.order_by(*_order_expressions(ordering))
+    if exists(limit):
+        query = query.limit(limit)
+    return query
+
+def _beyond(field, value, larger):
+    # rows with a larger (or smaller) value, NULL being the smallest ; None when there are none
+    if value is None:
+        return field.is_null(False) if larger else None
+    if larger:
+        return field > value
+    return (field < value) | field.is_null() if field.null else field < value
+
+def _keyset_condition(ordering, anchor, forward=True):
+    # rows strictly after (or before) the anchor row in the given ordering :
+    # (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ...
+    conditions = []
+    for i, (field, descending) in enumerate(ordering):
+        condition = _beyond(field, getattr(anchor, field.name), larger=descending != forward)
+        if not exists(condition):
+            continue
+        for previous_field, _ in ordering[:i]:
+            value = getattr(anchor, previous_field.name)
+            condition &= previous_field.is_null() if value is None else previous_field == value
+        conditions.append(condition)
+    if not conditions:
+        return SQL("0")
+    return functools.reduce(operator.or_, conditions)
+
+
 # data manipulation
-def get_data_list(model_name):
+def get_data_list(model_name, where=None, order_by=None, limit=None, search=None, indexed_only=False):
     model = get_model_by_name(model_name)
     if exists(model):
-        return model.select()
+        return apply_query_spec(model, select_related(model), where, order_by, limit, search, indexed_only)
     return None
 
-def search_data(model_name, key, value):
+def get_data_page(model_name, after=None, before=None, limit=None, where=None, order_by=None, search=None, indexed_only=False):
+    # keyset pagination : `after`/`before` are a primary key or a row,
+    # rows are always returned in the requested order
+    model = get_model_by_name(model_name)
+    if not exists(model):
+        return None
+    limit = page_size(limit)
+    primary_key = model._meta.primary_key
+    ordering = parse_order_by(model, order_by, indexed_only)
+    if any(descending is None for _, descending in ordering):
+        raise ValueError("get_data_page only supports ordering by field names")
+    # fields compare with == into SQL expressions : test identity
+    if not any(field is primary_key for field, _ in ordering):
+        ordering.append((primary_key, False))
+
+    query = apply_query_spec(model, select_related(model), where, search=search, indexed_only=indexed_only)
+    forward = not exists(before)
+    anchor = before if exists(before) else after
+    if exists(anchor):
+        if not isinstance(anchor, Model):
+            anchor = model.select().where(primary_key == anchor).first()
+        if not exists(anchor):
+            return []
+        query = query.where(_keyset_condition(ordering, anchor, forward))
+    rows = list(query.order_by(*_order_expressions(ordering, reverse=not forward)).limit(limit))
+    return rows if forward else list(reversed(rows))
+
+def search_data(model_name, key, value, where=None, order_by=None, limit=None):
     model = get_model_by_name(model_name)
     if exists(model):
         try:
-            return model.select().where(getattr(model, key) == value)
+            query = model.select().where(getattr(model, key) == value)
+            return apply_query_spec(model, query, where, order_by, limit)
         except:
             return None
     return None
 
-def search_data_multiple(model_name, search_dict):
+def search_data_multiple(model_name, search_dict, order_by=None, limit=None):
     model = get_model_by_name(model_name)
     if exists(model):
         try:
-            query = model.select()
-            for key, value in search_dict.items():
-                query = query.where(getattr(model, key) == value)
-            return query
+            return apply_query_spec(model, model.select(), search_dict, order_by, limit)
         except:
             return None
     return None
 
 def get_data_by_id(model_name, id):
-    return search_data(model_name, "id", id).get()
+    model = get_model_by_name(model_name)
+    if exists(model):
+        return select_related(model).where(model._meta.primary_key == id).get()
+    return None
+
+def write(fn, *args, wait=True, **kwargs):
+    # run a mutation on the single writer thread ;
+    # wait=False returns a Future instead of the result
+    future = writer.submit(fn, *args, **kwargs)
+    return future.result() if wait else future
+
+def when_written(page, future, on_done=None, on_error=None):
+    # follow-ups run on the page's handler threads, never on the writer thread
+    def _callback(future):
+        error = future.exception()
+        if exists(error):
+            if exists(on_error):
+                page.run_thread(on_error, error)
+        elif exists(on_done):
+            page.run_thread(on_done, future.result())
+    future.add_done_callback(_callback)
+    return future
+
+# write listeners by model (see on_write)
+_write_listeners = {}
+
+def on_write(model_name, callback):
+    model = get_model_by_name(model_name)
+    if exists(model):
+        _write_listeners.setdefault(model, []).append(callback)
+
+def _notify_write(model, field_names):
+    for callback in _write_listeners.get(model, []):
+        callback(model, field_names)
+
+def _tracked(future, model, field_names, wait):
+    # listeners run once the write is committed ; when waiting, before returning to the caller
+    if wait:
+        try:
+            return future.result()
+        finally:
+            _notify_write(model, field_names)
+    future.add_done_callback(lambda _: _notify_write(model, field_names))
+    return future
+
+def _add_data(model, data_dict):
+    data = model.create(**data_dict)
+    index_data(data)
+    return data
+
+def _add_data_many(model, data_dicts, chunk_size):
+    rows = []
+    for chunk in chunked(data_dicts, chunk_size):
+        if RETURNING_SUPPORTED:
+            rows.extend(model.insert_many(chunk).returning(model).execute())
+        else:
+            # no RETURNING before SQLite 3.35 : one INSERT per row, read back by id
+            ids = [model.insert(data_dict).execute() for data_dict in chunk]
+            rows.extend(model.select().where(model._meta.primary_key.in_(ids)).order_by(model._meta.primary_key))
+    index_data_many(model, rows)
+    return rows
+
+def _upsert_many(model, data_dicts, conflict_fields, chunk_size):
+    conflict_target = [_get_field(model, field_name) for field_name in conflict_fields]
+    _check_unique_index(model, conflict_target)
+    rows = []
+    for chunk in chunked(data_dicts, chunk_size):
+        update_fields = {field_name for data_dict in chunk for field_name in data_dict} - set(conflict_fields)
+        query = model.insert_many(chunk).on_conflict(
+            conflict_target=conflict_target,
+            update={_get_field(model, field_name): getattr(EXCLUDED, _get_field(model, field_name).column_name) for field_name in update_fields},
+        )
+        if RETURNING_SUPPORTED:
+            rows.extend(query.returning(model).execute())
+        else:
+            # no RETURNING before SQLite 3.35 : read the rows back by their conflict fields
+            query.execute()
+            keys = [tuple(data_dict[field_name] for field_name in conflict_fields) for data_dict in chunk]
+            rows.extend(model.select().where(Tuple(*conflict_target).in_(keys)))
+    index_data_many(model, rows)
+    return rows
+
+def _update_many(model, ids, data_dict, chunk_size):
+    primary_key = model._meta.primary_key
+    count = 0
+    for chunk in chunked(ids, chunk_size):
+        count += model.update(**data_dict).where(primary_key.in_(chunk)).execute()
+        index = search_indexes.get(model)
+        if exists(index) and any(field_name in index._meta.fields for field_name in data_dict):
+            index_data_many(model, model.select().where(primary_key.in_(chunk)))
+    return count
+
+def _update_each(model, data_by_id, chunk_size):
+    # one UPDATE ... CASE statement per chunk of entries changing the same fields
+    primary_key = model._meta.primary_key
+    groups = {}
+    for id, data_dict in data_by_id.items():
+        groups.setdefault(tuple(sorted(data_dict)), []).append(model(**{primary_key.name: id}, **data_dict))
+    count = 0
+    index = search_indexes.get(model)
+    for field_names, instances in groups.items():
+        count += model.bulk_update(instances, [_get_field(model, field_name) for field_name in field_names], batch_size=chunk_size)
+        if exists(index) and any(field_name in index._meta.fields for field_name in field_names):
+            for chunk in chunked([instance._pk for instance in instances], chunk_size):
+                index_data_many(model, model.select().where(primary_key.in_(chunk)))
+    return count
+
+def _update_data(model, id, data_dict):
+    data = model.get_by_id(id)
+    for field_name, field_value in data_dict.items():
+        if hasattr(data, field_name):
+            setattr(data, field_name, field_value)
+    data.save()
+    index_data(data)
+    return data
+
+def _delete_data(model, id):
+    data = model.get_by_id(id)
+    data.delete_instance()
+    unindex_data(model, id)
+    return model
+
+def add_data(model_name, data_dict, wait=True):
+    model = get_model_by_name(model_name)
+    if exists(model):
+        return _tracked(write(_add_data, model, data_dict, wait=False), model, set(data_dict), wait)
+    return None
 
-def add_data(model_name, data_dict):
+def add_data_many(model_name, data_dicts, chunk_size=100, wait=True):
     model = get_model_by_name(model_name)
     if exists(model):
-        data = model.create(**data_dict)
-        data.save()
-        return data
+        data_dicts = list(data_dicts)
+        field_names = {field_name for data_dict in data_dicts for field_name in data_dict}
+        return _tracked(write(_add_data_many, model, data_dicts, chunk_size, wait=False), model, field_names, wait)
     return None
 
-def update_data(model_name, id, data_dict):
+def upsert_many(model_name, data_dicts, conflict_fields, chunk_size=100, wait=True):
     model = get_model_by_name(model_name)
     if exists(model):
-        data = model.get_by_id(id)
-        for field_name, field_value in data_dict.items():
-            if hasattr(data, field_name):
-                setattr(data, field_name, field_value)
-        data.save()
-        return data
+        data_dicts = list(data_dicts)
+        field_names = {field_name for data_dict in data_dicts for field_name in data_dict}
+        return _tracked(write(_upsert_many, model, data_dicts, list(conflict_fields), chunk_size, wait=False), model, field_names, wait)
     return None
 
-def delete_data(model_name, id):
+def update_data(model_name, id, data_dict, wait=True):
     model = get_model_by_name(model_name)
     if exists(model):
-        data = model.get_by_id(id)
-        data.delete_instance()
-        return model
+        return _tracked(write(_update_data, model, id, data_dict, wait=False), model, set(data_dict), wait)
     return None
 
+def update_many(model_name, ids, data_dict, chunk_size=100, wait=True):
+    model = get_model_by_name(model_name)
+    if exists(model):
+        return _tracked(write(_update_many, model, list(ids), data_dict, chunk_size, wait=False), model, set(data_dict), wait)
+    return None
+
+def update_each(model_name, data_by_id, chunk_size=100, wait=True):
+    model = get_model_by_name(model_name)
+    if exists(model):
+        data_by_id = dict(data_by_id)
+        field_names = {field_name for data_dict in data_by_id.values() for field_name in data_dict}
+        return _tracked(write(_update_each, model, data_by_id, chunk_size, wait=False), model, field_names, wait)
+    return None
+
+def delete_data(model_name, id, wait=True):
+    model = get_model_by_name(model_name)
+    if exists(model):
+        return _tracked(write(_delete_data, model, id, wait=False), model, None, wait)
+    return None
+
+def index_data(data):
+    index = search_indexes.get(type(data))
+    if exists(index):
+        field_names = [name for name in index._meta.sorted_field_names if name != "rowid"]
+        index.replace(
+            rowid=data.get_id(),
+            **{field_name: getattr(data, field_name) for field_name in field_names},
+        ).execute()
+
+def index_data_many(model, rows):
+    index = search_indexes.get(model)
+    if exists(index):
+        field_names = [name for name in index._meta.sorted_field_names if name != "rowid"]
+        for chunk in chunked(rows, 100):
+            index.replace_many([
+                {"rowid": data.get_id(), **{field_name: getattr(data, field_name) for field_name in field_names}}
+                for data in chunk
+            ]).execute()
+
+def unindex_data(model, id):
+    index = search_indexes.get(model)
+    if exists(index):
+        index.delete().where(index.rowid == id).execute()
+
 
 # views
 def handle_markdown_tap_link(page, e):
@@ -141,9 +644,75 @@ def authenticate(view_function):
 
 
 # controller
-def show_page(page, route, controls):
-    page.views.clear()
-    page.views.append(
-        ft.View(route=route, controls=controls)
-    )
+def _control_key(control):
+    return getattr(control, "key", None)
+
+def _match_children(previous_children, current_children):
+    # pair mounted children with their rebuilt counterparts :
+    # keyed controls by key, unkeyed controls by position among unkeyed siblings
+    keyed = {}
+    unkeyed = []
+    for child in previous_children:
+        key = _control_key(child)
+        if exists(key):
+            keyed[key] = child
+        else:
+            unkeyed.append(child)
+
+    position = 0
+    for new_child in current_children:
+        key = _control_key(new_child)
+        if exists(key):
+            old_child = keyed.pop(key, None)
+        else:
+            old_child = unkeyed[position] if position < len(unkeyed) else None
+            position += 1
+        if (
+            exists(old_child)
+            and exists(old_child.uid)
+            and type(old_child) is type(new_child)
+            and not new_child.is_isolated()
+        ):
+            yield old_child, new_child
+
+def reconcile_control(index, old, new):
+    # hand the mounted identity of `old` over to `new`, so the next update
+    # only sends attributes that changed and subtrees that were added/removed ;
+    # attributes derived in before_update (padding, text style, ...) are set before comparing,
+    # as they were on `old` when it was last sent
+    new._before_build_command()
+    new.before_update()
+    new._Control__uid = old.uid
+    new.page = old.page
+    new.parent = old.parent
+    index[old.uid] = new
+
+    old_attrs = old._Control__attrs
+    new_attrs = new._Control__attrs
+    for name, (value, _) in list(new_attrs.items()):
+        if name in old_attrs and old_attrs[name][0] == value:
+            new_attrs[name] = (value, False)
+    for name, (value, _) in old_attrs.items():
+        if name not in new_attrs and value not in (None, ""):
+            new_attrs[name] = ("", True)
+
+    previous_children = old._previous_children
+    adopted = {}
+    for old_child, new_child in _match_children(previous_children, new._get_children()):
+        reconcile_control(index, old_child, new_child)
+        adopted[id(old_child)] = new_child
+    new._previous_children[:] = [adopted.get(id(child), child) for child in previous_children]
+    return new
+
+def show_page(page, route, controls, reconcile=True):
+    view = ft.View(route=route, controls=controls)
+    mounted = page.views[-1] if len(page.views) == 1 else None
+    if reconcile and exists(mounted) and exists(mounted.uid) and mounted.route == route:
+        # same page again (e.g. page.reload()) : patch the mounted view in place
+        reconcile_control(page.index, mounted, view)
+        page._previous_children[:] = [view if c is mounted else c for c in page._previous_children]
+        page.views[-1] = view
+    else:
+        page.views.clear()
+        page.views.append(view)
     page.update()
\ No newline at end of file
@@ -9,7 +9,7 @@ Key Components:\
 - error_404_view(page: ft.Page):
   Creates a view for displaying a 404 error page.
 
-- data_list_view(page: ft.Page, model_name: str):
+- data_list_view(page: ft.Page, model_name: str, after: int=None, limit: int=100, where: dict=None, order_by: str=None, search: str=None):
   Creates a view for listing data of a specific model.
 
 - data_add_view(page: ft.Page, model_name: str):
@@ -74,7 +74,7 @@ def model_list_view(page: ft.Page):
     ]
 
 
-def data_list_view(page: ft.Page, model_name: str):
+def data_list_view(page: ft.Page, model_name: str, after: int=None, limit: int=100, where: dict=None, order_by: str=None, search: str=None):
     return [
         header(
             page=page,
@@ -84,6 +84,11 @@ def data_list_view(page: ft.Page, model_name: str):
         data_lv(
             page=page,
             model_name=model_name,
+            after=after,
+            limit=limit,
+            where=where,
+            order_by=order_by,
+            search=search,
         )
     ]
 
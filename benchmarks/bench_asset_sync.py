@@ -0,0 +1,124 @@
+"""
+Champion Icon Sync Benchmark
+
+Runs `templates.components.lol_assets.sync_champion_icons` against the local
+icon server (`benchmarks/icon_server.py`), fully offline, in a temporary icon
+directory :
+
+- legacy : one blocking request per icon, every file overwritten (the former
+  `lcotest.download_champ_img(all=True)`).
+- cold sync : every icon downloaded by the pool.
+- warm sync : same Data Dragon version, nothing requested.
+- interrupted then resumed : the sync stops after a third of the icons, the
+  next run only fetches the rest.
+- patch day : a new version of champion.json with one new champion and three
+  changed icons ; the other icons are revalidated with their ETag (304) and
+  only four files are written.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_asset_sync [latency_ms] [workers]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import requests
+
+import settings
+from benchmarks.icon_server import IconServer
+from templates.components.lol_assets import sync_champion_icons
+from templates.components.lol_champions import ChampionStore
+
+
+def _legacy_download(store: ChampionStore, base_url: str, icon_dir: str):
+    for champion in store:
+        response = requests.get(f"{base_url}/{champion.key}.png")
+        with open(os.path.join(icon_dir, f"{champion.id}.png"), "wb") as f:
+            f.write(response.content)
+    return [champion.id for champion in store]
+
+
+def _patched_champion_json(path: str, version: str):
+    with open(settings.CHAMPION_JSON_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"] = version
+    data["data"]["Newchamp"] = {**data["data"]["Ahri"], "id": "Newchamp", "key": "9999", "name": "New Champ"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def main(latency_ms: int=20, workers: int=None):
+    workers = workers or settings.ASSET_SYNC_WORKERS
+    server = IconServer(latency=latency_ms / 1000).start()
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = ChampionStore(snapshot_path="")
+        print(f"{len(store) + 1} icons, {latency_ms} ms latency, {workers} workers\n")
+        print(f"{'scenario':26} {'requests':>9} {'written':>8} {'seconds':>8}")
+
+        def run(name: str, icon_dir: str, fn):
+            requests_before = server.request_count
+            start = time.perf_counter()
+            results = fn()
+            elapsed = time.perf_counter() - start
+            written = len(results["downloaded"]) + len(results["updated"])
+            print(f"{name:26} {server.request_count - requests_before:9} {written:8} {elapsed:8.2f}")
+            return results
+
+        legacy_dir = os.path.join(tmp_dir, "legacy")
+        os.makedirs(legacy_dir)
+        run("legacy (sequential)", legacy_dir, lambda: {"downloaded": _legacy_download(store, server.base_url, legacy_dir), "updated": []})
+
+        icon_dir = os.path.join(tmp_dir, "icons")
+        sync = lambda **kwargs: sync_champion_icons(icon_dir=icon_dir, base_url=server.base_url, max_workers=workers, **kwargs)
+        results = run("cold sync", icon_dir, lambda: sync(store=store))
+        assert len(results["downloaded"]) == len(store) + 1 and not results["failed"], results["failed"]
+        results = run("warm sync", icon_dir, lambda: sync(store=store))
+        assert len(results["skipped"]) == len(store) + 1
+
+        # interrupted after a third of the icons, then resumed
+        resume_dir = os.path.join(tmp_dir, "resume")
+        done = []
+
+        def _interrupt(champion_id, outcome):
+            done.append(champion_id)
+            if len(done) == len(store) // 3:
+                raise _Interrupted()
+
+        def _interrupted_sync():
+            try:
+                sync_champion_icons(icon_dir=resume_dir, base_url=server.base_url, max_workers=workers, store=store, on_progress=_interrupt)
+            except _Interrupted:
+                pass
+            with open(os.path.join(resume_dir, "manifest.json"), encoding="utf-8") as f:
+                return {"downloaded": list(json.load(f)["icons"]), "updated": []}
+
+        run("interrupted", resume_dir, _interrupted_sync)
+        results = run("resumed", resume_dir, lambda: sync_champion_icons(icon_dir=resume_dir, base_url=server.base_url, max_workers=workers, store=store))
+        assert len(results["downloaded"]) + len(results["skipped"]) == len(store) + 1 and not results["failed"]
+
+        # patch day : new version, one new champion, three changed icons
+        patched_json = os.path.join(tmp_dir, "champion.json")
+        _patched_champion_json(patched_json, "99.1.1")
+        server.changed = {store.get("Ahri").key, store.get("Zed").key, store.get("Lux").key}
+        patched = ChampionStore(patched_json, snapshot_path="")
+        results = run("patch day", icon_dir, lambda: sync(store=patched))
+        assert sorted(results["updated"]) == ["Ahri", "Lux", "Zed"] and results["downloaded"] == ["Newchamp"], results
+        for name, champion_ids in results.items():
+            if name != "unchanged":
+                print(f"  {name}: {' '.join(sorted(champion_ids))}")
+    finally:
+        server.stop()
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
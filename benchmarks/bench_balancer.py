@@ -0,0 +1,146 @@
+"""
+Team Balancer Benchmark
+
+Compares `templates.components.lol_balancer.balance_teams` against the
+previous `_grouping` search (every 5-player combination, team 2 rebuilt by
+list scan, mirrored splits removed through a set of sorted name tuples, full
+sort of the candidates) on random rosters of 10 players, then times
+`partition_lobbies` on larger player pools against splitting the pool into
+lobbies by rank order (each lobby balanced exactly), and times
+`balance_constrained` (score, lane coverage, mastery and pairing constraints)
+on random profiles, and the cost of a repeated grouping answered by
+`GroupingCache`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_balancer [number] [time_limit_ms]
+"""
+
+import itertools
+import random
+import sys
+import time
+import timeit
+from types import SimpleNamespace
+
+from templates.components.lol_balancer import LANES, GroupingCache, PlayerProfile, balance_constrained, balance_teams, partition_lobbies, roster_signature, team_splits
+
+
+def _legacy_grouping(summoners: list, top_n: int=5):
+    all_combinations = list(itertools.combinations(summoners, 5))
+    unique_combinations = set()
+    top_combinations = []
+    for combo in all_combinations:
+        team1 = list(combo)
+        team2 = [s for s in summoners if s not in team1]
+        team1_score = sum(s[1] for s in team1)
+        team2_score = sum(s[1] for s in team2)
+        diff = abs(team1_score - team2_score)
+        unique_key = tuple(sorted([tuple(sorted(s[0].summoner_name for s in team1)),
+                                   tuple(sorted(s[0].summoner_name for s in team2))]))
+        if unique_key not in unique_combinations:
+            unique_combinations.add(unique_key)
+            top_combinations.append((diff, (team1, team2)))
+    top_combinations.sort(key=lambda x: x[0])
+    return top_combinations[:top_n]
+
+
+def _roster(seed: int):
+    rng = random.Random(seed)
+    return [
+        (SimpleNamespace(region="jp", summoner_name=f"player{i}", tag="JP1"), rng.randint(0, 3600))
+        for i in range(10)
+    ]
+
+
+def _rank_order_lobbies(players: list, scores: list):
+    # the same players as partition_lobbies : the ones past the last full lobby are benched
+    order = sorted(range(len(players) // 10 * 10), key=lambda i: -scores[i])
+    lobbies = [order[start:start + 10] for start in range(0, len(order), 10)]
+    return max(balance_teams([players[i] for i in lobby], [scores[i] for i in lobby], top_n=1)[0][0] for lobby in lobbies)
+
+
+def bench_partition(time_limit: float):
+    print(f"{'players':>8} {'lobbies':>8} {'bench':>6} {'rank order worst':>17} {'partition worst':>16} {'seconds':>8}")
+    for player_count in [20, 23, 60, 200, 600]:
+        rng = random.Random(player_count)
+        scores = [rng.randint(0, 3600) for _ in range(player_count)]
+        players = list(range(player_count))
+        start = time.perf_counter()
+        worst, lobbies, bench = partition_lobbies(players, scores, top_n=1, time_limit=time_limit, seed=0)[0]
+        elapsed = time.perf_counter() - start
+        assert sorted(player for _, team1, team2 in lobbies for player in team1 + team2) + bench == players
+        print(f"{player_count:8} {len(lobbies):8} {len(bench):6} {_rank_order_lobbies(players, scores):17} {worst:16} {elapsed:8.2f}")
+
+
+def _profiles(player_count: int):
+    rng = random.Random(player_count)
+    return [
+        PlayerProfile(rng.randint(0, 3600), rng.randint(1, 2 ** len(LANES) - 1), rng.randint(0, 150))
+        for _ in range(player_count)
+    ]
+
+
+def bench_constrained(time_limit: float):
+    print(f"{'players':>8} {'constraints':>12} {'worst cost':>11} {'optimal':>8} {'seconds':>8}")
+    for player_count in [10, 20, 40]:
+        profiles = _profiles(player_count)
+        for must_split, must_together in [((), ()), ([(0, 1)], [(2, 3)])]:
+            start = time.perf_counter()
+            cost, optimal, lobbies = balance_constrained(profiles, must_split, must_together, time_limit=time_limit)
+            elapsed = time.perf_counter() - start
+            for first, second in must_split:
+                assert not any({first, second} <= set(team) for _, team1, team2 in lobbies for team in [team1, team2])
+            for first, second in must_together:
+                assert any({first, second} <= set(team) for _, team1, team2 in lobbies for team in [team1, team2])
+            constraints = len(must_split) + len(must_together)
+            print(f"{player_count:8} {constraints:12} {cost:11.0f} {str(optimal):>8} {elapsed:8.3f}")
+
+
+def bench_grouping_cache(time_limit: float):
+    cache = GroupingCache()
+    print(f"{'players':>8} {'first (ms)':>11} {'repeated (ms)':>14}")
+    for player_count in [10, 40, 200]:
+        rng = random.Random(player_count)
+        summoners = [(SimpleNamespace(id=i), rng.randint(0, 3600)) for i in range(player_count)]
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            key = roster_signature(summoners)
+            if cache.get(key) is None:
+                cache.put(key, partition_lobbies(list(range(player_count)), [score for _, score in summoners], top_n=1, time_limit=time_limit))
+            timings.append(time.perf_counter() - start)
+        print(f"{player_count:8} {timings[0] * 1e3:11.1f} {timings[1] * 1e3:14.3f}")
+    print(f"cache {cache.stats()}")
+
+
+def main(number: int=200, time_limit_ms: int=500):
+    rosters = [_roster(seed) for seed in range(20)]
+    for summoners in rosters:
+        legacy = [diff for diff, _ in _legacy_grouping(summoners)]
+        balanced = [diff for diff, _, _ in balance_teams(summoners, [s[1] for s in summoners])]
+        assert legacy == balanced, (legacy, balanced)
+
+    # two players sharing a name : the legacy dedup key drops valid splits, identity by position does not
+    summoners = _roster(0)
+    summoners[1][0].summoner_name = summoners[0][0].summoner_name
+    print(f"splits with a duplicated name : legacy {len(_legacy_grouping(summoners, top_n=1000))}, "
+          f"balancer {len(balance_teams(summoners, [s[1] for s in summoners], top_n=1000))}")
+
+    team_splits(10, 5)
+    legacy = timeit.timeit(lambda: [_legacy_grouping(summoners) for summoners in rosters], number=number) / number / len(rosters)
+    balanced = timeit.timeit(lambda: [balance_teams(summoners, [s[1] for s in summoners]) for summoners in rosters], number=number) / number / len(rosters)
+    print(f"{'implementation':16} {'us / roster':>12}")
+    print(f"{'legacy':16} {legacy * 1e6:12.1f}")
+    print(f"{'balancer':16} {balanced * 1e6:12.1f}")
+    print(f"speedup {legacy / balanced:.1f}x")
+    print()
+    bench_partition(time_limit_ms / 1000)
+    print()
+    bench_constrained(time_limit_ms / 1000)
+    print()
+    bench_grouping_cache(time_limit_ms / 1000)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
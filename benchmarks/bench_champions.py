@@ -0,0 +1,89 @@
+"""
+Champion Metadata Benchmark
+
+Compares `templates.components.lol_champions.ChampionStore` against the raw
+champion.json dict it replaces (`json.load(...)["data"]`, keyed by id) :
+
+- load time : parsing the JSON, building the store from the JSON, and from
+  its marshal snapshot.
+- memory : bytes allocated by each (tracemalloc), kept alive after loading.
+- lookup latency by display name, id and numeric key. The raw dict only has
+  the id as key : names and keys are found by scanning its values.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_champions [number]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import settings
+from templates.components.lol_champions import ChampionStore
+
+
+def _load_raw():
+    with open(settings.CHAMPION_JSON_PATH, encoding="utf-8") as f:
+        return json.load(f)["data"]
+
+
+def _allocated(load):
+    tracemalloc.start()
+    value = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def _raw_by_name(raw: dict, name: str):
+    return next((champion for champion in raw.values() if champion["name"] == name), None)
+
+
+def _raw_by_key(raw: dict, key: int):
+    return next((champion for champion in raw.values() if champion["key"] == str(key)), None)
+
+
+def main(number: int=2000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, "champion.snapshot")
+        ChampionStore(snapshot_path=snapshot_path)
+
+        loads = {
+            "raw dict": _load_raw,
+            "store (json)": lambda: ChampionStore(snapshot_path=""),
+            "store (snapshot)": lambda: ChampionStore(snapshot_path=snapshot_path),
+        }
+        print(f"{'load':18} {'ms':>8} {'KiB kept':>9}")
+        loaded = {}
+        for name, load in loads.items():
+            seconds = timeit.timeit(load, number=20) / 20
+            loaded[name], size = _allocated(load)
+            print(f"{name:18} {seconds * 1e3:8.2f} {size / 1024:9.0f}")
+
+    raw, store = loaded["raw dict"], loaded["store (snapshot)"]
+    assert len(raw) == len(store)
+    names = [champion["name"] for champion in raw.values()]
+    ids = list(raw)
+    keys = [int(champion["key"]) for champion in raw.values()]
+    for name, id, key in zip(names, ids, keys):
+        assert store.get(name).id == id == store.get(id).id == store.by_key(key).id
+
+    lookups = {
+        "by name": (lambda: [_raw_by_name(raw, name) for name in names], lambda: [store.get(name) for name in names]),
+        "by id": (lambda: [raw[id] for id in ids], lambda: [store.get(id) for id in ids]),
+        "by key": (lambda: [_raw_by_key(raw, key) for key in keys], lambda: [store.by_key(key) for key in keys]),
+    }
+    print()
+    print(f"{'lookup (ns)':18} {'raw dict':>9} {'store':>9}")
+    for name, (raw_lookup, store_lookup) in lookups.items():
+        raw_ns = timeit.timeit(raw_lookup, number=max(number // 20, 1)) / max(number // 20, 1) / len(names) * 1e9
+        store_ns = timeit.timeit(store_lookup, number=number) / number / len(names) * 1e9
+        print(f"{name:18} {raw_ns:9.0f} {store_ns:9.0f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,97 @@
+"""
+Database Concurrency Benchmark
+
+Simulates concurrent sessions writing to SQLite, each on its own thread,
+with the previous connection setup (default pragmas, rollback journal),
+with `app.database.create_database` (WAL, tuned pragmas, pooled
+per-thread connections), and with the same database behind the batching
+`DatabaseWriter` queue, each session waiting for every write or not
+(fire-and-forget, as the UI event handlers do). Runs against a temporary
+database file.
+
+`blocked` is how long the sessions were held by their writes (the slowest
+one), `seconds` how long until every write was committed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_db_concurrency [sessions] [writes_per_session]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from peewee import SqliteDatabase, Model, CharField, IntegerField, OperationalError
+from app.database import create_database, DatabaseWriter
+
+
+class Row(Model):
+    session = IntegerField()
+    value = CharField()
+
+
+def _run(db, sessions: int, writes_per_session: int, use_writer: bool=False, wait: bool=True):
+    errors = []
+    futures = []
+    barrier = threading.Barrier(sessions)
+    writer = DatabaseWriter(db) if use_writer else None
+    blocked = [0.0] * sessions
+
+    def _session(session_id):
+        barrier.wait()
+        start = time.perf_counter()
+        for i in range(writes_per_session):
+            try:
+                if use_writer:
+                    future = writer.submit(Row.create, session=session_id, value=f"value {i}")
+                    if wait:
+                        future.result()
+                    else:
+                        futures.append(future)
+                else:
+                    Row.create(session=session_id, value=f"value {i}")
+            except OperationalError as e:
+                errors.append(e)
+        blocked[session_id] = time.perf_counter() - start
+        if not db.is_closed():
+            db.close()
+
+    with db.bind_ctx([Row]):
+        db.create_tables([Row])
+        threads = [threading.Thread(target=_session, args=(i,)) for i in range(sessions)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            if future.exception() is not None:
+                errors.append(future.exception())
+        elapsed = time.perf_counter() - start
+        if use_writer:
+            writer.stop()
+        written = Row.select().count()
+        db.close()
+    return written, len(errors), max(blocked), elapsed
+
+
+def main(sessions: int=50, writes_per_session: int=40):
+    setups = {
+        "default": (lambda path: SqliteDatabase(path, check_same_thread=False), False, True),
+        "tuned (WAL, pooled)": (lambda path: create_database(path, max_connections=sessions + 1), False, True),
+        "tuned + writer, wait": (lambda path: create_database(path, max_connections=sessions + 1), True, True),
+        "tuned + writer, no wait": (lambda path: create_database(path, max_connections=sessions + 1), True, False),
+    }
+    print(f"{sessions} sessions x {writes_per_session} writes")
+    print(f"{'setup':24} {'written':>8} {'errors':>7} {'blocked':>8} {'seconds':>8} {'writes/s':>9}")
+    for name, (factory, use_writer, wait) in setups.items():
+        with tempfile.TemporaryDirectory() as directory:
+            db = factory(os.path.join(directory, "bench.db"))
+            written, errors, blocked, elapsed = _run(db, sessions, writes_per_session, use_writer, wait)
+        print(f"{name:24} {written:8} {errors:7} {blocked:8.3f} {elapsed:8.2f} {written / elapsed:9.0f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,58 @@
+"""
+Champion Icon Atlas Benchmark
+
+Builds the thumbnails and sprite atlases (`templates.components.lol_icon_atlas`)
+into a temporary directory, then compares what a browser client fetches to show
+the champion icons of a random roster (up to 10 champions per summoner) :
+
+- full icons : one request per distinct champion, 128px PNGs shown at 40px,
+- thumbnails : one request per distinct champion, PNGs of the display size,
+- atlas : one request for the atlas of the display size.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_icon_atlas [summoners] [size]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import settings
+from templates.components.lol_champions import get_champion_store
+from templates.components.lol_icon_atlas import build_atlas, build_thumbnails
+
+
+def main(summoners: int=60, size: int=40):
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        build_thumbnails(out_dir=tmp_dir, sizes=[size])
+        index = build_atlas(size, out_dir=tmp_dir)
+        print(f"built {len(index['icons'])} thumbnails and a {index['width']}x{index['height']} atlas in {time.perf_counter() - start:.2f} s\n")
+
+        rng = random.Random(0)
+        champion_ids = [champion.id for champion in get_champion_store()]
+        shown = {champion_id for _ in range(summoners) for champion_id in rng.sample(champion_ids, 10)}
+
+        def total_bytes(paths):
+            return sum(os.path.getsize(path) for path in paths)
+
+        rows = {
+            "full icons": (len(shown), total_bytes(os.path.join(settings.CHAMPION_ICON_DIR, f"{champion_id}.png") for champion_id in shown)),
+            f"thumbnails ({size}px)": (len(shown), total_bytes(os.path.join(tmp_dir, str(size), f"{champion_id}.png") for champion_id in shown)),
+            f"atlas ({size}px)": (1, total_bytes([os.path.join(tmp_dir, index["image"])])),
+        }
+        print(f"{summoners} summoners, {len(shown)} distinct champions shown")
+        print(f"{'assets':20} {'requests':>9} {'KiB':>8}")
+        for name, (requests_count, size_bytes) in rows.items():
+            print(f"{name:20} {requests_count:9} {size_bytes / 1024:8.0f}")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
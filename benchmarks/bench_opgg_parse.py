@@ -0,0 +1,85 @@
+"""
+op.gg Parse Benchmark
+
+Compares the targeted extraction in `templates/components/lol_opgg.py`
+(only the subtrees in PAGE_ROOTS are built) against the previous full-page
+`BeautifulSoup(html, 'html.parser')` parse, over the saved pages in
+`benchmarks/fixtures/opgg/`. Reports parse time and peak traced memory
+per page.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_opgg_parse [number]
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+from bs4 import BeautifulSoup
+from templates.components.lol_opgg import HTML_PARSER, calculate_score, parse_profile, parse_mastery
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "opgg")
+
+
+def _legacy_parse_profile(html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    if soup.find('div', class_='e19vm62i1'):
+        return None, None, None, None
+    player_icon = soup.find('div', class_='profile-icon').find("img").get("src")
+    max_rank = "unranked"
+    max_lp = 0
+    max_score = 0
+    rank_base = soup.find('div', class_='e15k6o3w0')
+    if rank_base is not None:
+        rank_info = rank_base.find("tbody")
+        for rank, lp in zip(rank_info.find_all("div", class_="rank-item"), rank_info.find_all("div", class_="lp")):
+            score = calculate_score(rank.text.lower(), int(lp.text))
+            if score > max_score:
+                max_score = score
+                max_rank = rank.text
+                max_lp = lp.text
+    return player_icon, max_rank, max_lp, max_score
+
+
+def _legacy_parse_mastery(html: str, top_n: int=10):
+    soup = BeautifulSoup(html, 'html.parser')
+    champs = soup.find_all('div', class_='e1poynyt1')[:top_n]
+    champs_name = "|".join(champ.find(class_="champion-name").text for champ in champs)
+    champs_point = "|".join(champ.find(class_="champion-point").text for champ in champs)
+    return champs_name, champs_point
+
+
+def _peak_memory(fn, html: str):
+    tracemalloc.start()
+    fn(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(number: int=20):
+    pages = {
+        "profile.html": (_legacy_parse_profile, parse_profile),
+        "profile_unranked.html": (_legacy_parse_profile, parse_profile),
+        "profile_not_found.html": (_legacy_parse_profile, parse_profile),
+        "mastery.html": (_legacy_parse_mastery, parse_mastery),
+    }
+    print(f"targeted parser: {HTML_PARSER}, {number} parses per page")
+    print(f"{'page':24} {'KiB':>5} {'legacy (ms)':>12} {'targeted (ms)':>14} {'legacy peak (KiB)':>18} {'targeted peak (KiB)':>20}")
+    for filename, (legacy, targeted) in pages.items():
+        with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as f:
+            html = f.read()
+        assert legacy(html) == targeted(html), filename
+
+        legacy_time = timeit.timeit(lambda: legacy(html), number=number) / number
+        targeted_time = timeit.timeit(lambda: targeted(html), number=number) / number
+        legacy_peak = _peak_memory(legacy, html)
+        targeted_peak = _peak_memory(targeted, html)
+        print(f"{filename:24} {len(html) // 1024:5} {legacy_time * 1e3:12.1f} {targeted_time * 1e3:14.1f} {legacy_peak // 1024:18} {targeted_peak // 1024:20}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,144 @@
+"""
+op.gg Scraping Benchmark Suite
+
+Runs the scraping path end to end against the local fixture server
+(`benchmarks/opgg_server.py`), fully offline, on a temporary database and
+response cache:
+
+- Quick Add latency: a pasted lobby log of 10 summoners (ranked, unranked and
+  not-found ones) going through the same steps as the Quick Add dialog, cold
+  (every summoner scraped) and warm (every summoner already registered), and
+  cold with one slow profile in the lobby.
+- Throughput: summoners scraped per second at 10 / 100 / 1000 summoners.
+- Tail latency: the HTTP client against a server where some requests are
+  slow or fail with 503, without retries, with retries, and with retries and
+  hedged requests (latency histogram percentiles per configuration).
+- Parse cost: see benchmarks/bench_opgg_parse.py.
+
+The server runs in a child process and answers after `latency` ms to mimic
+the network round trip.
+The op.gg rate limit is disabled unless OPGG_RATE_LIMIT is set.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_opgg_scraping [max_summoners] [latency_ms]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# the app reads its settings at import time : point everything at temporary files first
+_tmp_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_tmp_dir.name, "bench.db")
+os.environ["HTTP_CACHE_PATH"] = os.path.join(_tmp_dir.name, "http_cache.db")
+os.environ.setdefault("OPGG_RATE_LIMIT", "0")
+os.environ["ROSTER_REFRESH_ENABLED"] = "0"
+
+import requests
+import settings
+from app.http_client import HTTPClient
+from benchmarks import bench_opgg_parse
+from benchmarks.opgg_server import start_process
+from templates.components.lol_custom_organizer import Summoner, _add_summoners, _extract_summoner_name
+from templates.components.lol_opgg import fetch_summoners, get_client
+
+
+def _lobby_log(prefix: str, count: int=10, slow: bool=False):
+    names = [f"{prefix}player{i}" for i in range(count - 2)] + [f"unranked{prefix}", f"notfound{prefix}"]
+    if slow:
+        names[0] = f"slow{prefix}"
+    return "\n".join(f"{name} #JP1 joined the lobby" for name in names)
+
+
+def _quick_add(lobby_log: str):
+    summoner_name_list, tag_list = _extract_summoner_name(lobby_log)
+    start = time.perf_counter()
+    msg, added, written = _add_summoners("jp", summoner_name_list, tag_list)
+    if written is not None:
+        written.result()
+    return time.perf_counter() - start, msg
+
+
+def bench_quick_add():
+    print(f"{'quick add (10 summoners)':32} {'seconds':>8}")
+    elapsed, msg = _quick_add(_lobby_log("cold"))
+    assert msg.count("added") == 9 and msg.count("not found") == 1, msg
+    print(f"{'cold':32} {elapsed:8.3f}")
+    # responses are cached in the background : let the cold run's writes land first
+    get_client().cache.flush()
+    elapsed, msg = _quick_add(_lobby_log("cold"))
+    assert msg.count("already exists") == 9, msg
+    print(f"{'warm (all registered)':32} {elapsed:8.3f}")
+    elapsed, _ = _quick_add(_lobby_log("slow", slow=True))
+    print(f"{'cold, one slow profile':32} {elapsed:8.3f}")
+
+
+def bench_throughput(sizes: list):
+    print(f"{'summoners':>10} {'requests':>9} {'seconds':>8} {'summoners/s':>12}")
+    for size in sizes:
+        get_client().cache.clear()
+        names_and_tags = [(f"throughput{size}x{i}", "JP1") for i in range(size)]
+        start = time.perf_counter()
+        results = fetch_summoners("jp", names_and_tags)
+        elapsed = time.perf_counter() - start
+        assert all(results), size
+        print(f"{size:10} {2 * size:9} {elapsed:8.2f} {size / elapsed:12.1f}")
+
+
+def _get_all(client: HTTPClient, urls: list):
+    def get(url):
+        try:
+            return client.get(url).status_code
+        except requests.RequestException:
+            return None
+
+    with ThreadPoolExecutor(max_workers=settings.OPGG_MAX_WORKERS) as executor:
+        return list(executor.map(get, urls))
+
+
+def bench_tail_latency(latency_ms: int, requests_count: int=400):
+    server, base_url = start_process(latency=latency_ms / 1000, slow_latency=1.0, slow_ratio=0.03, error_ratio=0.03)
+    clients = {
+        "no retries": HTTPClient(retries=0, hedge_after=0),
+        "retries": HTTPClient(retries=2, backoff=0.05, hedge_after=0),
+        "retries + hedging": HTTPClient(retries=2, backoff=0.05, hedge_after=latency_ms * 3 / 1000),
+    }
+    try:
+        print(f"{requests_count} requests, 3% answered after 1 s, 3% answered with 503")
+        print(f"{'client':20} {'errors':>7} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'retries':>8} {'hedges':>7}")
+        for name, client in clients.items():
+            urls = [f"{base_url}/summoners/jp/tail{name.replace(' ', '')}{i}-JP1" for i in range(requests_count)]
+            statuses = _get_all(client, urls)
+            stats = client.stats()
+            latency = stats["latency"][base_url.split("//")[1]]
+            errors = sum(status != 200 for status in statuses)
+            print(f"{name:20} {errors:7} {latency['p50']:9.0f} {latency['p90']:9.0f} {latency['p99']:9.0f} {latency['max']:9.0f} {stats['retries']:8} {stats['hedges']:7}")
+    finally:
+        server.terminate()
+
+
+def main(max_summoners: int=1000, latency_ms: int=50):
+    server, base_url = start_process(latency=latency_ms / 1000, slow_latency=1.0)
+    settings.OPGG_BASE_URL = base_url
+    try:
+        print(f"fixture server {base_url}, {latency_ms} ms latency, {settings.OPGG_MAX_WORKERS} workers\n")
+        bench_quick_add()
+        print()
+        bench_throughput([size for size in [10, 100, 1000] if size <= max_summoners])
+        print()
+        bench_tail_latency(latency_ms)
+        print()
+        bench_opgg_parse.main()
+        stats = get_client().stats()
+        for host, latency in stats.pop("latency").items():
+            print(f"\n{host} latency (ms): " + ", ".join(f"{key} {latency[key]:.0f}" for key in ["count", "mean", "p50", "p90", "p99", "max"]))
+        print(f"{Summoner.select().count()} summoners stored, client {stats}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
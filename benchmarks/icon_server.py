@@ -0,0 +1,91 @@
+"""
+Champion Icon Fixture Server
+
+A local HTTP server standing in for the Community Dragon champion icons
+(`<base_url>/<key>.png`), so the icon sync can run offline. Point
+settings.CHAMPION_ICON_BASE_URL (or the `base_url` argument of
+sync_champion_icons) at it.
+
+Every key gets a small synthetic PNG. Keys in `changed` get different bytes,
+to mimic icons updated by a patch ; `missing` keys answer 404. Every response
+carries an ETag (the sha256 of the body), and conditional requests are
+answered with 304.
+
+Run from the repository root:
+
+    python -m benchmarks.icon_server [port] [latency]
+"""
+
+import hashlib
+import http.server
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def icon_bytes(key: int, revision: int=0):
+    return b"\x89PNG\r\n\x1a\n" + f"champion {key} revision {revision}".encode() + bytes(2048)
+
+
+class IconServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int=0, latency: float=0.0, changed: set=(), missing: set=()):
+        super().__init__(("127.0.0.1", port), IconHandler)
+        self.latency = latency
+        self.changed = set(changed)
+        self.missing = set(missing)
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="icon-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class IconHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server._lock:
+            self.server.request_count += 1
+        time.sleep(self.server.latency)
+        name = urlsplit(self.path).path.strip("/")
+        try:
+            key = int(name[:-len(".png")]) if name.endswith(".png") else None
+        except ValueError:
+            key = None
+        if key is None or key in self.server.missing:
+            return self._send(404, b"not found")
+        body = icon_bytes(key, 1 if key in self.server.changed else 0)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", etag)
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: str=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    server = IconServer(*[int(arg) for arg in sys.argv[1:2]] or [8766], *[float(arg) for arg in sys.argv[2:3]])
+    print(f"serving champion icons on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,140 @@
+"""
+op.gg Fixture Server
+
+A local HTTP server replaying the saved op.gg pages in `benchmarks/fixtures/opgg/`,
+so the scraping path can run offline. Point settings.OPGG_BASE_URL
+(or the OPGG_BASE_URL environment variable) at it.
+
+The page served depends on the summoner name:
+- "unranked..."  : a profile without rank table (profile_unranked.html)
+- "notfound..."  : the "summoner not registered" page (profile_not_found.html)
+- "slow..."      : a normal profile answered after `slow_latency` seconds
+- anything else  : a ranked profile (profile.html)
+Mastery pages ("/mastery") are always mastery.html, except for not-found summoners.
+On top of that, a `slow_ratio` fraction of all requests is answered after
+`slow_latency` seconds, and an `error_ratio` fraction with 503.
+
+Every response carries an ETag, and conditional requests are answered with 304.
+
+Use `OpggServer(...).start()` to serve from a thread of the current process, or
+`start_process(...)` to serve from a child process, so the server does not
+compete with the code being measured for the GIL.
+
+Run from the repository root:
+
+    python -m benchmarks.opgg_server [port] [latency] [slow_latency] [slow_ratio] [error_ratio]
+"""
+
+import http.server
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "opgg")
+
+
+def load_fixtures():
+    fixtures = {}
+    for filename in os.listdir(FIXTURES_DIR):
+        if filename.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+                fixtures[filename[:-len(".html")]] = f.read()
+    return fixtures
+
+
+def fixture_name(path: str):
+    # /summoners/<region>/<name>-<tag>[/mastery]
+    parts = unquote(urlsplit(path).path).strip("/").split("/")
+    if len(parts) < 3 or parts[0] != "summoners":
+        return None
+    summoner_name = parts[2].rsplit("-", 1)[0].lower()
+    if summoner_name.startswith("notfound"):
+        return "profile_not_found"
+    if parts[3:] == ["mastery"]:
+        return "mastery"
+    if summoner_name.startswith("unranked"):
+        return "profile_unranked"
+    return "profile"
+
+
+class OpggServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int=0, latency: float=0.0, slow_latency: float=2.0, slow_ratio: float=0.0, error_ratio: float=0.0):
+        super().__init__(("127.0.0.1", port), OpggHandler)
+        self.fixtures = load_fixtures()
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.slow_ratio = slow_ratio
+        self.error_ratio = error_ratio
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="opgg-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class OpggHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server._lock:
+            self.server.request_count += 1
+        name = fixture_name(self.path)
+        slow = "/slow" in unquote(self.path).lower() or random.random() < self.server.slow_ratio
+        time.sleep(self.server.slow_latency if slow else self.server.latency)
+
+        if name is None:
+            return self._send(404, b"not found")
+        if random.random() < self.server.error_ratio:
+            return self._send(503, b"service unavailable")
+        etag = f'"{name}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", etag)
+        self._send(200, self.server.fixtures[name], etag)
+
+    def _send(self, status: int, body: bytes, etag: str=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(connection, kwargs):
+    server = OpggServer(**kwargs)
+    connection.send(server.base_url)
+    server.serve_forever()
+
+
+def start_process(**kwargs):
+    # takes the OpggServer arguments, returns (process, base_url) ; terminate the process when done
+    parent_connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(child_connection, kwargs), daemon=True)
+    process.start()
+    return process, parent_connection.recv()
+
+
+if __name__ == "__main__":
+    server = OpggServer(*[int(arg) for arg in sys.argv[1:2]] or [8765], *[float(arg) for arg in sys.argv[2:6]])
+    print(f"serving op.gg fixtures on {server.base_url}")
+    server.serve_forever()
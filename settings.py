@@ -0,0 +1,102 @@
+"""
+Settings Module
+
+Application-wide configuration values. Each setting can be overridden
+with an environment variable of the same name.
+"""
+
+import json
+import os
+
+
+# Print the number of SQL queries executed while rendering each route.
+DEBUG_QUERIES = os.getenv("DEBUG_QUERIES", "0") == "1"
+
+
+# Database (see app/database.py)
+DATABASE_PATH = os.getenv("DATABASE_PATH", "database/fletmvc.db")
+# extra pragmas, as a JSON object in the environment : DATABASE_PRAGMAS='{"cache_size": -128000}'
+DATABASE_PRAGMAS = json.loads(os.getenv("DATABASE_PRAGMAS", "{}"))
+DATABASE_MAX_CONNECTIONS = int(os.getenv("DATABASE_MAX_CONNECTIONS", "32"))
+DATABASE_STALE_TIMEOUT = int(os.getenv("DATABASE_STALE_TIMEOUT", "300"))
+# seconds to wait for a free connection when all are in use (0 waits forever)
+DATABASE_POOL_TIMEOUT = int(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+
+# Generic data lists (see app.utils.get_data_page) : rows per page when no
+# `limit` is given, and the largest `limit` accepted from a query string.
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+# Single writer thread for database mutations (see app.database.DatabaseWriter) :
+# at most MAX_BATCH queued writes are committed together, waiting up to LINGER
+# seconds for more writes to join a batch.
+DATABASE_WRITER_MAX_BATCH = int(os.getenv("DATABASE_WRITER_MAX_BATCH", "100"))
+DATABASE_WRITER_LINGER = float(os.getenv("DATABASE_WRITER_LINGER", "0"))
+
+
+# op.gg scraping (see templates/components/lol_opgg.py)
+OPGG_BASE_URL = os.getenv("OPGG_BASE_URL", "https://www.op.gg").rstrip("/")
+OPGG_MAX_WORKERS = int(os.getenv("OPGG_MAX_WORKERS", "20"))
+# requests per second to one host, after a burst of OPGG_RATE_BURST (0 disables the limit)
+OPGG_RATE_LIMIT = float(os.getenv("OPGG_RATE_LIMIT", "5"))
+OPGG_RATE_BURST = int(os.getenv("OPGG_RATE_BURST", "20"))
+
+# Background roster refresh (see templates/components/lol_roster.py) :
+# every INTERVAL seconds (+/- JITTER as a fraction), up to BATCH summoners not
+# refreshed for STALE_AFTER seconds (STALE_AFTER_INACTIVE for inactive ones)
+# are scraped again with WORKERS threads. Off unless ROSTER_REFRESH_ENABLED=1.
+ROSTER_REFRESH_ENABLED = os.getenv("ROSTER_REFRESH_ENABLED", "0") == "1"
+ROSTER_REFRESH_INTERVAL = float(os.getenv("ROSTER_REFRESH_INTERVAL", "300"))
+ROSTER_REFRESH_JITTER = float(os.getenv("ROSTER_REFRESH_JITTER", "0.2"))
+ROSTER_REFRESH_BATCH = int(os.getenv("ROSTER_REFRESH_BATCH", "20"))
+ROSTER_REFRESH_WORKERS = int(os.getenv("ROSTER_REFRESH_WORKERS", "4"))
+ROSTER_STALE_AFTER = float(os.getenv("ROSTER_STALE_AFTER", str(6 * 60 * 60)))
+ROSTER_STALE_AFTER_INACTIVE = float(os.getenv("ROSTER_STALE_AFTER_INACTIVE", str(24 * 60 * 60)))
+
+# On-disk HTTP response cache (see app/http_client.py)
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "database/http_cache.db")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(6 * 60 * 60)))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Scraping client resilience (see app.http_client.HTTPClient) : timeouts in seconds,
+# RETRIES extra attempts starting RETRY_BACKOFF seconds apart (doubled each time),
+# a host is skipped for CIRCUIT_RESET seconds after CIRCUIT_FAILURES failures in a row,
+# and a slow request is duplicated after HEDGE_AFTER seconds (0 disables hedging).
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+HTTP_CIRCUIT_FAILURES = int(os.getenv("HTTP_CIRCUIT_FAILURES", "5"))
+HTTP_CIRCUIT_RESET = float(os.getenv("HTTP_CIRCUIT_RESET", "30"))
+HTTP_HEDGE_AFTER = float(os.getenv("HTTP_HEDGE_AFTER", "0"))
+
+# Team grouping (see templates/components/lol_balancer.py) : seconds spent
+# searching when more than one lobby is split at once.
+LOBBY_SEARCH_TIME_LIMIT = float(os.getenv("LOBBY_SEARCH_TIME_LIMIT", "1.0"))
+# seconds before the role- and mastery-aware search returns the best grouping found so far
+CONSTRAINED_SEARCH_TIME_LIMIT = float(os.getenv("CONSTRAINED_SEARCH_TIME_LIMIT", "3.0"))
+# number of grouping results kept for recently grouped rosters
+GROUPING_CACHE_SIZE = int(os.getenv("GROUPING_CACHE_SIZE", "32"))
+
+# Champion data and icons (see templates/components/lol_champions.py) : the icon
+# index is rebuilt when the directory or champion.json changes, checked at most
+# every RELOAD_INTERVAL seconds.
+CHAMPION_JSON_PATH = os.getenv("CHAMPION_JSON_PATH", "database/champion.json")
+# parsed champion.json, loaded instead of the JSON while it is up to date
+CHAMPION_SNAPSHOT_PATH = os.getenv("CHAMPION_SNAPSHOT_PATH", "database/champion.snapshot")
+CHAMPION_ICON_DIR = os.getenv("CHAMPION_ICON_DIR", "static/images/champion-icons")
+CHAMPION_ICON_FALLBACK = os.getenv("CHAMPION_ICON_FALLBACK", "_HelmetBro.png")
+CHAMPION_ICON_RELOAD_INTERVAL = float(os.getenv("CHAMPION_ICON_RELOAD_INTERVAL", "5"))
+
+# Champion icon sync (see templates/components/lol_assets.py) : icons are fetched
+# from BASE_URL/<key>.png by WORKERS threads, and the manifest is saved every
+# SAVE_EVERY icons.
+CHAMPION_ICON_BASE_URL = os.getenv("CHAMPION_ICON_BASE_URL", "https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/champion-icons")
+ASSET_SYNC_WORKERS = int(os.getenv("ASSET_SYNC_WORKERS", "8"))
+ASSET_SYNC_SAVE_EVERY = int(os.getenv("ASSET_SYNC_SAVE_EVERY", "20"))
+
+# Champion icon thumbnails and sprite atlases (see templates/components/lol_icon_atlas.py),
+# one per size in pixels
+CHAMPION_THUMBNAIL_SIZES = [int(size) for size in os.getenv("CHAMPION_THUMBNAIL_SIZES", "20,40,64").split(",")]
+CHAMPION_THUMBNAIL_DIR = os.getenv("CHAMPION_THUMBNAIL_DIR", "static/images/champion-thumbnails")
+CHAMPION_ATLAS_DIR = os.getenv("CHAMPION_ATLAS_DIR", "static/images/champion-atlas")
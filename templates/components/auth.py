@@ -32,6 +32,7 @@ def login_form(page: ft.Page, redirect_to: str="/"):
         icon=ft.icons.LOGIN,
     )
 
+    @with_connection
     def submit(e):
         if not all([username.value, password.value]):
             page.open(ft.SnackBar(content=ft.Text("Username and Password are required")))
@@ -11,14 +11,19 @@ Key Components:
 - breadcrumbs(page: ft.Page, separator: str=" / ", active_color: str=ft.colors.BLUE, inactive_color: str=ft.colors.GREY, home_content: ft.Control=ft.Icon(ft.icons.HOME)):
   Creates a breadcrumbs component with customizable colors and home icon.
 
-- data_lv(page: ft.Page, model_name: str):
-  Creates a list view for a given model.
+- data_lv(page: ft.Page, model_name: str, after: int=None, limit: int=100, where: dict=None, order_by: str=None, search: str=None, window_pages: int=3):
+  Creates a lazily loaded list view for a given model, filtered and sorted in SQL,
+  with a search box backed by the model's full-text index.
+  Rows are fetched `limit` at a time by primary-key keyset as the user scrolls,
+  and at most `window_pages` pages of cards are kept in the list.
 
 - form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None):
   Creates a form view for adding or editing data of a given model.
 """
 
 
+import threading
+from urllib.parse import parse_qsl, urlencode
 import flet as ft
 from app.utils import *
 
@@ -44,7 +49,7 @@ def breadcrumbs(
         inactive_color: str=ft.colors.GREY,
         home_content: ft.Control=ft.Icon(ft.icons.HOME),
     ):
-    parts = page.route.strip("/").split("/")
+    parts = page.route.split("?")[0].strip("/").split("/")
 
     home_content.color = inactive_color
     if parts[0] == "":
@@ -103,61 +108,180 @@ def customized_markdown(page: ft.Page, filename: str, patterns: dict={}):
     )
 
 
-def data_lv(page: ft.Page, model_name: str):
-    data_list = get_data_list(model_name)
-    if not exists(data_list):
+def _data_card(page: ft.Page, route: str, data, on_delete):
+    card = ft.Card(
+        content=ft.Container(
+            content=ft.Column(
+                controls=[]
+            ),
+            margin=10
+        ),
+        key=str(data.id),
+        data=data,
+    )
+    for field_name, field_value in get_items(data):
+        card.content.content.controls.append(
+            ft.Text(
+                value=f"{field_name}: {field_value}",
+                size=12,
+                weight=ft.FontWeight.BOLD,
+            )
+        )
+    card.content.content.controls.append(
+        ft.Row([
+            ft.IconButton(
+                icon=ft.icons.EDIT,
+                on_click=lambda _, id=data.id: page.go(f"{route}/edit/{id}")
+            ),
+            ft.IconButton(
+                icon=ft.icons.DELETE,
+                on_click=lambda _, id=data.id: on_delete(id, card)
+            )
+        ])
+    )
+    return card
+
+
+def data_lv(
+        page: ft.Page,
+        model_name: str,
+        after: int=None,
+        limit: int=100,
+        where: dict=None,
+        order_by: str=None,
+        search: str=None,
+        window_pages: int=3,
+    ):
+    def _get_page(**kwargs):
+        # where / order_by come from the query string : only indexed fields
+        return get_data_page(model_name, limit=limit, where=where, order_by=order_by, search=search, indexed_only=True, **kwargs)
+
+    try:
+        data_page = _get_page(after=after)
+    except ValueError as e:
+        return ft.Text(str(e))
+    if not exists(data_page):
         return ft.Text(f"Model \"{model_name}\" not found")
 
+    route = page.route.split("?")[0]
+    # keyset window : only cards between the first and last row are held
+    state = {
+        "first": None,
+        "last": None,
+        "at_start": not exists(after),
+        "at_end": False,
+    }
+    loading = threading.Lock()
+
     # list view
     lv = ft.ListView(
         expand=True,
         spacing=10,
         padding=20,
-        auto_scroll=True,
+        on_scroll_interval=100,
     )
 
-    def _delete(id):
-        delete_data(model_name, id)
-        page.reload()
-
-    for data in data_list:
-        card = ft.Card(
-            content=ft.Container(
-                content=ft.Column(
-                    controls=[]
-                ),
-                margin=10
-            )
+    def _delete(id, card):
+        when_written(
+            page,
+            delete_data(model_name, id, wait=False),
+            on_error=lambda error: page.open(ft.SnackBar(content=ft.Text(f"Could not delete : {error}"))),
         )
-        for field_name, field_value in get_items(data):
-            card.content.content.controls.append(
-                ft.Text(
-                    value=f"{field_name}: {field_value}",
-                    size=12,
-                    weight=ft.FontWeight.BOLD,
-                )
-            )
-        card.content.content.controls.append(
-            ft.Row([
-                ft.IconButton(
-                    icon=ft.icons.EDIT,
-                    on_click=lambda _, id=data.id: page.go(f"{page.route}/edit/{id}")
-                ),
-                ft.IconButton(
-                    icon=ft.icons.DELETE,
-                    on_click=lambda _, id=data.id: _delete(id)
-                )
-            ])
-        )
-        lv.controls.append(card)
+        if card in lv.controls:
+            lv.controls.remove(card)
+            lv.update()
+
+    def _cards(rows):
+        return [_data_card(page, route, data, _delete) for data in rows]
+
+    def _row(card):
+        return card.data
+
+    def _load_next():
+        rows = _get_page(after=state["last"])
+        if len(rows) < limit:
+            state["at_end"] = True
+        if not rows:
+            return False
+        anchor = lv.controls[-1].key if lv.controls else None
+        lv.controls.extend(_cards(rows))
+        state["last"] = rows[-1]
+        # drop the oldest page once the window is full
+        if len(lv.controls) > limit * window_pages:
+            del lv.controls[:limit]
+            state["first"] = _row(lv.controls[0])
+            state["at_start"] = False
+        return anchor
+
+    def _load_previous():
+        if not exists(state["first"]):
+            # nothing shown (`after` past the last row) : before=None would load the first page
+            state["at_start"] = True
+            return False
+        rows = _get_page(before=state["first"])
+        if len(rows) < limit:
+            state["at_start"] = True
+        if not rows:
+            return False
+        anchor = lv.controls[0].key if lv.controls else None
+        lv.controls[:0] = _cards(rows)
+        state["first"] = rows[0]
+        if len(lv.controls) > limit * window_pages:
+            del lv.controls[-limit:]
+            state["last"] = _row(lv.controls[-1])
+            state["at_end"] = False
+        return anchor
+
+    @with_connection
+    def _on_scroll(e: ft.OnScrollEvent):
+        near_end = e.pixels >= e.max_scroll_extent - e.viewport_dimension
+        near_start = e.pixels <= e.min_scroll_extent + e.viewport_dimension
+        if not (near_end and not state["at_end"]) and not (near_start and not state["at_start"]):
+            return
+        if not loading.acquire(blocking=False):
+            return
+        try:
+            anchor = _load_next() if near_end and not state["at_end"] else _load_previous()
+            if anchor is False:
+                return
+            lv.update()
+            # keep the card that was on screen in place after the window moved
+            if exists(anchor):
+                lv.scroll_to(key=anchor, duration=0)
+        finally:
+            loading.release()
+
+    lv.on_scroll = _on_scroll
+    lv.controls.extend(_cards(data_page))
+    if data_page:
+        state["first"] = data_page[0]
+        state["last"] = data_page[-1]
+    state["at_end"] = len(data_page) < limit
+
+    # search box : keeps the other query parameters, restarts from the first page
+    def _search(e):
+        query = {key: value for key, value in parse_qsl(page.route.partition("?")[2]) if key not in ["q", "after"]}
+        if e.control.value:
+            query["q"] = e.control.value
+        page.go(f"{route}?{urlencode(query)}" if query else route)
+
+    search_field = ft.TextField(
+        value=search,
+        hint_text="Search",
+        prefix_icon=ft.icons.SEARCH,
+        on_submit=_search,
+        expand=True,
+    )
 
     # add button
     add_button = ft.ElevatedButton(
         text="ADD",
-        on_click=lambda _: page.go(f"{page.route}/add")
+        on_click=lambda _: page.go(f"{route}/add")
+    )
+    return ft.Column(
+        controls=[ft.Row([search_field, add_button]), lv],
+        expand=True,
     )
-    lv.controls.append(add_button)
-    return lv
 
 
 def form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None):
@@ -176,47 +300,64 @@ def form_lv(page: ft.Page, model_name: str, redirect_to: str, edit_id: str=None)
         padding=20,
     )
     
-    for field_name, field_value in get_items(model_or_data):
-        if field_name not in ["id", "salt"]:
-            lv.controls.append(
-                ft.TextField(
-                    label=field_name,
-                    value="" if field_value is None else field_value,
-                )
+    model_info = get_model_info(model_or_data)
+    for field_name in model_info.editable_field_names:
+        field_value = None if isinstance(model_or_data, type) else getattr(model_or_data, field_name)
+        lv.controls.append(
+            ft.TextField(
+                label=field_name,
+                value="" if field_value is None else field_value,
             )
+        )
 
     # add button
     def submit_data(e):
         data_dict = {}
         fields = lv.controls[:-1]
-        blank=False
+        error = None
         for field in fields:
             if not field.value:
-                blank = True
+                error = "All fields are required"
                 break
             data_dict[field.label] = field.value
 
-        if not blank:
+        if not exists(error):
+            try:
+                data_dict = model_info.convert(data_dict)
+            except ValueError as e:
+                error = f"Invalid value : {e}"
+
+        if not exists(error):
+            if model_name == "user" and not exists(edit_id):
+                page.custom_auth.add_user(data_dict)
+                page.go(redirect_to)
+                return
+            # the list is shown once the row is committed
             if exists(edit_id):
-                update_data(model_name, edit_id, data_dict)
+                written = update_data(model_name, edit_id, data_dict, wait=False)
             else:
-                if model_name == "user":
-                    page.custom_auth.add_user(data_dict)
-                else:
-                    add_data(model_name, data_dict)
-            page.go(redirect_to)
-        else:
-            dialog = ft.AlertDialog(
-                title=ft.Text("Error"),
-                content=ft.Text("All fields are required"),
-                actions=[
-                    ft.ElevatedButton(
-                        content=ft.Text("OK"),
-                        on_click=lambda e: page.close(dialog)
-                    )
-                ],
+                written = add_data(model_name, data_dict, wait=False)
+            when_written(
+                page,
+                written,
+                on_done=lambda _: page.go(redirect_to),
+                on_error=lambda e: _show_error(f"Could not save : {e}"),
             )
-            page.open(dialog)
+        else:
+            _show_error(error)
+
+    def _show_error(error: str):
+        dialog = ft.AlertDialog(
+            title=ft.Text("Error"),
+            content=ft.Text(error),
+            actions=[
+                ft.ElevatedButton(
+                    content=ft.Text("OK"),
+                    on_click=lambda e: page.close(dialog)
+                )
+            ],
+        )
+        page.open(dialog)
 
     submit_button = ft.ElevatedButton(
         text="SUBMIT",
@@ -3,6 +3,8 @@ from bs4 import BeautifulSoup
 import json
 import os
 import flet as ft
+from templates.components.lol_assets import sync_champion_icons
+from templates.components.lol_champions import get_champion_store
 
 
 def test():
@@ -33,14 +35,8 @@ def get_json(url="https://ddragon.leagueoflegends.com/cdn/14.19.1/data/en_US/cha
     with open(os.path.join(os.path.dirname(__file__), "champion.json"), "w", encoding="utf-8") as f:
         json.dump(downloadData, f, ensure_ascii=False)
 
-def load_champs_json():
-    with open(os.path.join(os.path.dirname(__file__), "../../database/champion.json"), "r", encoding="utf-8") as f:
-        downloadData = json.load(f)
-    return downloadData["data"]
-
 def get_champ(champ_name):
-    champs = load_champs_json()
-    return champs[champ_name]
+    return get_champion_store().get(champ_name)
 
 def get_champ_img(champ_name):
     return f"https://ddragon.leagueoflegends.com/cdn/img/champion/splash/{champ_name}_0.jpg"
@@ -79,15 +75,16 @@ def main(page: ft.Page):
 
 def download_champ_img(target_name="Aatrox", target_key=None, all=False):
     if all:
-        champs = load_champs_json()
-    elif target_key is not None:
-        champs = {target_name: {"key": target_key}}
+        # parallel and incremental, see lol_assets
+        return sync_champion_icons()
+    if target_key is not None:
+        champs = {target_name: target_key}
     else:
-        champs = get_champ(target_name)
+        champ = get_champ(target_name)
+        champs = {champ.id: champ.key}
 
     failed_list = []
-    for name, champ_data in champs.items():
-        key = champ_data["key"]
+    for name, key in champs.items():
         img_url = f"https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/champion-icons/{key}.png"
         response = requests.get(img_url)
         print(f"Downloading {name}...", end="")
@@ -0,0 +1,188 @@
+"""
+Champion Asset Sync Module
+
+This module keeps the champion icons in `static/images/champion-icons/` in
+sync with Community Dragon, for every champion of `database/champion.json`.
+
+Icons are downloaded in parallel by a bounded pool, through the resilient
+HTTP client (timeouts, retries, circuit breaker). A manifest next to the icons
+records, per champion, the Data Dragon version it was last checked for and the
+sha256 and ETag of its icon :
+- an icon already checked for the current version is skipped without a request,
+- after a version change, icons are revalidated with their ETag, and a
+  downloaded icon with the same hash is not rewritten,
+- only new or changed icons are written, each to a temporary file first, then
+  moved into place (a reader never sees a partial icon).
+The manifest is saved every few icons and when the sync stops, so an
+interrupted sync resumes where it stopped.
+
+Key Components:
+- IconManifest(path: str):
+  The manifest (`manifest.json` in the icon directory) : `entries` by
+  champion id, `save()` writes it atomically.
+
+- sync_champion_icons(icon_dir: str=None, base_url: str=None, max_workers: int=None, client: HTTPClient=None, store: ChampionStore=None, force: bool=False, on_progress=None):
+  Syncs the icons and returns the ids per outcome :
+  {"downloaded": new, "updated": changed, "unchanged": same content,
+  "skipped": already checked for this version, "failed": not fetched}.
+  `force` revalidates every icon. `on_progress(champion_id, outcome)` is
+  called after each icon.
+
+Custom Configuration:
+CHAMPION_ICON_BASE_URL (point it at a local server to test), ASSET_SYNC_WORKERS
+and ASSET_SYNC_SAVE_EVERY in `settings.py`.
+
+Run from the repository root, then rebuild the thumbnails and atlases
+(see lol_icon_atlas, both run before the app in the `Procfile`):
+
+    python -m templates.components.lol_assets [--force]
+    python -m templates.components.lol_icon_atlas
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+import settings
+from app.http_client import HTTPClient
+from templates.components.lol_champions import ChampionStore, get_champion_store
+
+
+def _write_atomic(path: str, content: bytes):
+    directory = os.path.dirname(path) or "."
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".", suffix=".part", delete=False) as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.remove(f.name)
+        raise
+
+
+# manifest file name, in the icon directory
+MANIFEST_NAME = "manifest.json"
+
+
+class IconManifest():
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)["icons"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def save(self):
+        content = json.dumps({"icons": self.entries}, indent=1, sort_keys=True)
+        _write_atomic(self.path, content.encode("utf-8"))
+
+
+def _client(max_workers: int):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return HTTPClient(session=session)
+
+
+def _sync_icon(client: HTTPClient, url: str, path: str, entry: dict):
+    # returns (outcome, sha256, etag)
+    headers = {}
+    if entry and entry.get("etag") and os.path.exists(path):
+        headers["If-None-Match"] = entry["etag"]
+    try:
+        response = client.get(url, headers=headers)
+    except requests.RequestException:
+        return "failed", None, None
+    if response.status_code == 304:
+        return "unchanged", entry["sha256"], entry["etag"]
+    if response.status_code != 200 or not response.content:
+        return "failed", None, None
+
+    sha256 = hashlib.sha256(response.content).hexdigest()
+    etag = response.headers.get("ETag")
+    if entry and entry.get("sha256") == sha256 and os.path.exists(path):
+        return "unchanged", sha256, etag
+    outcome = "updated" if os.path.exists(path) else "downloaded"
+    _write_atomic(path, response.content)
+    return outcome, sha256, etag
+
+
+def sync_champion_icons(
+        icon_dir: str=None,
+        base_url: str=None,
+        max_workers: int=None,
+        client: HTTPClient=None,
+        store: ChampionStore=None,
+        force: bool=False,
+        on_progress=None,
+    ):
+    icon_dir = icon_dir or settings.CHAMPION_ICON_DIR
+    base_url = (base_url or settings.CHAMPION_ICON_BASE_URL).rstrip("/")
+    max_workers = max_workers or settings.ASSET_SYNC_WORKERS
+    client = client or _client(max_workers)
+    store = store or get_champion_store()
+    os.makedirs(icon_dir, exist_ok=True)
+    manifest = IconManifest(os.path.join(icon_dir, MANIFEST_NAME))
+
+    # every champion, plus the fallback icon (key -1)
+    targets = {champion.id: champion.key for champion in store}
+    targets[os.path.splitext(settings.CHAMPION_ICON_FALLBACK)[0]] = -1
+
+    results = {"downloaded": [], "updated": [], "unchanged": [], "skipped": [], "failed": []}
+    pending = {}
+    for champion_id, key in targets.items():
+        path = os.path.join(icon_dir, f"{champion_id}.png")
+        entry = manifest.entries.get(champion_id)
+        if not force and entry and entry.get("version") == store.version and os.path.exists(path):
+            results["skipped"].append(champion_id)
+            continue
+        pending[champion_id] = (f"{base_url}/{key}.png", path, entry)
+
+    def _record(champion_id, outcome, sha256, etag):
+        results[outcome].append(champion_id)
+        if outcome != "failed":
+            manifest.entries[champion_id] = {
+                "version": store.version,
+                "key": targets[champion_id],
+                "sha256": sha256,
+                "etag": etag,
+            }
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-sync")
+    futures = {}
+    recorded = set()
+    try:
+        futures = {
+            executor.submit(_sync_icon, client, url, path, entry): champion_id
+            for champion_id, (url, path, entry) in pending.items()
+        }
+        for future in as_completed(futures):
+            champion_id = futures[future]
+            outcome, sha256, etag = future.result()
+            _record(champion_id, outcome, sha256, etag)
+            recorded.add(future)
+            if len(recorded) % settings.ASSET_SYNC_SAVE_EVERY == 0:
+                manifest.save()
+            if on_progress is not None:
+                on_progress(champion_id, outcome)
+    finally:
+        # when interrupted : let the running downloads finish and keep everything done so far
+        executor.shutdown(wait=True, cancel_futures=True)
+        for future, champion_id in futures.items():
+            if future not in recorded and future.done() and not future.cancelled() and future.exception() is None:
+                _record(champion_id, *future.result())
+        manifest.save()
+    return results
+
+
+if __name__ == "__main__":
+    results = sync_champion_icons(force="--force" in sys.argv[1:])
+    for outcome, champion_ids in results.items():
+        print(f"{outcome:10} {len(champion_ids):4} {' '.join(sorted(champion_ids)) if outcome != 'skipped' else ''}")
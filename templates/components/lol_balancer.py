@@ -0,0 +1,591 @@
+"""
+Team Balancer Module
+
+This module splits players into two teams with the closest total scores for
+the LoL Custom Organizer.
+
+The first player is always put on the first team, so each split is enumerated
+once instead of twice (team A vs B and its mirror B vs A). The splits of n
+players are precomputed once as bitmasks and a 0/1 membership matrix, and the
+team totals of every split are computed with one matrix product.
+
+Key Components:
+- summoner_key(summoner):
+  The identity of a summoner : (region, summoner_name, tag).
+
+- team_splits(player_count: int, team_size: int):
+  Returns (masks, membership) for every split with player 0 on the first team :
+  `masks[i]` has bit j set when player j is on the first team of split i,
+  and `membership[i, j]` is the same bit as a 0/1 matrix. Cached per size.
+
+- balance_teams(players: list, scores: list, top_n: int=5, team_size: int=5):
+  Returns the `top_n` most balanced splits, best first, as
+  (score difference, first team, second team) with teams as lists of players.
+
+- partition_lobbies(players: list, scores: list, top_n: int=3, team_size: int=5, time_limit: float=0.5, seed: int=None):
+  Splits 10 players or more into as many full 5v5 lobbies as they fill at once.
+  Players are given in priority order : the ones past the last full lobby wait
+  on the bench. Returns up to `top_n` partitions ranked by their worst lobby
+  difference (then the sum of all differences), as (worst difference, lobbies,
+  bench) with each lobby given like a balance_teams result, strongest lobby first.
+  Teams start from a balanced Karmarkar-Karp differencing, then player swaps
+  between the worst lobby and the others are applied while they lower the worst
+  difference. Until `time_limit` seconds have passed, the search restarts from
+  randomly perturbed copies of the best partitions found so far.
+
+- player_profile(summoner, score: int=None):
+  A PlayerProfile (score, playable lanes as a bitmask over LANES, mastery depth)
+  from the summoner's top champions : each champion's points count for the lanes
+  of its Data Dragon class (TAG_LANES).
+
+- balance_constrained(profiles: list, must_split: list=(), must_together: list=(), team_size: int=5, lane_weight: float=100, mastery_weight: float=1.0, time_limit: float=None):
+  Splits a multiple of 10 players into 5v5 lobbies, minimizing the worst lobby cost :
+  score difference + lane_weight * lanes not covered by a distinct player of
+  each team + mastery_weight * mastery difference. `must_split` / `must_together`
+  are pairs of player indices that must be on different teams / the same team
+  (together pairs sharing a player chain into one team).
+  Branch-and-bound over the team of each player, strongest first, pruned with
+  a lower bound of each lobby cost. With more than one lobby, the search starts
+  from a partition_lobbies grouping solved lobby by lobby. Stops after
+  `time_limit` seconds (settings.CONSTRAINED_SEARCH_TIME_LIMIT).
+  Returns (worst cost, whether it is proven optimal, lobbies) with lobbies as
+  (cost, first team indices, second team indices), strongest lobby first.
+
+- roster_signature(summoners: list):
+  The canonical key of a roster given as (summoner, score) pairs, in order :
+  a tuple of (id, score).
+
+- GroupingCache(max_entries: int=None):
+  A thread-safe LRU of grouping results : `get(key)` / `put(key, value)`,
+  `clear()` and `stats()` (hits, misses, evictions, invalidations, size).
+  Keeps settings.GROUPING_CACHE_SIZE entries by default.
+"""
+
+import collections
+import functools
+import heapq
+import itertools
+import math
+import threading
+import time
+import numpy as np
+import settings
+from templates.components.lol_champions import get_champion_store
+
+
+def summoner_key(summoner):
+    return (summoner.region, summoner.summoner_name, summoner.tag)
+
+
+@functools.lru_cache(maxsize=None)
+def team_splits(player_count: int, team_size: int):
+    # player 0 is fixed on the first team : choose its team_size - 1 teammates among the others
+    teammates = np.array(list(itertools.combinations(range(1, player_count), team_size - 1)), dtype=np.intp)
+    membership = np.zeros((len(teammates), player_count), dtype=np.int8)
+    membership[:, 0] = 1
+    membership[np.arange(len(teammates))[:, None], teammates] = 1
+    masks = membership.astype(np.int64) @ (np.int64(1) << np.arange(player_count, dtype=np.int64))
+    membership.flags.writeable = False
+    masks.flags.writeable = False
+    return masks, membership
+
+
+def balance_teams(players: list, scores: list, top_n: int=5, team_size: int=5):
+    if len(players) != 2 * team_size or len(scores) != len(players):
+        raise ValueError(f"{2 * team_size} players with one score each are required")
+    masks, membership = team_splits(len(players), team_size)
+    scores = np.asarray(scores, dtype=np.int64)
+    first_totals = membership @ scores
+    diffs = np.abs(2 * first_totals - scores.sum())
+
+    best = heapq.nsmallest(top_n, zip(diffs.tolist(), masks.tolist()))
+    return [
+        (
+            diff,
+            [player for i, player in enumerate(players) if mask >> i & 1],
+            [player for i, player in enumerate(players) if not mask >> i & 1],
+        )
+        for diff, mask in best
+    ]
+
+
+# multi-lobby partitioning
+def _lobby_diffs(lobby_scores, membership):
+    # best score difference of each lobby : lobby_scores is (lobbies, players per lobby)
+    totals = lobby_scores @ membership.T
+    return np.abs(2 * totals - lobby_scores.sum(axis=1, keepdims=True)).min(axis=1)
+
+
+def _differencing_teams(scores, team_count: int, team_size: int):
+    # balanced Karmarkar-Karp : each partial solution holds team_count teams of equal size,
+    # the two with the largest spread are merged by pairing the heaviest teams of one with the lightest of the other
+    order = np.argsort(-scores, kind="stable")
+    heap = []
+    for n, start in enumerate(range(0, len(order), team_count)):
+        teams = sorted(([int(scores[i]), [int(i)]] for i in order[start:start + team_count]), key=lambda team: -team[0])
+        heapq.heappush(heap, (-(teams[0][0] - teams[-1][0]), n, teams))
+    n = len(heap)
+    while len(heap) > 1:
+        _, _, heavy = heapq.heappop(heap)
+        _, _, light = heapq.heappop(heap)
+        teams = sorted(
+            ([a[0] + b[0], a[1] + b[1]] for a, b in zip(heavy, reversed(light))),
+            key=lambda team: -team[0],
+        )
+        n += 1
+        heapq.heappush(heap, (-(teams[0][0] - teams[-1][0]), n, teams))
+    return [members for _, members in heap[0][2]]
+
+
+def _improve(lobbies, scores, membership, rng, deadline: float):
+    # swap players between the worst lobby and the others while the worst difference goes down
+    lobby_size = lobbies.shape[1]
+    while time.monotonic() < deadline:
+        diffs = _lobby_diffs(scores[lobbies], membership)
+        worst = int(np.argmax(diffs))
+        if diffs[worst] == 0:
+            break
+        worst_scores = scores[lobbies[worst]]
+        best = (diffs[worst], None)
+        for other in rng.permutation(len(lobbies)):
+            if other == worst:
+                continue
+            other_scores = scores[lobbies[other]]
+            # every (i, j) swap of worst[i] with other[j] at once : (lobby_size, lobby_size) candidate lobbies
+            delta = other_scores[None, :] - worst_scores[:, None]
+            swapped_worst = np.broadcast_to(worst_scores, (lobby_size, lobby_size, lobby_size)).copy()
+            swapped_other = np.broadcast_to(other_scores, (lobby_size, lobby_size, lobby_size)).copy()
+            rows, columns = np.indices((lobby_size, lobby_size))
+            swapped_worst[rows, columns, rows] += delta
+            swapped_other[rows, columns, columns] -= delta
+            new_worst = _lobby_diffs(swapped_worst.reshape(-1, lobby_size), membership).reshape(lobby_size, lobby_size)
+            new_other = _lobby_diffs(swapped_other.reshape(-1, lobby_size), membership).reshape(lobby_size, lobby_size)
+            candidate = np.maximum(new_worst, new_other)
+            i, j = np.unravel_index(int(np.argmin(candidate)), candidate.shape)
+            if candidate[i, j] < best[0]:
+                best = (candidate[i, j], (other, i, j))
+        if best[1] is None:
+            break
+        other, i, j = best[1]
+        lobbies[worst, i], lobbies[other, j] = lobbies[other, j], lobbies[worst, i]
+    return lobbies
+
+
+def _perturb(lobbies, rng, swaps: int):
+    lobbies = lobbies.copy()
+    for _ in range(swaps):
+        a, b = rng.choice(len(lobbies), size=2, replace=False)
+        i, j = rng.integers(lobbies.shape[1], size=2)
+        lobbies[a, i], lobbies[b, j] = lobbies[b, j], lobbies[a, i]
+    return lobbies
+
+
+def partition_lobbies(players: list, scores: list, top_n: int=3, team_size: int=5, time_limit: float=0.5, seed: int=None):
+    lobby_size = 2 * team_size
+    if len(players) < lobby_size or len(scores) != len(players):
+        raise ValueError(f"at least {lobby_size} players with one score each are required")
+    # players past the last full lobby wait on the bench
+    lobby_count = len(players) // lobby_size
+    bench = list(players[lobby_count * lobby_size:])
+    players = list(players[:lobby_count * lobby_size])
+    scores = np.asarray(scores[:lobby_count * lobby_size], dtype=np.int64)
+    _, membership = team_splits(lobby_size, team_size)
+    rng = np.random.default_rng(seed)
+    deadline = time.monotonic() + time_limit
+
+    # start : differencing teams, paired with the team closest in total
+    teams = _differencing_teams(scores, 2 * lobby_count, team_size)
+    teams.sort(key=lambda members: int(scores[members].sum()))
+    lobbies = np.array([teams[i] + teams[i + 1] for i in range(0, len(teams), 2)], dtype=np.intp)
+
+    # anytime search : local search, then restarts from perturbed copies of the best partitions
+    found = {}
+    current = lobbies
+    while True:
+        current = _improve(current, scores, membership, rng, deadline)
+        diffs = _lobby_diffs(scores[current], membership)
+        key = frozenset(frozenset(lobby.tolist()) for lobby in current)
+        found.setdefault(key, (int(diffs.max()), int(diffs.sum()), current.copy()))
+        if time.monotonic() >= deadline or lobby_count == 1:
+            break
+        best = heapq.nsmallest(top_n, found.values(), key=lambda entry: entry[:2])
+        if len(best) == top_n and best[-1][1] == 0:
+            break
+        current = _perturb(best[int(rng.integers(len(best)))][2], rng, swaps=max(2, lobby_count // 4))
+
+    partitions = []
+    for worst, _, lobbies in heapq.nsmallest(top_n, found.values(), key=lambda entry: entry[:2]):
+        # strongest lobby first
+        lobbies = sorted(lobbies, key=lambda lobby: -int(scores[lobby].sum()))
+        partitions.append((worst, [
+            balance_teams([players[i] for i in lobby], scores[lobby].tolist(), top_n=1, team_size=team_size)[0]
+            for lobby in lobbies
+        ], bench))
+    return partitions
+
+
+# role- and mastery-aware balancing
+LANES = ["top", "jungle", "mid", "bot", "support"]
+
+# champion class (Data Dragon tag) -> lanes it is usually played in
+TAG_LANES = {
+    "Fighter": ["top", "jungle"],
+    "Tank": ["top", "support"],
+    "Mage": ["mid", "support"],
+    "Assassin": ["mid", "jungle"],
+    "Marksman": ["bot"],
+    "Support": ["support"],
+}
+
+# a lane counts as playable when it holds this share of the player's mastery points
+LANE_SHARE = 0.2
+
+
+
+class PlayerProfile():
+    def __init__(self, score: int, lanes: int=0, mastery: int=0):
+        self.score = score
+        # bitmask over LANES
+        self.lanes = lanes
+        self.mastery = mastery
+
+
+def player_profile(summoner, score: int=None):
+    champs_name = [name for name in summoner.champs_name.split("|") if name]
+    champs_point = [int(point.replace(",", "") or 0) for point in summoner.champs_point.split("|") if point]
+    champions = get_champion_store()
+    lane_points = dict.fromkeys(LANES, 0)
+    for champ_name, champ_point in zip(champs_name, champs_point):
+        champion = champions.get(champ_name)
+        lanes = {lane for tag in (champion.tags if champion else ()) for lane in TAG_LANES.get(tag, [])}
+        for lane in lanes:
+            lane_points[lane] += champ_point / len(lanes)
+    total = sum(champs_point)
+    lanes = 0
+    if total:
+        top_lane = max(LANES, key=lambda lane: lane_points[lane])
+        for i, lane in enumerate(LANES):
+            if lane == top_lane or lane_points[lane] >= LANE_SHARE * total:
+                lanes |= 1 << i
+    return PlayerProfile(
+        score=int(summoner.score) if score is None else score,
+        lanes=lanes,
+        mastery=round(100 * math.log10(1 + total / 10000)),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _coverage(reachable: int):
+    # most lanes covered by distinct players, among the reachable lane sets
+    return max(bin(lanes).count("1") for lanes in range(1 << len(LANES)) if reachable >> lanes & 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _add_lanes(reachable: int, player_lanes: int):
+    # lane sets reachable once the player takes one more lane (or none of theirs)
+    result = reachable
+    for lanes in range(1 << len(LANES)):
+        if reachable >> lanes & 1:
+            for lane in range(len(LANES)):
+                if player_lanes >> lane & 1 and not lanes >> lane & 1:
+                    result |= 1 << (lanes | 1 << lane)
+    return result
+
+
+class _Search():
+    # depth-first branch-and-bound over the team of each player, strongest player first
+    def __init__(self, profiles, must_split, must_together, team_size, lane_weight, mastery_weight, deadline):
+        self.profiles = profiles
+        self.team_size = team_size
+        self.lane_weight = lane_weight
+        self.mastery_weight = mastery_weight
+        self.deadline = deadline
+        self.player_count = len(profiles)
+        self.team_count = 2 * (self.player_count // (2 * team_size))
+
+        # the players left are always a suffix of `scores`, so bounds use prefix sums
+        self.order = sorted(range(self.player_count), key=lambda i: -profiles[i].score)
+        position = {player: k for k, player in enumerate(self.order)}
+        self.prefix = [0]
+        for i in self.order:
+            self.prefix.append(self.prefix[-1] + profiles[i].score)
+        self.together = [[] for _ in self.order]
+        self.split = [[] for _ in self.order]
+        for pairs, links in [(must_together, self.together), (must_split, self.split)]:
+            for a, b in pairs:
+                links[position[a]].append(position[b])
+                links[position[b]].append(position[a])
+
+        self.team_of = [-1] * self.player_count
+        self.team_score = [0] * self.team_count
+        self.team_mastery = [0] * self.team_count
+        self.team_members = [0] * self.team_count
+        self.team_reach = [1] * self.team_count
+        self.best_cost = (math.inf, math.inf)
+        self.best_teams = None
+        self.optimal = True
+        self.nodes = 0
+
+    def place(self, k: int, t: int):
+        profile = self.profiles[self.order[k]]
+        self.team_of[k] = t
+        self.team_score[t] += profile.score
+        self.team_mastery[t] += profile.mastery
+        self.team_members[t] += 1
+        reach = self.team_reach[t]
+        self.team_reach[t] = _add_lanes(reach, profile.lanes)
+        return reach
+
+    def unplace(self, k: int, t: int, reach: int):
+        profile = self.profiles[self.order[k]]
+        self.team_of[k] = -1
+        self.team_score[t] -= profile.score
+        self.team_mastery[t] -= profile.mastery
+        self.team_members[t] -= 1
+        self.team_reach[t] = reach
+
+    def lobby_cost(self, lobby: int):
+        a, b = 2 * lobby, 2 * lobby + 1
+        lane_gap = 2 * len(LANES) - _coverage(self.team_reach[a]) - _coverage(self.team_reach[b])
+        return (
+            abs(self.team_score[a] - self.team_score[b])
+            + self.lane_weight * lane_gap
+            + self.mastery_weight * abs(self.team_mastery[a] - self.team_mastery[b])
+        )
+
+    def lobby_bound(self, lobby: int, placed: int):
+        a, b = 2 * lobby, 2 * lobby + 1
+        if self.team_score[a] < self.team_score[b]:
+            a, b = b, a
+        # best case : the lighter team b gets the strongest players left, the heavier team a the weakest
+        free_a, free_b = self.team_size - self.team_members[a], self.team_size - self.team_members[b]
+        gain = (self.prefix[placed + free_b] - self.prefix[placed]) - (self.prefix[-1] - self.prefix[-1 - free_a] if free_a else 0)
+        score_bound = max(0, self.team_score[a] - self.team_score[b] - gain)
+        # each player still to come covers at most one more lane
+        lane_bound = sum(
+            max(0, len(LANES) - _coverage(self.team_reach[t]) - (self.team_size - self.team_members[t]))
+            for t in [a, b]
+        )
+        return score_bound + self.lane_weight * lane_bound
+
+    def bound(self, placed: int):
+        return max(self.lobby_bound(lobby, placed) for lobby in range(self.team_count // 2))
+
+    def children(self, k: int):
+        seen_empty_lobby = False
+        for t in range(self.team_count):
+            if self.team_members[t] == self.team_size:
+                continue
+            if any(self.team_of[q] not in (-1, t) for q in self.together[k]):
+                continue
+            if any(self.team_of[q] == t for q in self.split[k]):
+                continue
+            if self.team_members[t] == 0 and self.team_members[t ^ 1] == 0:
+                # every team of an empty lobby is the same choice
+                if seen_empty_lobby:
+                    continue
+                seen_empty_lobby = True
+            reach = self.place(k, t)
+            yield self.bound(k + 1), t
+            self.unplace(k, t, reach)
+
+    def run(self, k: int=0):
+        self.nodes += 1
+        if self.nodes % 1024 == 0 and time.monotonic() > self.deadline:
+            self.optimal = False
+            raise TimeoutError
+        if k == self.player_count:
+            costs = [self.lobby_cost(lobby) for lobby in range(self.team_count // 2)]
+            cost = (max(costs), sum(costs))
+            if cost < self.best_cost:
+                self.best_cost = cost
+                self.best_teams = self.teams()
+            return
+        for child_bound, t in sorted(self.children(k)):
+            if child_bound >= self.best_cost[0]:
+                break
+            reach = self.place(k, t)
+            self.run(k + 1)
+            self.unplace(k, t, reach)
+
+    def teams(self):
+        teams = [[] for _ in range(self.team_count)]
+        for k, t in enumerate(self.team_of):
+            teams[t].append(self.order[k])
+        return teams
+
+    def satisfies(self, team_of: list):
+        # team_of in search order : every must-together pair shares a team, every must-split pair does not
+        return all(
+            all(team_of[q] == team_of[k] for q in self.together[k]) and all(team_of[q] != team_of[k] for q in self.split[k])
+            for k in range(self.player_count)
+        )
+
+    def evaluate(self, teams: list):
+        # cost of a complete grouping, used as the starting incumbent ; a grouping breaking
+        # the constraints is never installed (returns False)
+        team_by_player = {i: t for t, members in enumerate(teams) for i in members}
+        team_of = [team_by_player.get(i, -1) for i in self.order]
+        if (
+            len(teams) != self.team_count
+            or any(len(members) != self.team_size for members in teams)
+            or -1 in team_of
+            or not self.satisfies(team_of)
+        ):
+            return False
+        for k, t in enumerate(team_of):
+            self.place(k, t)
+        costs = [self.lobby_cost(lobby) for lobby in range(self.team_count // 2)]
+        self.best_cost = (max(costs), sum(costs))
+        self.best_teams = [list(members) for members in teams]
+        for k in reversed(range(self.player_count)):
+            t = self.team_of[k]
+            self.unplace(k, t, functools.reduce(
+                lambda reach, q: _add_lanes(reach, self.profiles[self.order[q]].lanes),
+                [q for q in range(k) if self.team_of[q] == t],
+                1,
+            ))
+        return True
+
+
+def _together_groups(player_count: int, must_together: list):
+    # must-together pairs merged into groups (union-find) : (a, b), (c, b) puts a, b and c on one team
+    parent = list(range(player_count))
+
+    def _root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in must_together:
+        parent[_root(a)] = _root(b)
+    groups = {}
+    for i in range(player_count):
+        groups.setdefault(_root(i), []).append(i)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _lobby_teams(profiles, must_split, must_together, team_size, lane_weight, mastery_weight, deadline):
+    # heuristic grouping for several lobbies : lobbies from partition_lobbies (score only),
+    # players moved so that must-together groups share a lobby, then each lobby solved exactly
+    lobby_size = 2 * team_size
+    scores = [profile.score for profile in profiles]
+    budget = max(0.0, deadline - time.monotonic())
+    _, lobbies, _ = partition_lobbies(list(range(len(profiles))), scores, top_n=1, team_size=team_size, time_limit=budget / 4, seed=0)[0]
+    lobby_of = {}
+    members = []
+    for lobby, (_, team1, team2) in enumerate(lobbies):
+        members.append(team1 + team2)
+        for i in team1 + team2:
+            lobby_of[i] = lobby
+    # each must-together group is moved as a unit into the lobby holding most of it,
+    # swapping its other members with the closest-scored free players of that lobby
+    groups = _together_groups(len(profiles), must_together)
+    grouped = {i for group in groups for i in group}
+    for group in sorted(groups, key=len, reverse=True):
+        if len(group) > team_size:
+            return None
+        target = max(range(len(members)), key=lambda lobby: (sum(lobby_of[i] == lobby for i in group), -lobby))
+        for b in group:
+            if lobby_of[b] == target:
+                continue
+            candidates = [c for c in members[target] if c not in grouped]
+            if not candidates:
+                return None
+            c = min(candidates, key=lambda c: abs(scores[c] - scores[b]))
+            source = lobby_of[b]
+            members[target][members[target].index(c)] = b
+            members[source][members[source].index(b)] = c
+            lobby_of[b], lobby_of[c] = target, source
+
+    teams = []
+    for lobby_members in members:
+        local = {i: n for n, i in enumerate(lobby_members)}
+        search = _Search(
+            [profiles[i] for i in lobby_members],
+            [(local[a], local[b]) for a, b in must_split if a in local and b in local],
+            [(local[a], local[b]) for a, b in must_together if a in local and b in local],
+            team_size, lane_weight, mastery_weight, deadline=math.inf,
+        )
+        search.run()
+        if search.best_teams is None:
+            return None
+        teams.extend([lobby_members[n] for n in team] for team in search.best_teams)
+    return teams
+
+
+def balance_constrained(
+        profiles: list,
+        must_split: list=(),
+        must_together: list=(),
+        team_size: int=5,
+        lane_weight: float=100,
+        mastery_weight: float=1.0,
+        time_limit: float=None,
+    ):
+    lobby_size = 2 * team_size
+    if not profiles or len(profiles) % lobby_size:
+        raise ValueError(f"a multiple of {lobby_size} players is required")
+    time_limit = settings.CONSTRAINED_SEARCH_TIME_LIMIT if time_limit is None else time_limit
+    deadline = time.monotonic() + time_limit
+    search = _Search(profiles, must_split, must_together, team_size, lane_weight, mastery_weight, deadline)
+    if len(profiles) > lobby_size:
+        teams = _lobby_teams(profiles, must_split, must_together, team_size, lane_weight, mastery_weight, deadline)
+        if teams is not None:
+            search.evaluate(teams)
+    try:
+        search.run()
+    except TimeoutError:
+        pass
+    if search.best_teams is None:
+        raise ValueError("no grouping satisfies the constraints")
+
+    lobbies = []
+    for lobby in range(search.team_count // 2):
+        team1, team2 = search.best_teams[2 * lobby], search.best_teams[2 * lobby + 1]
+        check = _Search([profiles[i] for i in team1 + team2], [], [], team_size, lane_weight, mastery_weight, math.inf)
+        check.evaluate([list(range(team_size)), list(range(team_size, lobby_size))])
+        lobbies.append((check.best_cost[0], team1, team2))
+    # strongest lobby first
+    lobbies.sort(key=lambda lobby: -sum(profiles[i].score for i in lobby[1] + lobby[2]))
+    return search.best_cost[0], search.optimal, lobbies
+
+
+def roster_signature(summoners: list):
+    return tuple((summoner.id, score) for summoner, score in summoners)
+
+
+class GroupingCache():
+    def __init__(self, max_entries: int=None):
+        self.max_entries = settings.GROUPING_CACHE_SIZE if max_entries is None else max_entries
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            if self._entries:
+                self.counters["invalidations"] += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "size": len(self._entries)}
@@ -0,0 +1,264 @@
+"""
+Champion Data Module
+
+This module holds the champion metadata of `database/champion.json` (Data
+Dragon) and resolves champion names to the icon files in
+`static/images/champion-icons/`, without touching the disk on every render.
+The icons are saved under the Data Dragon champion id (MonkeyKing.png), while
+op.gg shows display names (Wukong, Kai'Sa, Nunu & Willump).
+
+Key Components:
+- normalize_champion_name(name: str):
+  The lookup form of a name : lowercase, letters and digits only
+  ("Kai'Sa" -> "kaisa", "Nunu & Willump" -> "nunuwillump").
+
+- Champion(id, key, name, tags, image):
+  The fields of a champion we use, with __slots__ : Data Dragon id
+  ("MonkeyKing"), numeric key (62), display name ("Wukong"), class tags
+  (("Fighter", "Tank")) and image file name ("MonkeyKing.png").
+
+- ChampionStore(champion_json_path: str=None, snapshot_path: str=None):
+  Every champion of champion.json, looked up in O(1) with `get(name)` by
+  display name, id or numeric key (any case and punctuation) or `by_key(key)`.
+  The parsed champions are saved to a marshal snapshot next to the database
+  (settings.CHAMPION_SNAPSHOT_PATH), loaded instead of the JSON while it
+  matches the size and modification time of champion.json. Pass
+  snapshot_path="" to always parse the JSON.
+
+- get_champion_store(reload: bool=False):
+  The shared store, loaded on first use (or again with reload=True).
+  `is_stale()` tells whether champion.json changed since it was loaded.
+
+- ChampionIcons(icon_dir: str=None, champion_json_path: str=None, fallback: str=None, reload_interval: float=None):
+  The icon index : every display name, id and key of the ChampionStore maps to
+  the icon of the champion, and every icon file name to itself. `resolve(name)`
+  returns the icon path of a display name, id or key, or the fallback icon
+  when none matches. The index is built once, then
+  rebuilt when the icon directory or champion.json changes ; their modification
+  times are checked at most every `reload_interval` seconds.
+
+- get_champion_icons() / champion_icon(name: str):
+  The shared index (built on first use) and a shortcut to its `resolve`.
+
+Custom Configuration:
+CHAMPION_JSON_PATH, CHAMPION_SNAPSHOT_PATH, CHAMPION_ICON_DIR,
+CHAMPION_ICON_FALLBACK and CHAMPION_ICON_RELOAD_INTERVAL in `settings.py`.
+"""
+
+import json
+import marshal
+import os
+import re
+import threading
+import time
+import settings
+
+
+def normalize_champion_name(name: str):
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+
+class Champion():
+    __slots__ = ("id", "key", "name", "tags", "image")
+
+    def __init__(self, id: str, key: int, name: str, tags: tuple, image: str):
+        self.id = id
+        self.key = key
+        self.name = name
+        self.tags = tags
+        self.image = image
+
+    def __repr__(self):
+        return f"Champion({self.id!r}, {self.key}, {self.name!r})"
+
+
+# bumped when the snapshot layout changes
+SNAPSHOT_FORMAT = 1
+
+
+class ChampionStore():
+    def __init__(self, champion_json_path: str=None, snapshot_path: str=None):
+        self.champion_json_path = champion_json_path or settings.CHAMPION_JSON_PATH
+        self.snapshot_path = settings.CHAMPION_SNAPSHOT_PATH if snapshot_path is None else snapshot_path
+        self.signature = None
+        self.version, rows = self._load()
+        # champions share their tag tuples
+        tag_tuples = {}
+        self.champions = [
+            Champion(id, key, name, tag_tuples.setdefault(tags, tags), image)
+            for id, key, name, tags, image in rows
+        ]
+        self._by_key = {champion.key: champion for champion in self.champions}
+        self._index = {}
+        for champion in self.champions:
+            for alias in [champion.name, champion.id]:
+                self._index[alias] = champion
+                self._index[normalize_champion_name(alias)] = champion
+            self._index[str(champion.key)] = champion
+
+    def _source_signature(self):
+        stat = os.stat(self.champion_json_path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _load(self):
+        # returns (version, rows) with rows as (id, key, name, tags, image) tuples
+        try:
+            signature = self._source_signature()
+        except OSError:
+            return None, ()
+        self.signature = signature
+        if self.snapshot_path:
+            try:
+                with open(self.snapshot_path, "rb") as f:
+                    snapshot_format, snapshot_signature, version, rows = marshal.load(f)
+                if snapshot_format == SNAPSHOT_FORMAT and tuple(snapshot_signature) == signature:
+                    return version, rows
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+
+        with open(self.champion_json_path, encoding="utf-8") as f:
+            data = json.load(f)
+        version = data.get("version")
+        rows = tuple(
+            (champion["id"], int(champion["key"]), champion["name"], tuple(champion["tags"]), champion["image"]["full"])
+            for champion in data["data"].values()
+        )
+        if self.snapshot_path:
+            self._save_snapshot(signature, version, rows)
+        return version, rows
+
+    def _save_snapshot(self, signature, version, rows):
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                marshal.dump((SNAPSHOT_FORMAT, signature, version, rows), f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            pass
+
+    def is_stale(self):
+        try:
+            return self._source_signature() != self.signature
+        except OSError:
+            return self.signature is not None
+
+    def get(self, name):
+        # display name, id or numeric key ; None when unknown
+        if isinstance(name, int):
+            return self._by_key.get(name)
+        if not name:
+            return None
+        champion = self._index.get(name)
+        if champion is None:
+            champion = self._index.get(normalize_champion_name(name))
+        return champion
+
+    def by_key(self, key: int):
+        return self._by_key.get(int(key))
+
+    def __iter__(self):
+        return iter(self.champions)
+
+    def __len__(self):
+        return len(self.champions)
+
+
+_champion_store = None
+_champion_store_lock = threading.Lock()
+
+
+def get_champion_store(reload: bool=False):
+    global _champion_store
+    if _champion_store is None or reload:
+        with _champion_store_lock:
+            if _champion_store is None or reload:
+                _champion_store = ChampionStore()
+    return _champion_store
+
+
+class ChampionIcons():
+    def __init__(self, icon_dir: str=None, champion_json_path: str=None, fallback: str=None, reload_interval: float=None):
+        self.icon_dir = icon_dir or settings.CHAMPION_ICON_DIR
+        self.champion_json_path = champion_json_path or settings.CHAMPION_JSON_PATH
+        self.fallback = os.path.join(self.icon_dir, fallback or settings.CHAMPION_ICON_FALLBACK)
+        self.reload_interval = settings.CHAMPION_ICON_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        self.paths = {}
+        self._versions = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _source_versions(self):
+        versions = []
+        for path in [self.icon_dir, self.champion_json_path]:
+            try:
+                versions.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                versions.append(None)
+        return tuple(versions)
+
+    def _build(self):
+        try:
+            file_names = [name for name in os.listdir(self.icon_dir) if name.endswith(".png")]
+        except OSError:
+            file_names = []
+        icons = {os.path.splitext(name)[0]: os.path.join(self.icon_dir, name) for name in file_names}
+        if self.champion_json_path == settings.CHAMPION_JSON_PATH:
+            store = get_champion_store()
+            if store.is_stale():
+                # champion.json changed since the shared store was loaded
+                store = get_champion_store(reload=True)
+        else:
+            store = ChampionStore(self.champion_json_path, snapshot_path="")
+
+        paths = {}
+        for stem, path in icons.items():
+            paths[stem] = path
+            paths[normalize_champion_name(stem)] = path
+        for champion in store:
+            path = icons.get(champion.id)
+            if path is None:
+                continue
+            for alias in [champion.name, champion.id, str(champion.key)]:
+                paths[alias] = path
+                paths[normalize_champion_name(alias)] = path
+        return paths
+
+    def reload(self):
+        with self._lock:
+            self._versions = self._source_versions()
+            self.paths = self._build()
+            self._checked_at = time.monotonic()
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        if self._source_versions() != self._versions:
+            self.reload()
+
+    def resolve(self, name: str):
+        self._reload_if_changed()
+        paths = self.paths
+        path = paths.get(name)
+        if path is None:
+            path = paths.get(normalize_champion_name(name or ""), self.fallback)
+        return path
+
+
+_champion_icons = None
+_champion_icons_lock = threading.Lock()
+
+
+def get_champion_icons():
+    global _champion_icons
+    if _champion_icons is None:
+        with _champion_icons_lock:
+            if _champion_icons is None:
+                _champion_icons = ChampionIcons()
+    return _champion_icons
+
+
+def champion_icon(name: str):
+    return get_champion_icons().resolve(name)
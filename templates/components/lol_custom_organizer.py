@@ -1,66 +1,16 @@
 import flet as ft
-import requests
-from bs4 import BeautifulSoup
-import itertools
+import datetime
 import random
+from peewee import Tuple
+import settings
 
 from app.utils import *
 from templates.components.basic import *
-
-def _calculate_score(rank: str, lp: str):
-    tires = ["iron", "bronze", "silver", "gold", "platinum", "emerald", "diamond", "master", "grandmaster", "challenger"]
-    if rank in ["master", "grandmaster", "challenger"]:
-        rank += " 4"
-    tire, division = rank.split(" ")
-    return (tires.index(tire) * 4 + (4-int(division))) * 100 + int(lp)
-
-def _get_summoner_max_score(region: str="jp", summoner_name: str="naoyashiyashi", tag: str="JP1"):
-    url = f'https://www.op.gg/summoners/{region}/{summoner_name}-{tag}'
-    response = requests.get(url)
-    player_icon = "https://opgg-static.akamaized.net/meta/images/profile_icons/profileIcon29.jpg?image=e_upscale,q_auto:good,f_webp,w_auto&v=1724034092925"
-    max_rank = "unranked"
-    max_lp = 0
-    max_score = 0
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        error_msg = soup.find('div', class_='e19vm62i1')
-        if error_msg:
-            return None, None, None, None
-        player_icon = soup.find('div', class_='profile-icon').find("img").get("src")
-        rank_base = soup.find('div', class_='e15k6o3w0')
-        if exists(rank_base):
-            rank_info = rank_base.find("tbody")
-            rank_list = rank_info.find_all("div", class_="rank-item")
-            lp_list = rank_info.find_all("div", class_="lp")
-            for rank, lp in zip(rank_list, lp_list):
-                score = _calculate_score(rank.text.lower(), int(lp.text))
-                if score > max_score:
-                    max_score = score
-                    max_rank = rank.text
-                    max_lp = lp.text
-    return player_icon, max_rank, max_lp, max_score
-
-def _get_summoner_champs(region: str="jp", summoner_name: str="naoyashiyashi", tag: str="JP1", top_n: int=10):
-    url = f"https://www.op.gg/summoners/{region}/{summoner_name}-{tag}/mastery"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    champs = soup.find_all('div', class_='e1poynyt1')[:top_n]
-    champs_img = []
-    champs_point = []
-    champs_name = []
-    for champ in champs:
-        champ_name = champ.find(class_="champion-name").text
-        champ_point = champ.find(class_="champion-point").text
-        champs_point.append(champ_point)
-        champs_name.append(champ_name)
-    champs_name = "|".join(champs_name)
-    champs_point = "|".join(champs_point)
-    return champs_name, champs_point
-
-def _change_summoner_status(e, page: ft.Page, summoner: Summoner):
-    summoner.is_active = e.control.value
-    summoner.save()
-    page.reload()
+from templates.components.lol_balancer import GroupingCache, balance_constrained, balance_teams, partition_lobbies, player_profile, roster_signature, summoner_key
+from templates.components.lol_champions import get_champion_icons
+from templates.components.lol_icon_atlas import champion_icon_image
+from templates.components.lol_opgg import calculate_score, fetch_summoners
+from templates.components.lol_roster import start_roster_refresher
 
 def generate_ranks_with_divisions():
     base_ranks = ["iron", "bronze", "silver", "gold", "platinum", "emerald", "diamond"]
@@ -72,207 +22,353 @@ def generate_ranks_with_divisions():
     ranks.extend(top_ranks)
     return ranks
 
-def _member_card(page: ft.Page, summoner: Summoner):
-    def _delete_summoner(e, summoner):
-        delete_data("Summoner", summoner.id)
-        page.reload()
+class MemberCard():
+    # one summoner's card : its handlers write the row, then update only the controls they changed
+    def __init__(self, page: ft.Page, summoner: Summoner, member_list=None):
+        self.page = page
+        self.summoner = summoner
+        self.member_list = member_list
+        self.content = self._build()
 
-    def _change_rank(e, summoner):
-        summoner.rank = e.control.value
-        summoner.score = _calculate_score(summoner.rank, summoner.lp)
-        summoner.save()
-        page.reload()
+    def _build(self):
+        summoner = self.summoner
+        text_size = 20
 
-    def _submit_lp(e, summoner):
-        value = e.control.value
-        if value.isdigit():
-            if 0 <= int(value) <= 100:
-                summoner.lp = value
-                summoner.score = _calculate_score(summoner.rank, summoner.lp)
-                summoner.save()
-                page.reload()
-                return
-            else:
-                msg = "LP must be between 0 and 100."
-        else:
-            msg = "Please enter a number."
-        page.reload()
-        page.open(ft.SnackBar(content=ft.Text(msg)))
-        
-    text_size = 20
+        ranks_with_divisions = generate_ranks_with_divisions()
 
-    ranks_with_divisions = generate_ranks_with_divisions()
+        self.switch = ft.Switch(
+            value=summoner.is_active,
+            on_change=self._change_status,
+        )
+        self.title = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Row( 
+                        controls=[
+                            ft.Image(
+                                src=summoner.player_icon,
+                                width=text_size*1.6,
+                                height=text_size*1.6,
+                                border_radius=ft.border_radius.all(text_size),
+                            ),
+                            ft.Text(f"{summoner.summoner_name} #{summoner.tag}", size=text_size*0.8, weight="bold"),
+                        ],
+                    ),
+                    ft.Row(
+                        controls=[
+                            ft.IconButton(
+                                icon=ft.icons.DELETE,
+                                icon_size=text_size*1.5,
+                                on_click=self._delete,
+                                visible=False,
+                            ),
+                            self.switch,
+                        ],
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+            ),
+            bgcolor=ft.colors.SECONDARY_CONTAINER if summoner.is_active else ft.colors.GREY_100,
+            border_radius=ft.border_radius.all(text_size*0.75),
+            padding=ft.padding.all(text_size*0.2),
+        )
 
-    title = ft.Container(
-        content=ft.Row(
+        self.rank_dropdown = ft.Dropdown(
+            options=[
+                ft.dropdown.Option(rank) for rank in ranks_with_divisions
+            ],
+            value=summoner.rank,
+            width=text_size*5.6,
+            # content_padding=0,
+            alignment=ft.alignment.center,
+            text_style=ft.TextStyle(size=text_size*0.75, color=ft.colors.GREY_700, weight="bold"),
+            border=ft.InputBorder.NONE,
+            border_radius=ft.border_radius.all(text_size*0.75),
+            on_change=self._change_rank,
+        )
+        self.lp_field = ft.TextField(
+            value=summoner.lp,
+            width=text_size,
+            text_style=ft.TextStyle(size=text_size*0.75, color=ft.colors.GREY_700, weight="bold"),
+            border=ft.InputBorder.NONE,
+            border_radius=ft.border_radius.all(text_size*0.75),
+            on_blur=self._submit_lp,
+        )
+        self.score_text = ft.Text(f"LP , Score: {summoner.score} ", size=text_size*0.75, weight="bold", color=ft.colors.GREY_700)
+        self.subtitle = ft.Row(
+            controls=[self.rank_dropdown, self.lp_field, self.score_text],
+            visible=False,
+        )
+
+        champs_name = summoner.champs_name.split("|")
+        champs_point = summoner.champs_point.split("|")
+        return ft.ExpansionTile(
+            title=self.title,
+            subtitle=self.subtitle,
             controls=[
-                ft.Row( 
-                    controls=[
-                        ft.Image(
-                            src=summoner.player_icon,
-                            width=text_size*1.6,
-                            height=text_size*1.6,
-                            border_radius=ft.border_radius.all(text_size),
-                        ),
-                        ft.Text(f"{summoner.summoner_name} #{summoner.tag}", size=text_size*0.8, weight="bold"),
-                    ],
-                ),
                 ft.Row(
                     controls=[
-                        ft.IconButton(
-                            icon=ft.icons.DELETE,
-                            icon_size=text_size*1.5,
-                            on_click=lambda e, summoner=summoner: _delete_summoner(e, summoner),
-                            visible=False,
-                        ),
-                        ft.Switch(
-                            value=summoner.is_active,
-                            on_change= lambda e, page=page, summoner=summoner: _change_summoner_status(e, page, summoner),
-                        ),
+                        ft.Column(
+                            controls=[
+                                champion_icon_image(champ_name, text_size*2, border_radius=text_size*0.5),
+                                ft.Text(champ_name, size=text_size*0.5, weight="bold"),
+                                ft.Text(champ_point, size=text_size*0.5, weight="bold"),
+                            ],
+                            alignment=ft.MainAxisAlignment.CENTER
+                        ) for champ_name, champ_point in zip(champs_name, champs_point)
                     ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    spacing=20,
+                    scroll=ft.ScrollMode.AUTO,
                 ),
             ],
-            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
-        ),
-        bgcolor=ft.colors.SECONDARY_CONTAINER if summoner.is_active else ft.colors.GREY_100,
-        border_radius=ft.border_radius.all(text_size*0.75),
-        padding=ft.padding.all(text_size*0.2),
-    )
-    
-    subtitle = ft.Row(
-        controls=[
-            ft.Dropdown(
-                options=[
-                    ft.dropdown.Option(rank) for rank in ranks_with_divisions
-                ],
-                value=summoner.rank,
-                width=text_size*5.6,
-                # content_padding=0,
-                alignment=ft.alignment.center,
-                text_style=ft.TextStyle(size=text_size*0.75, color=ft.colors.GREY_700, weight="bold"),
-                border=ft.InputBorder.NONE,
-                border_radius=ft.border_radius.all(text_size*0.75),
-                on_change=lambda e, summoner=summoner: _change_rank(e, summoner),
-            ),
-            ft.TextField(
-                value=summoner.lp,
-                width=text_size,
-                text_style=ft.TextStyle(size=text_size*0.75, color=ft.colors.GREY_700, weight="bold"),
-                border=ft.InputBorder.NONE,
-                border_radius=ft.border_radius.all(text_size*0.75),
-                on_blur=lambda e, summoner=summoner: _submit_lp(e, summoner),
-            ),
-            ft.Text(f"LP , Score: {summoner.score} ", size=text_size*0.75, weight="bold", color=ft.colors.GREY_700),
-        ],
-    )
+            on_change=self._change_subtitle_visibility,
+            key=str(summoner.id),
+        )
 
-    def _change_subtitle_visibility(e):
-        subtitle.visible = not subtitle.visible
-        subtitle.update()
-
-    def _get_champ_icon(champ_name):
-        cleaned_champ_name = champ_name.replace(" ", "").replace("'", "").replace(".", "")
-        if cleaned_champ_name == "Wukong":
-            cleaned_champ_name = "MonkeyKing"
-        path = f"static/images/champion-icons/{cleaned_champ_name}.png"
-        if os.path.exists(path):
-            return path
+    def _save(self, data_dict: dict, changed: ft.Control):
+        # the row is written in the background : the card shows the new values right away
+        for field_name, field_value in data_dict.items():
+            setattr(self.summoner, field_name, field_value)
+        when_written(self.page, update_data("Summoner", self.summoner.id, data_dict, wait=False), on_error=self._on_write_error)
+        # a card whose position changes is rebuilt in place by the list ; otherwise only `changed` is sent
+        if not (exists(self.member_list) and self.member_list.reposition(self)):
+            changed.update()
+
+    def _on_write_error(self, error: Exception):
+        # the roster no longer matches the database : show the stored values again
+        self.page.open(ft.SnackBar(content=ft.Text(f"Could not save {self.summoner.summoner_name}#{self.summoner.tag} : {error}")))
+        self.page.reload()
+
+    def _change_status(self, e):
+        self.title.bgcolor = ft.colors.SECONDARY_CONTAINER if e.control.value else ft.colors.GREY_100
+        self._save({"is_active": e.control.value}, self.title)
+
+    def _change_rank(self, e):
+        rank = e.control.value
+        score = calculate_score(rank, self.summoner.lp)
+        self.score_text.value = f"LP , Score: {score} "
+        self._save({"rank": rank, "score": score, "rank_edited_at": datetime.datetime.now()}, self.subtitle)
+
+    def _submit_lp(self, e):
+        value = e.control.value
+        if value.isdigit():
+            if 0 <= int(value) <= 100:
+                score = calculate_score(self.summoner.rank, value)
+                self.score_text.value = f"LP , Score: {score} "
+                self._save({"lp": value, "score": score, "rank_edited_at": datetime.datetime.now()}, self.subtitle)
+                return
+            else:
+                msg = "LP must be between 0 and 100."
+        else:
+            msg = "Please enter a number."
+        # put the stored value back
+        self.lp_field.value = self.summoner.lp
+        self.lp_field.update()
+        self.page.open(ft.SnackBar(content=ft.Text(msg)))
+
+    def _delete(self, e):
+        when_written(self.page, delete_data("Summoner", self.summoner.id, wait=False), on_error=self._on_write_error)
+        if exists(self.member_list):
+            self.member_list.remove(self)
+
+    def _change_subtitle_visibility(self, e):
+        self.subtitle.visible = not self.subtitle.visible
+        self.subtitle.update()
+
+class MemberList():
+    # the roster, active summoners first then by score ; only touched when a card moves or goes away
+    def __init__(self, page: ft.Page, summoners: list):
+        self.page = page
+        self.cards = [MemberCard(page, summoner, self) for summoner in summoners]
+        self.content = ft.ListView(controls=[card.content for card in self.cards], expand=True)
+
+    @staticmethod
+    def _sort_key(card):
+        return (not card.summoner.is_active, -int(card.summoner.score))
+
+    def reposition(self, card: MemberCard):
+        # returns whether the card moved ; a moved card is replaced by a new one, since
+        # Flet unmounts a control removed and added again in the same update
+        index = self.cards.index(card)
+        others = self.cards[:index] + self.cards[index + 1:]
+        key = self._sort_key(card)
+        # stay put while the order still holds (ties keep their place)
+        if (index == 0 or self._sort_key(others[index - 1]) <= key) and (index == len(others) or key <= self._sort_key(others[index])):
+            return False
+        new_index = next((i for i, other in enumerate(others) if key < self._sort_key(other)), len(others))
+        others.insert(new_index, MemberCard(self.page, card.summoner, self))
+        self.cards = others
+        self.content.controls = [card.content for card in self.cards]
+        self.content.update()
+        return True
+
+    def remove(self, card: MemberCard):
+        self.cards.remove(card)
+        self.content.controls.remove(card.content)
+        self.content.update()
+
+def _get_summoners(region: str, summoner_name_list: list, tag_list: list):
+    # existing summoners among the given names, in one query
+    query = search_data("Summoner", "region", region)
+    if not exists(query) or not summoner_name_list:
+        return {}
+    query = query.where(Tuple(Summoner.summoner_name, Summoner.tag).in_(list(zip(summoner_name_list, tag_list))))
+    return {(summoner.summoner_name, summoner.tag): summoner for summoner in query}
+
+def _add_summoners(region: str, summoner_name_list: list, tag_list: list, on_progress=None):
+    # activates the known summoners and scrapes the new ones : returns (message, whether any was added,
+    # the Future of the last write or None) ; writes are not waited for, the writer commits them in order
+    on_progress = on_progress or (lambda: None)
+    existing_summoners = _get_summoners(region, summoner_name_list, tag_list)
+    names_and_tags = list(zip(summoner_name_list, tag_list))
+    # fetch every new summoner concurrently
+    missing = [
+        (summoner_name, tag) for summoner_name, tag in names_and_tags
+        if (summoner_name, tag) not in existing_summoners and all([region, summoner_name, tag])
+    ]
+    for _ in range(len(names_and_tags) - len(missing)):
+        on_progress()
+    errors = {}
+    fetched = dict(zip(
+        missing,
+        fetch_summoners(region, missing, on_done=lambda *_: on_progress(), errors=errors),
+    ))
+
+    msg = ""
+    activated_ids = []
+    new_summoners = []
+    for summoner_name, tag in names_and_tags:
+        # check if summoner already exists
+        summoner = existing_summoners.get((summoner_name, tag))
+        if summoner:
+            activated_ids.append(summoner.id)
+            msg += f"{summoner_name}#{tag} already exists.\n"
+        # check if all fields are filled
+        elif all([region, summoner_name, tag]):
+            data_dict = fetched.get((summoner_name, tag))
+            if data_dict:
+                new_summoners.append(data_dict)
+                msg += f"{summoner_name}#{tag} added.\n"
+            elif (summoner_name, tag) in errors:
+                msg += f"{summoner_name}#{tag} could not be fetched, please try again later.\n"
+            else:
+                msg += f"{summoner_name}#{tag} not found.\n"
         else:
-            return f"static/images/champion-icons/_HelmetBro.png"
+            msg += "Please enter all fields.\n"
 
-    champs_name = summoner.champs_name.split("|")
-    champs_point = summoner.champs_point.split("|")
-    _card = ft.ExpansionTile(
-        title=title,
-        subtitle=subtitle,
-        controls=[
-            ft.Row(
-                controls=[
-                    ft.Column(
-                        controls=[
-                            ft.Image(
-                                src=_get_champ_icon(champ_name),
-                                width=text_size*2,
-                                height=text_size*2,
-                                border_radius=ft.border_radius.all(text_size*0.5),
-                            ),
-                            ft.Text(champ_name, size=text_size*0.5, weight="bold"),
-                            ft.Text(champ_point, size=text_size*0.5, weight="bold"),
-                        ],
-                        alignment=ft.MainAxisAlignment.CENTER
-                    ) for champ_name, champ_point in zip(champs_name, champs_point)
-                ],
-                alignment=ft.MainAxisAlignment.CENTER,
-                spacing=20,
-                scroll=ft.ScrollMode.AUTO,
-            ),
-        ],
-        on_change=lambda e: _change_subtitle_visibility(e),
-    )
-    _card.subtitle.visible = False
-    return _card
-
-def _add_summoner(region: str, summoner_name: str, tag: str):
-        player_icon, max_rank, max_lp, max_score = _get_summoner_max_score(
-            region=region,
-            summoner_name=summoner_name,
-            tag=tag
-        )
-        champs_name, champs_point = _get_summoner_champs(region, summoner_name, tag, top_n=10)
-        if exists(player_icon):
-            add_data(
-                model_name="Summoner",
-                data_dict={
-                    "region": region,
-                    "summoner_name": summoner_name,
-                    "tag": tag,
-                    "player_icon": player_icon,
-                    "rank": max_rank,
-                    "lp": str(max_lp),
-                    "score": str(max_score),
-                    "champs_name": champs_name,
-                    "champs_point": champs_point,
-                }
-            )
-            return True
-        return False
+    # write everything at once
+    written = None
+    if activated_ids:
+        written = update_many("Summoner", activated_ids, {"is_active": True}, wait=False)
+    if new_summoners:
+        written = upsert_many("Summoner", new_summoners, ["region", "summoner_name", "tag"], wait=False)
+    return msg, bool(new_summoners), written
 
 def _get_active_summoners():
     return search_data("Summoner", "is_active", True)
 
-def _grouping(page: ft.Page, top_n: int = 5):
+def _parse_pairs(text: str, index: dict):
+    # one "name#tag, name#tag" pair per line -> list of (index, index)
+    pairs = []
+    for line in _clean_text(text or ""):
+        if not line.strip():
+            continue
+        names = [name.strip() for name in line.split(",")]
+        if len(names) != 2:
+            raise ValueError(f"\"{line}\" is not a pair")
+        pair = []
+        for name in names:
+            summoner_name, _, tag = name.rpartition("#")
+            if (summoner_name, tag) not in index:
+                raise ValueError(f"{name} is not an active summoner")
+            pair.append(index[(summoner_name, tag)])
+        pairs.append(tuple(pair))
+    return pairs
+
+# results of recent groupings, by roster signature and grouping options
+_grouping_cache = GroupingCache()
+# Summoner fields a grouping result depends on besides the roster signature (id, score) :
+# a score change already makes another key, other writes (e.g. activity toggles) keep the cache
+GROUPING_FIELDS = {"champs_name", "champs_point", "summoner_name", "tag"}
+
+def _on_summoner_write(model, field_names):
+    if field_names is None or GROUPING_FIELDS & set(field_names):
+        _grouping_cache.clear()
+
+on_write("Summoner", _on_summoner_write)
+
+def _priority_order(summoners: list):
+    # the earliest registered summoners play first, the ones past the last full lobby wait on the bench
+    return sorted(range(len(summoners)), key=lambda i: summoners[i][0].id)
+
+def _bench_text(summoners: list, bench: list):
+    if not bench:
+        return ""
+    return " ; bench: " + ", ".join(f"{summoners[i][0].summoner_name}#{summoners[i][0].tag}" for i in bench)
+
+def _compute_grouping(summoners: list, top_n: int, constrained: bool, must_split: tuple, must_together: tuple):
+    # returns (title, [(tab text, first team indices, second team indices)])
+    scores = [s[1] for s in summoners]
+    players = _priority_order(summoners)
+    if constrained:
+        playing, bench = players[:len(players) // 10 * 10], players[len(players) // 10 * 10:]
+        position = {player: k for k, player in enumerate(playing)}
+        for pair in must_split + must_together:
+            for i in pair:
+                if i not in position:
+                    raise ValueError(f"{summoners[i][0].summoner_name}#{summoners[i][0].tag} is on the bench")
+        # score, lane coverage and mastery together, with the pairing constraints
+        cost, optimal, lobbies = balance_constrained(
+            [player_profile(*summoners[i]) for i in playing],
+            must_split=[(position[a], position[b]) for a, b in must_split],
+            must_together=[(position[a], position[b]) for a, b in must_together],
+        )
+        title = f"Role Grouping Result (max cost {cost:.0f}{'' if optimal else ', best found'}){_bench_text(summoners, bench)}"
+        return title, [
+            (f"Lobby {i+1}", [playing[k] for k in team1], [playing[k] for k in team2])
+            for i, (diff, team1, team2) in enumerate(lobbies)
+        ]
+    if len(summoners) == 10:
+        players = list(range(10))
+        title = f"Team Grouping Result (Top {top_n})"
+        return title, [
+            (f"Combination {i+1}", team1, team2)
+            for i, (diff, team1, team2) in enumerate(balance_teams(players, scores, top_n=top_n))
+        ]
+    # every full lobby at once, the rest on the bench : one tab per lobby of the best partition
+    worst, lobbies, bench = partition_lobbies(players, [scores[i] for i in players], top_n=1, time_limit=settings.LOBBY_SEARCH_TIME_LIMIT)[0]
+    title = f"Team Grouping Result ({len(lobbies)} {'lobby' if len(lobbies) == 1 else 'lobbies'}, max difference {worst}){_bench_text(summoners, bench)}"
+    return title, [(f"Lobby {i+1}", team1, team2) for i, (diff, team1, team2) in enumerate(lobbies)]
+
+@with_connection
+def _grouping(page: ft.Page, top_n: int = 5, constrained: bool = False, must_split: str = "", must_together: str = ""):
     active_summoners = _get_active_summoners()
-    if len(active_summoners) != 10:
-        page.open(ft.SnackBar(content=ft.Text("10 active summoners are required.")))
+    if not active_summoners or len(active_summoners) < 10:
+        page.open(ft.SnackBar(content=ft.Text("At least 10 active summoners are required.")))
         return
 
-    # Convert summoners to tuples with their scores
-    summoners = [(s, int(s.score)) for s in active_summoners]
-    # Generate all possible combinations of 5 summoners
-    all_combinations = list(itertools.combinations(summoners, 5))
-
-    unique_combinations = set()
-    top_combinations = []
-
-    # Calculate score differences for all combinations
-    for combo in all_combinations:
-        team1 = list(combo)
-        team2 = [s for s in summoners if s not in team1]
-        team1_score = sum(s[1] for s in team1)
-        team2_score = sum(s[1] for s in team2)
-        diff = abs(team1_score - team2_score)
-        
-        unique_key = tuple(sorted([tuple(sorted(s[0].summoner_name for s in team1)), 
-                                   tuple(sorted(s[0].summoner_name for s in team2))]))
-        
-        if unique_key not in unique_combinations:
-            unique_combinations.add(unique_key)
-            top_combinations.append((diff, (team1, team2)))
-
-    # Sort combinations by score difference and select top n
-    top_combinations.sort(key=lambda x: x[0])
-    top_n = min(top_n, len(top_combinations))
-    top_n_combinations = top_combinations[:top_n]
+    # Convert summoners to tuples with their scores ; teams are told apart by position, not by name
+    summoners = [(s, int(s.score)) for s in sorted(active_summoners, key=summoner_key)]
+    try:
+        if constrained:
+            index = {(s.summoner_name, s.tag): i for i, (s, _) in enumerate(summoners)}
+            must_split, must_together = tuple(_parse_pairs(must_split, index)), tuple(_parse_pairs(must_together, index))
+        else:
+            must_split, must_together = (), ()
+        key = (roster_signature(summoners), top_n, constrained, must_split, must_together)
+        result = _grouping_cache.get(key)
+        if result is None:
+            result = _compute_grouping(summoners, top_n, constrained, must_split, must_together)
+            _grouping_cache.put(key, result)
+    except ValueError as e:
+        page.open(ft.SnackBar(content=ft.Text(str(e))))
+        return
+    title, tabs_teams = result
+    tab_combinations = [
+        (text, ([summoners[j] for j in team1], [summoners[j] for j in team2]))
+        for text, team1, team2 in tabs_teams
+    ]
 
     def _copy_clipboard(e, combination):
         blue_team, red_team = combination
@@ -344,14 +440,14 @@ def _grouping(page: ft.Page, top_n: int = 5):
         animation_duration=300,
         tabs=[
             ft.Tab(
-                text=f"Combination {i+1}",
-                content=create_team_view(combination[1])
-            ) for i, combination in enumerate(top_n_combinations)
+                text=text,
+                content=create_team_view(combination)
+            ) for text, combination in tab_combinations
         ],
     )
 
     result_dialog = ft.AlertDialog(
-        title=ft.Text(f"Team Grouping Result (Top {top_n})", size=24, weight="bold"),
+        title=ft.Text(title, size=24, weight="bold"),
         content=ft.Container(
             content=tabs,
             padding=20,
@@ -364,6 +460,34 @@ def _grouping(page: ft.Page, top_n: int = 5):
     )
     page.open(result_dialog)
 
+def _open_role_grouping(page: ft.Page):
+    must_split_field = ft.TextField(
+        label="Must be on different teams (one \"name#tag, name#tag\" pair per line)",
+        multiline=True,
+        min_lines=3,
+        width=450,
+    )
+    must_together_field = ft.TextField(
+        label="Must be on the same team (one \"name#tag, name#tag\" pair per line)",
+        multiline=True,
+        min_lines=3,
+        width=450,
+    )
+
+    def _on_ok(e):
+        page.close(dlg)
+        _grouping(page, constrained=True, must_split=must_split_field.value, must_together=must_together_field.value)
+
+    dlg = ft.AlertDialog(
+        title=ft.Text("Balance score, lanes and mastery"),
+        content=ft.Column([must_split_field, must_together_field], tight=True),
+        actions=[
+            ft.TextButton("Grouping", on_click=_on_ok),
+            ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+        ],
+    )
+    page.open(dlg)
+
 def _clean_text(text):
     problematic_chars = ["\u2069", "\u2066"]
     for problematic_char in problematic_chars:
@@ -388,6 +512,11 @@ def _extract_summoner_name(join_msg):
     return summoner_name_list, tag_list
 
 def main(page: ft.Page):
+    # keep rank / LP / mastery of the roster fresh in the background
+    start_roster_refresher()
+    # champion icon index, built once
+    get_champion_icons()
+
     def _open_form(e, quick_add: bool = False):
         region_field = ft.TextField(label="Region", value="jp", width=100)
         summoner_name_field = ft.TextField(label="Summoner Name", width=250)
@@ -427,50 +556,38 @@ def main(page: ft.Page):
             ),
         )
 
+        @with_connection
         def _on_ok(e):
             page.close(dlg)
 
-            msg = ""
             reload_flag = False
+            deactivated = None
             if quick_add:
                 region = region_field.value
                 summoner_name_list, tag_list = _extract_summoner_name(quick_field.value)
                 query = get_model_by_name("Summoner").update(is_active=False)
-                query.execute()
+                deactivated = write(query.execute, wait=False)
                 reload_flag = True
             else:
                 region, summoner_name_list, tag_list = region_field.value, [summoner_name_field.value], [tag_field.value]
             
             processing_dlg = ProcessingDialog(total_count=len(summoner_name_list), message="Fetching summoner information")
             page.open(processing_dlg.content)
-            
-            for summoner_name, tag in zip(summoner_name_list, tag_list):
-                summoner_query = search_data_multiple("Summoner", {"region": region, "summoner_name": summoner_name, "tag": tag})
-                # check if summoner already exists
-                summoner = summoner_query.first()
-                if summoner:
-                    summoner.is_active = True
-                    summoner.save()
-                    msg += f"{summoner_name}#{tag} already exists.\n"
-                # check if all fields are filled
-                else:
-                    if all([region, summoner_name, tag]):
-                        # add summoner
-                        summoner = _add_summoner(region, summoner_name, tag)
-                        if summoner:
-                            reload_flag = True
-                            msg += f"{summoner_name}#{tag} added.\n"
-                        else:
-                            msg += f"{summoner_name}#{tag} not found.\n"
-                    else:
-                        msg += "Please enter all fields.\n"
-                processing_dlg.update_progress()
+
+            msg, added, written = _add_summoners(region, summoner_name_list, tag_list, on_progress=processing_dlg.update_progress)
+            reload_flag = reload_flag or added
 
             page.close(processing_dlg.content)
 
-            if reload_flag:
-                page.reload()
             page.open(ft.SnackBar(content=ft.Text(msg[:-1])))
+            if reload_flag:
+                # writes are committed in order : reload once the last one is
+                when_written(
+                    page,
+                    written or deactivated,
+                    on_done=lambda _: page.reload(),
+                    on_error=lambda error: page.open(ft.SnackBar(content=ft.Text(f"Could not save the summoners : {error}"))),
+                )
             
 
         def _close_dlg(e):
@@ -487,21 +604,20 @@ def main(page: ft.Page):
             ft.ElevatedButton("Add Member", on_click=_open_form),
             ft.ElevatedButton("Quick Add", on_click=lambda e: _open_form(e, quick_add=True)),
             ft.ElevatedButton("Grouping", on_click=lambda e: _grouping(page)),
+            ft.ElevatedButton("Role Grouping", on_click=lambda e: _open_role_grouping(page)),
         ],
     )
     
     # サモナーのリストを取得し、is_activeとscoreでソート
-    summoners = get_data_list("Summoner")
-    sorted_summoners = sorted(summoners, key=lambda s: (-s.is_active, -int(s.score)))
+    sorted_summoners = get_data_list(
+        "Summoner",
+        order_by=["-is_active", Summoner.score.cast("INTEGER").desc()],
+    )
 
     
-    member_cards = ft.ListView(expand=True)
-    for summoner in sorted_summoners:
-        member_cards.controls.append(
-            _member_card(page, summoner)
-        )
+    member_list = MemberList(page, sorted_summoners)
 
-    return action_buttons, member_cards
+    return action_buttons, member_list.content
     
 if __name__ == "__main__":
-    print(_calculate_score("master 4", 0))
\ No newline at end of file
+    print(calculate_score("master 4", 0))
\ No newline at end of file
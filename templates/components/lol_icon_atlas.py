@@ -0,0 +1,234 @@
+"""
+Champion Icon Atlas Module
+
+The champion icons in `static/images/champion-icons/` are 128px PNGs, shown
+at 40px on the member cards, one file per champion. This module builds, from
+those icons :
+- thumbnails : every icon resized to each size of settings.CHAMPION_THUMBNAIL_SIZES,
+  in `static/images/champion-thumbnails/<size>/<id>.png`,
+- sprite atlases : per size, one PNG with every icon on a grid
+  (`static/images/champion-atlas/atlas_<size>.png`) and its offset index
+  (`atlas_<size>.json` : {"size", "width", "height", "image", "icons": {id: [x, y]}}),
+and renders icons from an atlas, so a roster costs one image request per size
+instead of one per champion.
+
+Building needs Pillow ; rendering only reads the index, and falls back to the
+full icon when no atlas was built.
+
+Key Components:
+- build_thumbnails(icon_dir: str=None, out_dir: str=None, sizes: list=None):
+  Writes the missing or outdated thumbnails (older than their icon), returns how many.
+
+- build_atlas(size: int, icon_dir: str=None, out_dir: str=None):
+  Writes the atlas and index of one size, returns the index.
+
+- build_icon_assets(sizes: list=None):
+  Thumbnails and atlases for every size.
+
+- IconAtlas(size: int, atlas_dir: str=None, reload_interval: float=None):
+  The index of one atlas, reloaded when the index file changes.
+  `offset(champion_id)` returns (x, y) or None.
+
+- champion_icon_image(name: str, size: int, border_radius: float=0):
+  A `size` x `size` control showing the champion : its cell of the atlas of
+  that size, else the full icon.
+
+Custom Configuration:
+CHAMPION_THUMBNAIL_SIZES, CHAMPION_THUMBNAIL_DIR and CHAMPION_ATLAS_DIR in `settings.py`.
+
+Run from the repository root (after the icon sync, see lol_assets):
+
+    python -m templates.components.lol_icon_atlas
+"""
+
+import io
+import json
+import math
+import os
+import threading
+import time
+import flet as ft
+import settings
+from templates.components.lol_champions import champion_icon
+
+
+def _icon_files(icon_dir: str):
+    # {champion id: path}, sorted by id
+    return {
+        os.path.splitext(name)[0]: os.path.join(icon_dir, name)
+        for name in sorted(os.listdir(icon_dir))
+        if name.endswith(".png")
+    }
+
+
+def _save_png(image, path: str):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+
+def _resized(path: str, size: int):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        # keep opaque icons opaque : an alpha channel makes the PNGs larger for nothing
+        mode = "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+        return image.convert(mode).resize((size, size), Image.Resampling.LANCZOS)
+
+
+def build_thumbnails(icon_dir: str=None, out_dir: str=None, sizes: list=None):
+    icon_dir = icon_dir or settings.CHAMPION_ICON_DIR
+    out_dir = out_dir or settings.CHAMPION_THUMBNAIL_DIR
+    sizes = sizes or settings.CHAMPION_THUMBNAIL_SIZES
+    written = 0
+    for size in sizes:
+        size_dir = os.path.join(out_dir, str(size))
+        os.makedirs(size_dir, exist_ok=True)
+        for champion_id, path in _icon_files(icon_dir).items():
+            thumbnail_path = os.path.join(size_dir, f"{champion_id}.png")
+            if os.path.exists(thumbnail_path) and os.path.getmtime(thumbnail_path) >= os.path.getmtime(path):
+                continue
+            _save_png(_resized(path, size), thumbnail_path)
+            written += 1
+    return written
+
+
+def build_atlas(size: int, icon_dir: str=None, out_dir: str=None):
+    from PIL import Image
+
+    icon_dir = icon_dir or settings.CHAMPION_ICON_DIR
+    out_dir = out_dir or settings.CHAMPION_ATLAS_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    icons = {champion_id: _resized(path, size) for champion_id, path in _icon_files(icon_dir).items()}
+    columns = max(math.ceil(math.sqrt(len(icons))), 1)
+    rows = max(math.ceil(len(icons) / columns), 1)
+    mode = "RGBA" if any(icon.mode == "RGBA" for icon in icons.values()) else "RGB"
+    atlas = Image.new(mode, (columns * size, rows * size))
+    offsets = {}
+    for i, (champion_id, icon) in enumerate(icons.items()):
+        x, y = (i % columns) * size, (i // columns) * size
+        atlas.paste(icon, (x, y))
+        offsets[champion_id] = [x, y]
+
+    image_name = f"atlas_{size}.png"
+    _save_png(atlas, os.path.join(out_dir, image_name))
+    index = {"size": size, "width": atlas.width, "height": atlas.height, "image": image_name, "icons": offsets}
+    index_path = os.path.join(out_dir, f"atlas_{size}.json")
+    with open(f"{index_path}.part", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(f"{index_path}.part", index_path)
+    return index
+
+
+def build_icon_assets(sizes: list=None):
+    sizes = sizes or settings.CHAMPION_THUMBNAIL_SIZES
+    thumbnails = build_thumbnails(sizes=sizes)
+    atlases = [build_atlas(size) for size in sizes]
+    return thumbnails, atlases
+
+
+class IconAtlas():
+    def __init__(self, size: int, atlas_dir: str=None, reload_interval: float=None):
+        self.size = size
+        self.atlas_dir = atlas_dir or settings.CHAMPION_ATLAS_DIR
+        self.index_path = os.path.join(self.atlas_dir, f"atlas_{size}.json")
+        self.reload_interval = settings.CHAMPION_ICON_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        self.index = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        with self._lock:
+            try:
+                self._version = os.stat(self.index_path).st_mtime_ns
+                with open(self.index_path, encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self._version = None
+                self.index = None
+            self._checked_at = time.monotonic()
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            version = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            version = None
+        if version != self._version:
+            self.reload()
+
+    @property
+    def src(self):
+        return f"{self.atlas_dir}/{self.index['image']}"
+
+    def offset(self, champion_id: str):
+        self._reload_if_changed()
+        index = self.index
+        if index is None:
+            return None
+        offset = index["icons"].get(champion_id)
+        return tuple(offset) if offset is not None else None
+
+
+_atlases = {}
+_atlases_lock = threading.Lock()
+
+
+def get_icon_atlas(size: int):
+    if size not in _atlases:
+        with _atlases_lock:
+            if size not in _atlases:
+                _atlases[size] = IconAtlas(size)
+    return _atlases[size]
+
+
+def champion_icon_image(name: str, size: int, border_radius: float=0):
+    icon_path = champion_icon(name)
+    champion_id = os.path.splitext(os.path.basename(icon_path))[0]
+    atlas = get_icon_atlas(size)
+    offset = atlas.offset(champion_id)
+    if offset is None:
+        # no atlas of this size, or an icon added since it was built
+        return ft.Image(
+            src=icon_path,
+            width=size,
+            height=size,
+            border_radius=ft.border_radius.all(border_radius),
+        )
+    # the whole atlas, shifted so the icon's cell is the only visible part
+    x, y = offset
+    return ft.Container(
+        content=ft.Stack(
+            controls=[
+                ft.Image(
+                    src=atlas.src,
+                    left=-x,
+                    top=-y,
+                    width=atlas.index["width"],
+                    height=atlas.index["height"],
+                ),
+            ],
+            width=size,
+            height=size,
+            clip_behavior=ft.ClipBehavior.HARD_EDGE,
+        ),
+        width=size,
+        height=size,
+        border_radius=ft.border_radius.all(border_radius),
+        clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
+    )
+
+
+if __name__ == "__main__":
+    thumbnails, atlases = build_icon_assets()
+    print(f"{thumbnails} thumbnails written")
+    for index in atlases:
+        print(f"atlas {index['size']}px : {len(index['icons'])} icons, {index['width']}x{index['height']}")
@@ -0,0 +1,341 @@
+"""
+op.gg Scraping Module
+
+This module fetches summoner information from op.gg for the LoL Custom Organizer.
+All requests share one keep-alive HTTP session and the on-disk response cache
+(see app/http_client.py), and summoners are fetched concurrently on a bounded
+thread pool. Point settings.OPGG_BASE_URL at a local server to run offline.
+
+Key Components:
+- get_client():
+  Returns the shared HTTPClient ; `get_client().stats()` reports cache hits and misses.
+  Requests to op.gg are rate limited per host (settings.OPGG_RATE_LIMIT / OPGG_RATE_BURST).
+
+- calculate_score(rank: str, lp: str):
+  Converts a rank ("gold 2") and LP into a single comparable score.
+
+- SELECTORS / PAGE_ROOTS:
+  The (tag, class) of every element read from op.gg, and the ones each page is
+  trimmed to while parsing.
+
+- parse_profile(html: str) / parse_mastery(html: str, top_n: int=10):
+  Extract the scraped values from a page. The elements listed in PAGE_ROOTS are
+  cut out of the page by a substring scan, and only they are handed to the
+  HTML parser (lxml when installed, html.parser otherwise). The whole page
+  is parsed when they cannot be found.
+
+- get_summoner_max_score(region: str, summoner_name: str, tag: str):
+  Returns (player_icon, max_rank, max_lp, max_score) from the profile page,
+  or four Nones if the summoner does not exist.
+
+- get_summoner_champs(region: str, summoner_name: str, tag: str, top_n: int=10):
+  Returns ("name|name|...", "point|point|...") from the mastery page,
+  or two empty strings if the summoner does not exist.
+
+  Both raise requests.HTTPError when op.gg answers with anything but a page
+  (200) or the "not registered" page (404) : rate limited, forbidden, or
+  failing after the retries.
+
+- fetch_summoner(region: str, summoner_name: str, tag: str):
+  Returns the Summoner data dict of one summoner, or None if not found.
+
+- fetch_summoners(region: str, names_and_tags: list, on_done=None, max_workers: int=None, ttl: float=None, errors: dict=None):
+  Fetches many summoners at once : the profile and mastery pages of every
+  summoner are requested in parallel, and parsed on the caller's thread as
+  they arrive (the fetching threads only wait for the network).
+  `on_done(summoner_name, tag, data_dict)`
+  is called on the caller's thread as each summoner completes.
+  Returns the data dicts (or None) in input order. `ttl` overrides the
+  response cache freshness (0 always revalidates). A summoner whose pages
+  could not be fetched (network error or HTTP error status) is None as well;
+  pass an `errors` dict to get {(summoner_name, tag): exception} for them.
+"""
+
+import datetime
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+import settings
+from app.http_client import HTTPClient, RateLimiter, ResponseCache
+from app.utils import exists
+
+
+try:
+    import lxml
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# selector name -> (tag, class) ; op.gg renames its generated classes from time to time, keep them all here
+SELECTORS = {
+    # profile page
+    "not_found": ("div", "e19vm62i1"),
+    "profile_icon": ("div", "profile-icon"),
+    "rank_table": ("div", "e15k6o3w0"),
+    "rank_item": ("div", "rank-item"),
+    "rank_lp": ("div", "lp"),
+    # mastery page
+    "champion": ("div", "e1poynyt1"),
+    "champion_name": (None, "champion-name"),
+    "champion_point": (None, "champion-point"),
+}
+
+# page name -> selectors whose subtrees are parsed, everything else is dropped while parsing
+PAGE_ROOTS = {
+    "profile": ["not_found", "profile_icon", "rank_table"],
+    "mastery": ["champion"],
+}
+
+_page_strainers = {}
+_root_patterns = {}
+_end_patterns = {}
+_tag_name = re.compile(r"<([a-zA-Z][\w-]*)")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    # one keep-alive connection pool and response cache shared by every session and worker thread
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.OPGG_MAX_WORKERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _client = HTTPClient(
+                    session=session,
+                    cache=ResponseCache(),
+                    rate_limiter=RateLimiter(settings.OPGG_RATE_LIMIT, settings.OPGG_RATE_BURST),
+                )
+    return _client
+
+
+def calculate_score(rank: str, lp: str):
+    tires = ["iron", "bronze", "silver", "gold", "platinum", "emerald", "diamond", "master", "grandmaster", "challenger"]
+    if rank in ["master", "grandmaster", "challenger"]:
+        rank += " 4"
+    tire, division = rank.split(" ")
+    return (tires.index(tire) * 4 + (4-int(division))) * 100 + int(lp)
+
+
+def _profile_url(region: str, summoner_name: str, tag: str):
+    return f"{settings.OPGG_BASE_URL}/summoners/{region}/{summoner_name}-{tag}"
+
+
+def _find(root, selector: str):
+    tag, class_name = SELECTORS[selector]
+    return root.find(tag, class_=class_name)
+
+
+def _find_all(root, selector: str, limit: int=None):
+    tag, class_name = SELECTORS[selector]
+    return root.find_all(tag, class_=class_name, limit=limit)
+
+
+def _has_class(class_names: set):
+    def match(name, attrs):
+        classes = attrs.get("class") or ""
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not class_names.isdisjoint(classes)
+    return match
+
+
+def _root_patterns_of(page_name: str):
+    # (the page's root class names, the opening tag of a root element with a double-quoted class attribute)
+    patterns = _root_patterns.get(page_name)
+    if patterns is None:
+        class_names = []
+        opening_tags = []
+        for selector in PAGE_ROOTS[page_name]:
+            tag, class_name = SELECTORS[selector]
+            class_names.append(class_name)
+            opening_tags.append(
+                "<" + (tag or r"[a-zA-Z][\w-]*") + r"\b[^>]*?\sclass=\"(?:[^\"]*\s)?" + re.escape(class_name) + r"(?:\s[^\"]*)?\""
+            )
+        patterns = (class_names, re.compile("|".join(opening_tags)))
+        _root_patterns[page_name] = patterns
+    return patterns
+
+
+def _element_end(html: str, start: int):
+    # end of the element opened at `start`, by counting the opening and closing tags of its name
+    tag = _tag_name.match(html, start).group(1).lower()
+    pattern = _end_patterns.get(tag)
+    if pattern is None:
+        pattern = re.compile(rf"<(/?){tag}\b[^>]*>", re.IGNORECASE)
+        _end_patterns[tag] = pattern
+    depth = 0
+    for match in pattern.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+    return None
+
+
+def _slice_roots(html: str, page_name: str, limit: int=None):
+    # the outer HTML of the (first `limit`) root elements : tokenizing the whole page costs far more than this scan
+    class_names, opening_tag = _root_patterns_of(page_name)
+    fragments = []
+    position = 0
+    while limit is None or len(fragments) < limit:
+        # a plain substring search for the class names (much faster than a regular expression over the page),
+        # then a check of the tag they are in
+        found = [index for index in (html.find(class_name, position) for class_name in class_names) if index >= 0]
+        if not found:
+            break
+        start = html.rfind("<", position, min(found))
+        if start < 0 or not opening_tag.match(html, start):
+            position = min(found) + 1
+            continue
+        end = _element_end(html, start)
+        if end is None:
+            return html
+        fragments.append(html[start:end])
+        position = end
+    return "".join(fragments) if fragments else html
+
+
+def parse_page(html: str, page_name: str, limit: int=None):
+    # only the subtrees under PAGE_ROOTS are kept in the tree, the rest of the page is skipped
+    html = _slice_roots(html, page_name, limit)
+    strainer = _page_strainers.get(page_name)
+    if strainer is None:
+        strainer = SoupStrainer(_has_class({SELECTORS[selector][1] for selector in PAGE_ROOTS[page_name]}))
+        _page_strainers[page_name] = strainer
+    return BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+
+
+def parse_profile(html: str):
+    soup = parse_page(html, "profile")
+    if exists(_find(soup, "not_found")):
+        return None, None, None, None
+    player_icon = _find(soup, "profile_icon").find("img").get("src")
+    max_rank = "unranked"
+    max_lp = 0
+    max_score = 0
+    rank_table = _find(soup, "rank_table")
+    if exists(rank_table):
+        rank_info = rank_table.find("tbody")
+        for rank, lp in zip(_find_all(rank_info, "rank_item"), _find_all(rank_info, "rank_lp")):
+            score = calculate_score(rank.text.lower(), int(lp.text))
+            if score > max_score:
+                max_score = score
+                max_rank = rank.text
+                max_lp = lp.text
+    return player_icon, max_rank, max_lp, max_score
+
+
+def parse_mastery(html: str, top_n: int=10):
+    soup = parse_page(html, "mastery", limit=top_n)
+    champs_name = []
+    champs_point = []
+    for champ in _find_all(soup, "champion", limit=top_n):
+        champs_name.append(_find(champ, "champion_name").text)
+        champs_point.append(_find(champ, "champion_point").text)
+    return "|".join(champs_name), "|".join(champs_point)
+
+
+def _mastery_url(region: str, summoner_name: str, tag: str):
+    return f"{_profile_url(region, summoner_name, tag)}/mastery"
+
+
+def _is_not_found(html: str):
+    return exists(_find(parse_page(html, "profile"), "not_found"))
+
+
+def _check_response(response):
+    # a 200, or a 404 with the "not registered" page : anything else (429, 403, 5xx once the retries gave up)
+    # is an error, never an unranked summoner, so that callers keep the data they have
+    if response.status_code == 200:
+        return True
+    if response.status_code == 404 and _is_not_found(response.text):
+        return False
+    raise requests.HTTPError(f"{response.status_code} from {response.url}", response=response)
+
+
+def _read_profile(response):
+    if not _check_response(response):
+        return None, None, None, None
+    return parse_profile(response.text)
+
+
+def _read_mastery(response, top_n: int=10):
+    if not _check_response(response):
+        return "", ""
+    return parse_mastery(response.text, top_n)
+
+
+def get_summoner_max_score(region: str="jp", summoner_name: str="naoyashiyashi", tag: str="JP1", ttl: float=None):
+    return _read_profile(get_client().get(_profile_url(region, summoner_name, tag), ttl=ttl))
+
+
+def get_summoner_champs(region: str="jp", summoner_name: str="naoyashiyashi", tag: str="JP1", top_n: int=10, ttl: float=None):
+    return _read_mastery(get_client().get(_mastery_url(region, summoner_name, tag), ttl=ttl), top_n)
+
+
+def _to_summoner_data(region: str, summoner_name: str, tag: str, max_score_result, champs_result):
+    player_icon, max_rank, max_lp, max_score = max_score_result
+    champs_name, champs_point = champs_result
+    if not exists(player_icon):
+        return None
+    return {
+        "region": region,
+        "summoner_name": summoner_name,
+        "tag": tag,
+        "player_icon": player_icon,
+        "rank": max_rank,
+        "lp": str(max_lp),
+        "score": str(max_score),
+        "champs_name": champs_name,
+        "champs_point": champs_point,
+        "last_refreshed_at": datetime.datetime.now(),
+    }
+
+
+def fetch_summoner(region: str, summoner_name: str, tag: str):
+    return fetch_summoners(region, [(summoner_name, tag)])[0]
+
+
+def fetch_summoners(region: str, names_and_tags: list, on_done=None, max_workers: int=None, ttl: float=None, errors: dict=None):
+    names_and_tags = list(names_and_tags)
+    results = [None] * len(names_and_tags)
+    if not names_and_tags:
+        return results
+
+    client = get_client()
+    readers = {"max_score": _read_profile, "champs": _read_mastery}
+    pages = [{} for _ in names_and_tags]
+    max_workers = min(max_workers or settings.OPGG_MAX_WORKERS, 2 * len(names_and_tags))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="opgg") as executor:
+        # the workers only download : parsing holds the GIL and would slow the other downloads down
+        futures = {}
+        for i, (summoner_name, tag) in enumerate(names_and_tags):
+            futures[executor.submit(client.get, _profile_url(region, summoner_name, tag), ttl)] = (i, "max_score")
+            futures[executor.submit(client.get, _mastery_url(region, summoner_name, tag), ttl)] = (i, "champs")
+
+        for future in as_completed(futures):
+            i, page_name = futures[future]
+            # one summoner failing (timeout, open circuit, unexpected page) does not fail the others
+            try:
+                pages[i][page_name] = readers[page_name](future.result())
+            except Exception as e:
+                pages[i][page_name] = e
+            if len(pages[i]) < 2:
+                continue
+            summoner_name, tag = names_and_tags[i]
+            error = next((page for page in pages[i].values() if isinstance(page, Exception)), None)
+            if exists(error):
+                if exists(errors):
+                    errors[(summoner_name, tag)] = error
+            else:
+                results[i] = _to_summoner_data(region, summoner_name, tag, pages[i]["max_score"], pages[i]["champs"])
+            if exists(on_done):
+                on_done(summoner_name, tag, results[i])
+    return results
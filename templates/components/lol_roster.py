@@ -0,0 +1,148 @@
+"""
+Roster Refresh Module
+
+This module keeps the rank, LP and mastery of registered summoners up to date.
+A background thread periodically scrapes op.gg again for the stalest Summoner
+rows and writes the results back in one batch, so the organizer never waits
+on the network at grouping time.
+
+Key Components:
+- stale_summoners(now=None, limit: int=None):
+  Returns the summoners due for a refresh, never refreshed ones first.
+  Active summoners are stale after settings.ROSTER_STALE_AFTER seconds,
+  inactive ones after settings.ROSTER_STALE_AFTER_INACTIVE.
+
+- refresh_summoners(summoners: list, max_workers: int=None):
+  Scrapes the given summoners (bypassing the response cache TTL) and updates
+  them with one batched write. Summoners no longer found on op.gg only get
+  their `last_refreshed_at` updated, and the ones that could not be fetched
+  are left for the next run. Rank, LP and score edited by hand in the organizer
+  (`rank_edited_at` set) are kept : only the icon and mastery of those summoners
+  are updated. Returns the number of updated rows.
+
+- RosterRefresher(interval, jitter, batch_size, max_workers):
+  The background scheduler : `start()` / `stop()`. Each run refreshes up to
+  `batch_size` stale summoners, then sleeps `interval` seconds +/- `jitter`.
+
+- start_roster_refresher():
+  Starts the shared refresher once per process, if settings.ROSTER_REFRESH_ENABLED
+  (off by default : set ROSTER_REFRESH_ENABLED=1).
+"""
+
+import atexit
+import datetime
+import random
+import threading
+import traceback
+import settings
+from app.utils import *
+from templates.components.lol_opgg import fetch_summoners
+
+# fields a manual edit takes over (see MemberCard in lol_custom_organizer.py)
+RANK_FIELDS = ["rank", "lp", "score"]
+
+
+def stale_summoners(now=None, limit: int=None):
+    now = now or datetime.datetime.now()
+    active_cutoff = now - datetime.timedelta(seconds=settings.ROSTER_STALE_AFTER)
+    inactive_cutoff = now - datetime.timedelta(seconds=settings.ROSTER_STALE_AFTER_INACTIVE)
+    query = Summoner.select().where(
+        Summoner.last_refreshed_at.is_null()
+        | ((Summoner.is_active == True) & (Summoner.last_refreshed_at < active_cutoff))
+        | ((Summoner.is_active == False) & (Summoner.last_refreshed_at < inactive_cutoff))
+    ).order_by(Summoner.last_refreshed_at.asc(nulls="first"))
+    if exists(limit):
+        query = query.limit(limit)
+    return list(query)
+
+
+def refresh_summoners(summoners: list, max_workers: int=None):
+    if not summoners:
+        return 0
+    max_workers = max_workers or settings.ROSTER_REFRESH_WORKERS
+    by_region = {}
+    for summoner in summoners:
+        by_region.setdefault(summoner.region, []).append(summoner)
+
+    data_by_id = {}
+    for region, region_summoners in by_region.items():
+        names_and_tags = [(summoner.summoner_name, summoner.tag) for summoner in region_summoners]
+        errors = {}
+        results = fetch_summoners(region, names_and_tags, max_workers=max_workers, ttl=0, errors=errors)
+        for summoner, data_dict in zip(region_summoners, results):
+            # unreachable ones stay stale and are tried again on the next run
+            if (summoner.summoner_name, summoner.tag) in errors:
+                continue
+            if exists(data_dict):
+                data_by_id[summoner.id] = {
+                    field_name: data_dict[field_name]
+                    for field_name in ["player_icon", "rank", "lp", "score", "champs_name", "champs_point", "last_refreshed_at"]
+                }
+            else:
+                data_by_id[summoner.id] = {"last_refreshed_at": datetime.datetime.now()}
+    return write(_write_refresh, data_by_id)
+
+
+def _write_refresh(data_by_id: dict):
+    # runs on the writer thread : sees the manual edits made while the summoners were being scraped
+    edited = Summoner.select(Summoner.id).where(Summoner.id.in_(list(data_by_id)) & Summoner.rank_edited_at.is_null(False))
+    for summoner in edited:
+        data_by_id[summoner.id] = {
+            field_name: field_value for field_name, field_value in data_by_id[summoner.id].items() if field_name not in RANK_FIELDS
+        }
+    return update_each("Summoner", data_by_id)
+
+
+class RosterRefresher():
+    def __init__(self, interval: float=None, jitter: float=None, batch_size: int=None, max_workers: int=None):
+        self.interval = settings.ROSTER_REFRESH_INTERVAL if interval is None else interval
+        self.jitter = settings.ROSTER_REFRESH_JITTER if jitter is None else jitter
+        self.batch_size = batch_size or settings.ROSTER_REFRESH_BATCH
+        self.max_workers = max_workers or settings.ROSTER_REFRESH_WORKERS
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="roster-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_delay(self):
+        # spread runs out so several processes do not hit op.gg at the same moment
+        return max(0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def run_once(self):
+        with db.connection_context():
+            summoners = stale_summoners(limit=self.batch_size)
+        return refresh_summoners(summoners, max_workers=self.max_workers)
+
+    def _run(self):
+        while not self._stop.wait(self._next_delay()):
+            try:
+                self.run_once()
+            except Exception:
+                traceback.print_exc()
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_roster_refresher():
+    global _refresher
+    if not settings.ROSTER_REFRESH_ENABLED:
+        return None
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = RosterRefresher()
+            _refresher.start()
+            atexit.register(_refresher.stop, 1)
+    return _refresher
@@ -0,0 +1,58 @@
+"""
+Test Configuration
+
+The app reads its settings at import time : every test session runs on a
+temporary database and response cache, without background scraping.
+
+Fixtures:
+- page: a flet Page over a recording connection ; `page.sent` lists the
+  commands of every update, and controls get ids as if a client answered.
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+_tmp_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_PATH"] = os.path.join(_tmp_dir.name, "test.db")
+os.environ["HTTP_CACHE_PATH"] = os.path.join(_tmp_dir.name, "http_cache.db")
+os.environ["CHAMPION_SNAPSHOT_PATH"] = ""
+os.environ["ROSTER_REFRESH_ENABLED"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flet as ft
+import pytest
+
+
+class RecordingConnection():
+    pubsubhub = None
+    page_name = ""
+    page_url = ""
+
+    def __init__(self):
+        self.sent = []
+        self._ids = itertools.count(1)
+
+    def send_commands(self, session_id, commands):
+        self.sent.append(commands)
+        results = [
+            " ".join(f"_{next(self._ids)}" for _ in command.commands)
+            for command in commands if command.name == "add"
+        ]
+        return SimpleNamespace(results=results, error="")
+
+    def send_command(self, session_id, command):
+        return SimpleNamespace(result="", error="")
+
+
+@pytest.fixture
+def page():
+    connection = RecordingConnection()
+    loop = asyncio.new_event_loop()
+    page = ft.Page(connection, "test", loop)
+    page.sent = connection.sent
+    yield page
+    loop.close()
@@ -0,0 +1,70 @@
+import json
+import os
+import pytest
+import settings
+from benchmarks.icon_server import IconServer, icon_bytes
+from templates.components.lol_assets import IconManifest, MANIFEST_NAME, sync_champion_icons
+from templates.components.lol_champions import ChampionStore
+
+CHAMPIONS = ["Ahri", "Lux", "Zed"]
+FALLBACK = os.path.splitext(settings.CHAMPION_ICON_FALLBACK)[0]
+
+
+@pytest.fixture
+def icon_server():
+    server = IconServer().start()
+    yield server
+    server.stop()
+
+
+def _store(tmp_path, version: str):
+    # a champion.json with a few champions of the real one
+    with open(settings.CHAMPION_JSON_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"] = version
+    data["data"] = {champion_id: data["data"][champion_id] for champion_id in CHAMPIONS}
+    path = tmp_path / f"champion-{version}.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return ChampionStore(str(path), snapshot_path="")
+
+
+def test_sync_champion_icons(icon_server, tmp_path):
+    icon_dir = str(tmp_path / "icons")
+    sync = lambda store, **kwargs: sync_champion_icons(icon_dir=icon_dir, base_url=icon_server.base_url, max_workers=4, store=store, **kwargs)
+    store = _store(tmp_path, "1.0.0")
+
+    # cold : every icon and the fallback are downloaded
+    results = sync(store)
+    assert sorted(results["downloaded"]) == sorted(CHAMPIONS + [FALLBACK])
+    with open(os.path.join(icon_dir, "Lux.png"), "rb") as f:
+        assert f.read() == icon_bytes(store.get("Lux").key)
+    assert icon_server.request_count == 4
+
+    # warm : same version, nothing requested
+    results = sync(store)
+    assert sorted(results["skipped"]) == sorted(CHAMPIONS + [FALLBACK])
+    assert icon_server.request_count == 4
+
+    # new version : revalidated with their ETag, only the changed icon is written
+    icon_server.changed = {store.get("Zed").key}
+    patched = _store(tmp_path, "1.1.0")
+    results = sync(patched)
+    assert results["updated"] == ["Zed"] and sorted(results["unchanged"]) == sorted(["Ahri", "Lux", FALLBACK])
+    with open(os.path.join(icon_dir, "Zed.png"), "rb") as f:
+        assert f.read() == icon_bytes(store.get("Zed").key, 1)
+    assert IconManifest(os.path.join(icon_dir, MANIFEST_NAME)).entries["Zed"]["version"] == "1.1.0"
+
+
+def test_failed_icons_are_retried(icon_server, tmp_path):
+    icon_dir = str(tmp_path / "icons")
+    store = _store(tmp_path, "1.0.0")
+    icon_server.missing = {store.get("Ahri").key}
+    results = sync_champion_icons(icon_dir=icon_dir, base_url=icon_server.base_url, store=store)
+    assert results["failed"] == ["Ahri"]
+    assert "Ahri" not in IconManifest(os.path.join(icon_dir, MANIFEST_NAME)).entries
+    assert not os.path.exists(os.path.join(icon_dir, "Ahri.png"))
+
+    # the next run only fetches the failed icon
+    icon_server.missing = set()
+    results = sync_champion_icons(icon_dir=icon_dir, base_url=icon_server.base_url, store=store)
+    assert results["downloaded"] == ["Ahri"] and len(results["skipped"]) == 3
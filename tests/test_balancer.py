@@ -0,0 +1,90 @@
+import itertools
+import math
+import random
+import pytest
+from templates.components.lol_balancer import PlayerProfile, _Search, balance_constrained, balance_teams, partition_lobbies
+
+ROSTER = [2155, 1900, 1620, 1540, 1400, 1320, 1210, 980, 760, 400]
+
+
+def _brute_force(scores: list, must_split: list=()):
+    # smallest difference over every 5v5 split
+    total = sum(scores)
+    return min(
+        abs(total - 2 * sum(scores[i] for i in team))
+        for team in itertools.combinations(range(len(scores)), len(scores) // 2)
+        if all((a in team) != (b in team) for a, b in must_split)
+    )
+
+
+def test_balance_teams_known_optimum():
+    # 5 of 100..1000 cannot make exactly half of 5500 : the best split is 100 apart
+    scores = [100 * i for i in range(1, 11)]
+    diff, team1, team2 = balance_teams(list(range(10)), scores, top_n=1)[0]
+    assert diff == 100
+    assert abs(sum(scores[i] for i in team1) - sum(scores[i] for i in team2)) == 100
+
+
+def test_balance_teams_matches_brute_force():
+    best = balance_teams(list(range(10)), ROSTER, top_n=5)
+    assert best[0][0] == _brute_force(ROSTER)
+    assert [diff for diff, _, _ in best] == sorted(diff for diff, _, _ in best)
+    for diff, team1, team2 in best:
+        assert sorted(team1 + team2) == list(range(10)) and len(team1) == len(team2) == 5
+        assert diff == abs(sum(ROSTER[i] for i in team1) - sum(ROSTER[i] for i in team2))
+
+
+def test_balance_constrained_proves_optimum():
+    # scores only : the constrained search finds the same optimum, under its constraints too
+    profiles = [PlayerProfile(score) for score in ROSTER]
+    cost, optimal, lobbies = balance_constrained(profiles, lane_weight=0, mastery_weight=0, time_limit=5)
+    assert optimal and cost == _brute_force(ROSTER)
+
+    must_split = [(0, 1), (2, 3)]
+    cost, optimal, lobbies = balance_constrained(profiles, must_split=must_split, lane_weight=0, mastery_weight=0, time_limit=5)
+    (_, team1, team2), = lobbies
+    assert optimal and cost == _brute_force(ROSTER, must_split)
+    assert all((a in team1) != (b in team1) for a, b in must_split)
+
+
+def test_partition_lobbies_uses_every_player():
+    scores = ROSTER + [score + 37 for score in ROSTER]
+    worst, lobbies, bench = partition_lobbies(list(range(20)), scores, top_n=1, time_limit=0.2, seed=1)[0]
+    assert bench == []
+    assert len(lobbies) == 2
+    assert sorted(i for _, team1, team2 in lobbies for i in team1 + team2) == list(range(20))
+    assert worst == max(diff for diff, _, _ in lobbies)
+
+
+def test_partition_lobbies_benches_the_rest():
+    scores = (ROSTER * 3)[:23]
+    worst, lobbies, bench = partition_lobbies(list(range(23)), scores, top_n=1, time_limit=0.2, seed=1)[0]
+    assert len(lobbies) == 2 and bench == [20, 21, 22]
+    assert sorted(i for _, team1, team2 in lobbies for i in team1 + team2) == list(range(20))
+
+
+def _team_of(lobbies):
+    return {i: (lobby, team) for lobby, (_, *teams) in enumerate(lobbies) for team, members in enumerate(teams) for i in members}
+
+
+@pytest.mark.parametrize("player_count", [20, 40])
+def test_chained_must_together_across_lobbies(player_count):
+    # (x, y) and (z, y) : the three players end up on one team, whichever lobbies they started in
+    for seed in range(3):
+        rng = random.Random(seed)
+        profiles = [PlayerProfile(rng.randint(400, 2500), rng.randint(0, 31), rng.randint(0, 500)) for _ in range(player_count)]
+        x, y, z, a, b = rng.sample(range(player_count), 5)
+        cost, optimal, lobbies = balance_constrained(profiles, must_split=[(a, b)], must_together=[(x, y), (z, y)], time_limit=0.2)
+        team_of = _team_of(lobbies)
+        assert team_of[x] == team_of[y] == team_of[z]
+        assert team_of[a] != team_of[b]
+        assert sorted(team_of) == list(range(player_count))
+
+
+def test_incumbent_must_satisfy_constraints():
+    profiles = [PlayerProfile(score) for score in ROSTER + ROSTER]
+    search = _Search(profiles, [(0, 1)], [(2, 12), (3, 12)], 5, 0, 0, deadline=math.inf)
+    teams = [list(range(0, 5)), list(range(5, 10)), list(range(10, 15)), list(range(15, 20))]
+    assert not search.evaluate(teams) and search.best_teams is None
+    teams = [[1, 2, 3, 12, 4], [0, 5, 6, 7, 8], [9, 10, 11, 13, 14], list(range(15, 20))]
+    assert search.evaluate(teams) and search.best_teams == teams
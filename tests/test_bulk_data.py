@@ -0,0 +1,67 @@
+import pytest
+from app import utils
+from app.utils import *
+
+
+def _summoner(name: str, score: int, **fields):
+    return {
+        "region": "jp", "summoner_name": name, "tag": "JP1", "player_icon": "", "rank": "Gold 1", "lp": "0",
+        "score": str(score), "champs_name": "", "champs_point": "", **fields,
+    }
+
+
+@pytest.fixture(params=[True, False], ids=["returning", "no returning"])
+def summoners(request, monkeypatch):
+    # both paths : INSERT ... RETURNING, and reading the rows back on SQLite before 3.35
+    monkeypatch.setattr(utils, "RETURNING_SUPPORTED", request.param)
+    write(Summoner.delete().execute)
+    yield add_data_many("Summoner", [_summoner(f"player{i}", 1000 + i) for i in range(5)], chunk_size=2)
+    write(Summoner.delete().execute)
+
+
+def _scores():
+    return {row.summoner_name: row.score for row in Summoner.select()}
+
+
+def test_add_data_many_returns_rows(summoners):
+    assert [row.summoner_name for row in summoners] == [f"player{i}" for i in range(5)]
+    assert all(isinstance(row.id, int) for row in summoners)
+    assert _scores() == {f"player{i}": str(1000 + i) for i in range(5)}
+
+
+def test_upsert_many(summoners):
+    rows = upsert_many("Summoner", [
+        _summoner("player1", 2000, rank="Platinum 4"),
+        _summoner("player9", 900),
+        _summoner("player3", 3000),
+    ], ["region", "summoner_name", "tag"], chunk_size=2)
+
+    # existing accounts keep their id, new ones are inserted
+    by_name = {row.summoner_name: row for row in rows}
+    assert sorted(by_name) == ["player1", "player3", "player9"]
+    assert by_name["player1"].id == summoners[1].id and by_name["player3"].id == summoners[3].id
+    assert Summoner.select().count() == 6
+    assert _scores() == {**{f"player{i}": str(1000 + i) for i in range(5)}, "player1": "2000", "player3": "3000", "player9": "900"}
+    assert Summoner.get_by_id(summoners[1].id).rank == "Platinum 4"
+
+    # the conflict target needs a unique index
+    with pytest.raises(ValueError):
+        upsert_many("Summoner", [_summoner("player1", 1)], ["summoner_name"])
+
+
+def test_update_each(summoners):
+    count = update_each("Summoner", {
+        summoners[0].id: {"score": "1"},
+        summoners[1].id: {"score": "2", "rank": "Silver 1"},
+        summoners[2].id: {"score": "3"},
+    }, chunk_size=2)
+    assert count == 3
+    assert _scores() == {"player0": "1", "player1": "2", "player2": "3", "player3": "1003", "player4": "1004"}
+    assert [row.rank for row in Summoner.select().order_by(Summoner.id)] == ["Gold 1", "Silver 1", "Gold 1", "Gold 1", "Gold 1"]
+
+
+def test_bulk_writes_follow_search_index(summoners):
+    update_each("Summoner", {summoners[0].id: {"summoner_name": "renamed"}})
+    assert [row.id for row in get_data_list("summoner", search="renamed")] == [summoners[0].id]
+    upsert_many("Summoner", [_summoner("newcomer", 1)], ["region", "summoner_name", "tag"])
+    assert [row.summoner_name for row in get_data_list("summoner", search="newcomer")] == ["newcomer"]
@@ -0,0 +1,105 @@
+import datetime
+import pytest
+from app.utils import *
+
+
+def _clear():
+    for model in [Task, User, Summoner, *search_indexes.values()]:
+        write(model.delete().execute)
+
+
+@pytest.fixture
+def tasks():
+    _clear()
+    user = add_data("User", {"username": "owner", "password": "", "salt": ""})
+    rows = add_data_many("Task", [
+        {"title": f"task {i:02}", "description": "weekly report" if i % 5 == 0 else "", "is_done": i % 3 == 0, "created_by": user.id}
+        for i in range(25)
+    ])
+    yield rows
+    _clear()
+
+
+def _ids(rows):
+    return [row.id for row in rows]
+
+
+def test_keyset_next_and_previous(tasks):
+    first = get_data_page("task", limit=10)
+    second = get_data_page("task", after=first[-1], limit=10)
+    last = get_data_page("task", after=second[-1], limit=10)
+    assert _ids(first + second + last) == _ids(tasks)
+    assert len(last) == 5
+
+    # nothing past either end
+    assert get_data_page("task", after=last[-1], limit=10) == []
+    assert get_data_page("task", before=first[0], limit=10) == []
+
+    # back from the last page, in the requested order ; the first page may be short
+    assert _ids(get_data_page("task", before=last[0], limit=10)) == _ids(second)
+    assert _ids(get_data_page("task", before=second[2].id, limit=10)) == _ids(first[2:] + second[:2])
+    assert _ids(get_data_page("task", before=first[3], limit=10)) == _ids(first[:3])
+
+
+def test_keyset_ties_and_descending(tasks):
+    # is_done has many ties : the primary key breaks them, so no row is skipped or repeated
+    for order_by in ["is_done", "-is_done", "-title"]:
+        expected = _ids(get_data_list("task", order_by=f"{order_by},id"))
+        pages, after = [], None
+        while True:
+            page = get_data_page("task", after=after, limit=4, order_by=order_by)
+            if not page:
+                break
+            pages += page
+            after = page[-1]
+        assert _ids(pages) == expected, order_by
+
+
+def test_keyset_over_nulls():
+    _clear()
+    now = datetime.datetime(2024, 1, 1)
+    add_data_many("Summoner", [
+        {
+            "region": "jp", "summoner_name": f"player{i}", "tag": "JP1", "player_icon": "", "rank": "", "lp": "0",
+            "score": "0", "champs_name": "", "champs_point": "",
+            "last_refreshed_at": None if i % 2 else now + datetime.timedelta(hours=i),
+        }
+        for i in range(7)
+    ])
+    try:
+        for order_by in ["last_refreshed_at", "-last_refreshed_at"]:
+            expected = _ids(get_data_list("summoner", order_by=f"{order_by},id"))
+            forward = get_data_page("summoner", limit=2, order_by=order_by)
+            while len(forward) < len(expected):
+                forward += get_data_page("summoner", after=forward[-1], limit=2, order_by=order_by)
+            assert _ids(forward) == expected, order_by
+            backward = get_data_page("summoner", before=forward[-1], limit=100, order_by=order_by)
+            assert _ids(backward) == expected[:-1], order_by
+    finally:
+        _clear()
+
+
+def test_full_text_search(tasks):
+    assert _ids(get_data_list("task", search="report")) == [task.id for i, task in enumerate(tasks) if i % 5 == 0]
+    assert _ids(get_data_list("task", search="task 1")) == _ids(tasks[10:20])
+    assert list(get_data_list("task", search="nothing like it")) == []
+
+    # the index follows updates and deletes
+    update_data("task", tasks[1].id, {"title": "quarterly planning"})
+    delete_data("task", tasks[0].id)
+    assert _ids(get_data_list("task", search="planning")) == [tasks[1].id]
+    assert tasks[0].id not in _ids(get_data_list("task", search="report"))
+
+
+def test_only_url_specs_need_an_index(tasks):
+    # description has no index : code can filter on it, the query string cannot
+    assert _ids(search_data_multiple("Task", {"description": "weekly report"})) == [task.id for i, task in enumerate(tasks) if i % 5 == 0]
+    assert len(get_data_list("task", where={"description__contains": "weekly"}, order_by="-description")) == 5
+    with pytest.raises(ValueError):
+        get_data_page("task", where={"description": "weekly report"}, indexed_only=True)
+    with pytest.raises(ValueError):
+        get_data_page("task", order_by="description", indexed_only=True)
+    assert len(get_data_page("task", where={"is_done": "true"}, order_by="-title", indexed_only=True)) == 9
+    # scores are stored as text and would sort "900" after "1200" : not sortable from the URL
+    with pytest.raises(ValueError):
+        get_data_page("summoner", order_by="-score", indexed_only=True)
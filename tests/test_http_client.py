@@ -0,0 +1,123 @@
+import time
+import pytest
+import requests
+from app.http_client import HTTPClient, ResponseCache, RateLimiter, CircuitBreaker, CircuitOpenError
+from benchmarks.opgg_server import OpggServer
+
+
+@pytest.fixture
+def opgg_server():
+    server = OpggServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "http_cache.db"))
+    yield cache
+    cache.writer.stop()
+
+
+def _url(server, summoner_name: str="player"):
+    return f"{server.base_url}/summoners/jp/{summoner_name}-JP1"
+
+
+class ReplicaSession(requests.Session):
+    # sends the n-th request to the n-th replica (the last one once they run out)
+    def __init__(self, base_urls: list):
+        super().__init__()
+        self.base_urls = base_urls
+        self.sent = 0
+
+    def get(self, url, **kwargs):
+        base_url = self.base_urls[min(self.sent, len(self.base_urls) - 1)]
+        self.sent += 1
+        return super().get(f"{base_url}/{url.split('/', 3)[3]}", **kwargs)
+
+
+def test_cache_hit_then_revalidation(opgg_server, cache):
+    client = HTTPClient(cache=cache, retries=0)
+    url = _url(opgg_server)
+
+    first = client.get(url)
+    assert first.status_code == 200 and not getattr(first, "from_cache", False)
+    cache.flush()
+
+    hit = client.get(url)
+    assert hit.from_cache and hit.content == first.content
+    assert opgg_server.request_count == 1
+
+    revalidated = client.get(url, ttl=0)
+    assert revalidated.from_cache and revalidated.content == first.content
+    assert opgg_server.request_count == 2
+    assert (cache.counters["hits"], cache.counters["revalidated"], cache.counters["misses"]) == (1, 1, 1)
+
+
+def test_circuit_opens_and_half_opens(opgg_server):
+    opgg_server.error_ratio = 1.0
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+    client = HTTPClient(retries=0, circuit_breaker=breaker)
+    url = _url(opgg_server)
+    host = url.split("/")[2]
+
+    for _ in range(3):
+        assert client.get(url).status_code == 503
+    assert breaker.is_open(host)
+    with pytest.raises(CircuitOpenError):
+        client.get(url)
+    assert opgg_server.request_count == 3
+
+    # after the cooldown one trial request goes through : a failure opens the circuit again
+    time.sleep(0.25)
+    assert client.get(url).status_code == 503
+    assert opgg_server.request_count == 4
+    with pytest.raises(CircuitOpenError):
+        client.get(url)
+
+    # ... and a success closes it
+    time.sleep(0.25)
+    opgg_server.error_ratio = 0.0
+    assert client.get(url).status_code == 200
+    assert not breaker.is_open(host)
+    assert client.get(url).status_code == 200
+
+
+def test_rate_limiter_burst_and_refill(opgg_server):
+    rate, burst = 20, 3
+    client = HTTPClient(retries=0, rate_limiter=RateLimiter(rate, burst))
+    url = _url(opgg_server)
+
+    start = time.monotonic()
+    for _ in range(burst):
+        client.get(url)
+    assert time.monotonic() - start < 0.5 / rate
+
+    # past the burst : one request per 1 / rate seconds
+    for _ in range(2):
+        client.get(url)
+    assert time.monotonic() - start >= 2 / rate * 0.9
+
+    # the bucket refills up to the burst, not beyond
+    time.sleep(2 * burst / rate)
+    start = time.monotonic()
+    for _ in range(burst):
+        client.get(url)
+    assert time.monotonic() - start < 0.5 / rate
+    client.get(url)
+    assert time.monotonic() - start >= 1 / rate * 0.9
+
+
+def test_hedged_request_returns_fast_replica():
+    slow, fast = OpggServer(latency=1.0).start(), OpggServer().start()
+    try:
+        session = ReplicaSession([slow.base_url, fast.base_url])
+        client = HTTPClient(session=session, retries=0, hedge_after=0.05)
+        start = time.monotonic()
+        response = client.get(_url(slow))
+        assert time.monotonic() - start < 0.5
+        assert response.status_code == 200 and response.url.startswith(fast.base_url)
+        assert (client.counters["hedges"], client.counters["hedge_wins"]) == (1, 1)
+    finally:
+        slow.stop()
+        fast.stop()
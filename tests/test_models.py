@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(db_path, *args):
+    env = {**os.environ, "DATABASE_PATH": db_path}
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True)
+
+
+def test_duplicates_block_startup_until_removed(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    assert _run(db_path, "-c", "import app.models").returncode == 0
+
+    # a database from before the unique index : the same account added twice
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("DROP INDEX summoner_region_summoner_name_tag")
+        connection.executemany(
+            "INSERT INTO summoner (region, summoner_name, tag, player_icon, rank, lp, score, is_active, champs_name, champs_point)"
+            " VALUES (?, ?, 'JP1', '', '', '0', ?, 1, '', '')",
+            [("jp", "player", "100"), ("jp", "other", "200"), ("jp", "player", "300")],
+        )
+    connection.close()
+
+    started = _run(db_path, "-c", "import app.models")
+    assert started.returncode != 0
+    assert "Summoner summoner_region_summoner_name_tag : 1 rows" in started.stderr
+    assert "--remove-duplicates" in started.stderr
+
+    removed = _run(db_path, "-m", "app.models", "--remove-duplicates")
+    assert removed.returncode == 0, removed.stderr
+    assert removed.stdout.strip() == "Summoner summoner_region_summoner_name_tag : 1 rows deleted 1"
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute("SELECT summoner_name, score FROM summoner ORDER BY id").fetchall() == [("other", "200"), ("player", "300")]
+        assert connection.execute("SELECT count(*) FROM sqlite_master WHERE name = 'summoner_region_summoner_name_tag'").fetchone() == (1,)
+    connection.close()
+    assert _run(db_path, "-c", "import app.models").returncode == 0
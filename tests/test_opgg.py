@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+import pytest
+import requests
+from benchmarks.opgg_server import load_fixtures
+from templates.components import lol_opgg
+from templates.components.lol_opgg import parse_mastery, parse_profile
+
+FIXTURES = {name: html.decode() for name, html in load_fixtures().items()}
+ICON = "https://opgg-static.akamaized.net/meta/images/profile_icons/profileIcon5373.jpg"
+CHAMPIONS = ["Ahri", "Lux", "Jinx", "Yasuo", "Lee Sin", "Thresh", "Ezreal", "Kai'Sa", "Zed", "Leona"]
+
+
+def test_parse_profile():
+    assert parse_profile(FIXTURES["profile"]) == (ICON, "Emerald 3", "55", 2155)
+    assert parse_profile(FIXTURES["profile_unranked"]) == (ICON, "unranked", 0, 0)
+    assert parse_profile(FIXTURES["profile_not_found"]) == (None, None, None, None)
+
+
+def test_parse_mastery():
+    names, points = parse_mastery(FIXTURES["mastery"])
+    assert names.split("|") == CHAMPIONS
+    assert points.split("|")[:3] == ["259,260", "254,939", "250,618"]
+    assert parse_mastery(FIXTURES["mastery"], top_n=3) == ("Ahri|Lux|Jinx", "259,260|254,939|250,618")
+
+
+@pytest.mark.parametrize("name", ["profile", "profile_unranked", "profile_not_found", "mastery"])
+def test_sliced_page_parses_like_the_whole_page(name, monkeypatch):
+    parse = parse_mastery if name == "mastery" else parse_profile
+    sliced = parse(FIXTURES[name])
+    monkeypatch.setattr(lol_opgg, "_slice_roots", lambda html, page_name, limit=None: html)
+    assert sliced == parse(FIXTURES[name])
+
+
+def test_page_without_known_roots_is_parsed_whole():
+    # a layout change : nothing to slice, the whole page goes to the parser
+    html = FIXTURES["profile"]
+    for selector in lol_opgg.PAGE_ROOTS["profile"]:
+        html = html.replace(lol_opgg.SELECTORS[selector][1], "renamed")
+    assert lol_opgg._slice_roots(html, "profile") == html
+
+
+def _response(status_code: int, name: str=None):
+    return SimpleNamespace(status_code=status_code, text=FIXTURES[name] if name else "", url="https://op.gg/summoners/jp/player-JP1")
+
+
+def test_read_pages_by_status():
+    assert lol_opgg._read_profile(_response(200, "profile")) == (ICON, "Emerald 3", "55", 2155)
+    # the "not registered" page, served as a 404
+    assert lol_opgg._read_profile(_response(404, "profile_not_found")) == (None, None, None, None)
+    assert lol_opgg._read_mastery(_response(404, "profile_not_found")) == ("", "")
+    # any other answer is an error, never an unranked summoner
+    for response in [_response(404), _response(429), _response(403, "profile"), _response(503), _response(204)]:
+        with pytest.raises(requests.HTTPError):
+            lol_opgg._read_profile(response)
+        with pytest.raises(requests.HTTPError):
+            lol_opgg._read_mastery(response)
@@ -0,0 +1,64 @@
+import pytest
+from app.utils import *
+from templates.components import lol_custom_organizer as organizer
+
+
+def _add_roster(count: int=10):
+    write(Summoner.delete().execute)
+    return add_data_many("Summoner", [
+        {
+            "region": "jp", "summoner_name": f"player{i}", "tag": "JP1", "player_icon": "", "rank": "Gold 1", "lp": "0",
+            "score": str(1000 + 37 * i), "champs_name": "", "champs_point": "",
+        }
+        for i in range(count)
+    ])
+
+
+def test_grouping_cache_hit(page):
+    _add_roster()
+    organizer._grouping_cache.clear()
+    before = organizer._grouping_cache.stats()
+    page.update()
+
+    organizer._grouping(page)
+    organizer._grouping(page)
+    stats = organizer._grouping_cache.stats()
+    assert (stats["misses"] - before["misses"], stats["hits"] - before["hits"]) == (1, 1)
+
+    # another option is another entry
+    organizer._grouping(page, top_n=3)
+    assert organizer._grouping_cache.stats()["misses"] - before["misses"] == 2
+    write(Summoner.delete().execute)
+
+
+def test_grouping_cache_invalidation():
+    rows = _add_roster()
+    organizer._grouping_cache.put("key", "value")
+
+    # score and activity are covered by the roster signature / do not matter
+    update_data("Summoner", rows[0].id, {"score": "1234"})
+    update_data("Summoner", rows[0].id, {"is_active": False})
+    assert organizer._grouping_cache.get("key") == "value"
+
+    update_data("Summoner", rows[0].id, {"champs_name": "Ahri", "champs_point": "1000"})
+    assert organizer._grouping_cache.get("key") is None
+    write(Summoner.delete().execute)
+
+
+def test_grouping_benches_past_full_lobbies():
+    rows = _add_roster(23)
+    summoners = [(row, int(row.score)) for row in sorted(rows, key=organizer.summoner_key)]
+    title, tabs = organizer._compute_grouping(summoners, 5, False, (), ())
+    assert [text for text, _, _ in tabs] == ["Lobby 1", "Lobby 2"]
+    playing = sorted(summoners[i][0].id for _, team1, team2 in tabs for i in team1 + team2)
+    # the latest registered wait
+    assert playing == sorted(row.id for row in rows)[:20]
+    assert title.endswith("bench: player20#JP1, player21#JP1, player22#JP1")
+
+    # with pairing constraints too ; a benched player cannot be paired
+    index = {(s.summoner_name, s.tag): i for i, (s, _) in enumerate(summoners)}
+    title, tabs = organizer._compute_grouping(summoners, 5, True, ((index[("player0", "JP1")], index[("player1", "JP1")]),), ())
+    assert len(tabs) == 2 and "bench: player20#JP1" in title
+    with pytest.raises(ValueError):
+        organizer._compute_grouping(summoners, 5, True, ((index[("player0", "JP1")], index[("player22", "JP1")]),), ())
+    write(Summoner.delete().execute)
@@ -0,0 +1,60 @@
+import flet as ft
+from app.utils import reconcile_control, show_page
+
+
+def _view(value: str="a"):
+    return [
+        ft.Container(
+            content=ft.Text(value),
+            padding=10,
+            border_radius=5,
+        ),
+        ft.Dropdown(
+            options=[ft.dropdown.Option("a"), ft.dropdown.Option("b")],
+            value="a",
+            text_style=ft.TextStyle(size=12),
+        ),
+    ]
+
+
+def _set_commands(commands):
+    return [command for command in commands if command.name == "set"]
+
+
+def test_flet_internals():
+    # reconcile_control reads and writes these : fails when flet changes them
+    control = ft.Text("a")
+    assert hasattr(control, "_Control__uid")
+    assert isinstance(control._Control__attrs, dict)
+    assert control._Control__attrs["value"] == ("a", True)
+    assert control._previous_children == []
+    assert callable(control._before_build_command)
+
+
+def test_unchanged_view_sends_nothing(page):
+    show_page(page, "/", _view())
+    show_page(page, "/", _view())
+    assert page.sent[-1] == [] or _set_commands(page.sent[-1]) == []
+
+
+def test_changed_attribute_only(page):
+    show_page(page, "/", _view("a"))
+    show_page(page, "/", _view("b"))
+    commands = _set_commands(page.sent[-1])
+    assert [command.attrs for command in commands] == [{"value": "b"}]
+
+
+def test_reconcile_keeps_identity(page):
+    show_page(page, "/", _view())
+    old = page.views[-1].controls[0]
+    new = ft.Container(content=ft.Text("a"), padding=10, border_radius=5)
+    reconcile_control(page.index, old, new)
+    assert new.uid == old.uid and page.index[old.uid] is new
+    assert new.content.uid == old.content.uid
+
+
+def test_nested_change_sends_only_that_attribute(page):
+    show_page(page, "/", [ft.Column([ft.Text("a", size=12), ft.Container(ft.Text("b"), padding=10)])])
+    show_page(page, "/", [ft.Column([ft.Text("a", size=12), ft.Container(ft.Text("b"), padding=20)])])
+    commands = _set_commands(page.sent[-1])
+    assert [command.attrs for command in commands] == [{"padding": "20"}]
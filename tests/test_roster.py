@@ -0,0 +1,51 @@
+import datetime
+import pytest
+import settings
+from app.http_client import HTTPClient
+from app.utils import *
+from benchmarks.opgg_server import OpggServer
+from templates.components import lol_opgg
+from templates.components.lol_roster import refresh_summoners
+
+
+@pytest.fixture
+def opgg_server(monkeypatch):
+    server = OpggServer().start()
+    monkeypatch.setattr(settings, "OPGG_BASE_URL", server.base_url)
+    monkeypatch.setattr(lol_opgg, "_client", HTTPClient(retries=0))
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def summoner():
+    write(Summoner.delete().execute)
+    refreshed_at = datetime.datetime(2024, 1, 1)
+    yield add_data("Summoner", {
+        "region": "jp", "summoner_name": "player", "tag": "JP1", "player_icon": "icon.png", "rank": "Gold 2", "lp": "50",
+        "score": "1250", "champs_name": "Ahri|Lux", "champs_point": "100|90", "last_refreshed_at": refreshed_at,
+    })
+    write(Summoner.delete().execute)
+
+
+def test_refresh_keeps_rows_on_http_errors(opgg_server, summoner):
+    opgg_server.error_ratio = 1.0
+    assert refresh_summoners([summoner]) == 0
+    row = Summoner.get_by_id(summoner.id)
+    assert (row.rank, row.lp, row.score, row.champs_name) == ("Gold 2", "50", "1250", "Ahri|Lux")
+    assert row.last_refreshed_at == summoner.last_refreshed_at
+
+
+def test_refresh_updates_rows(opgg_server, summoner):
+    assert refresh_summoners([summoner]) == 1
+    row = Summoner.get_by_id(summoner.id)
+    assert (row.rank, row.lp, row.score) == ("Emerald 3", "55", "2155")
+    assert row.champs_name.split("|")[:2] == ["Ahri", "Lux"] and row.last_refreshed_at > summoner.last_refreshed_at
+
+
+def test_fetch_reports_http_errors(opgg_server):
+    opgg_server.error_ratio = 1.0
+    errors = {}
+    assert lol_opgg.fetch_summoners("jp", [("player", "JP1")], errors=errors) == [None]
+    assert list(errors) == [("player", "JP1")]
+    assert errors[("player", "JP1")].response.status_code == 503
@@ -0,0 +1,55 @@
+import pytest
+from app.urls import routes, resolve_route, show_data_edit, show_data_list, show_home
+
+
+def _controller(page, **params):
+    return params
+
+
+@pytest.fixture
+def extra_routes():
+    added = []
+
+    def _add(pattern, controller=_controller):
+        routes[pattern] = controller
+        added.append(pattern)
+    yield _add
+    for pattern in added:
+        routes.pop(pattern, None)
+
+
+def test_resolve_builtin_routes():
+    assert resolve_route("/") == (show_home, {})
+    assert resolve_route("/data/task") == (show_data_list, {"model_name": "task"})
+    assert resolve_route("/data/task/edit/3") == (show_data_edit, {"model_name": "task", "id": "3"})
+    assert resolve_route("/data/task/edit/3/more") == (None, {})
+    assert resolve_route("/nowhere") == (None, {})
+
+
+def test_typed_converters(extra_routes):
+    extra_routes("/items/<int:item_id>")
+    extra_routes("/files/<path:file_path>")
+    extra_routes("/tags/<str:tag>")
+
+    controller, params = resolve_route("/items/42")
+    assert controller is _controller and params == {"item_id": 42}
+    assert resolve_route("/items/forty-two") == (None, {})
+    assert resolve_route("/files/static/images/icon.png") == (_controller, {"file_path": "static/images/icon.png"})
+    assert resolve_route("/tags/a/b") == (None, {})
+
+    with pytest.raises(ValueError):
+        extra_routes("/broken/<float:value>")
+        resolve_route("/")
+
+
+def test_routes_recompile_when_modified(extra_routes):
+    assert resolve_route("/reports/7") == (None, {})
+    extra_routes("/reports/<int:report_id>")
+    assert resolve_route("/reports/7") == (_controller, {"report_id": 7})
+
+    other = lambda page, **params: None
+    routes["/reports/<int:report_id>"] = other
+    assert resolve_route("/reports/7")[0] is other
+
+    routes.pop("/reports/<int:report_id>")
+    assert resolve_route("/reports/7") == (None, {})